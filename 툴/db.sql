@@ -2,6 +2,7 @@
 -- 복지 DB 스키마 v4.1 (children_min/max 추가)
 -- ⭐⭐⭐ 핵심: Benefits 중심 구조 + 자녀 수 조건 추가
 -- ================================================================================
+-- v5 추가: danz_welfare_* 분리 스키마 (서비스 테이블, OR 조건 자식 테이블, 플래그 비트마스크) → 3번
 -- v4.1 변경사항:
 --   1. children_min, children_max 필드 명확화
 --   2. False 값 방지를 위한 주석 추가
@@ -131,6 +132,158 @@ CREATE TABLE
         FOREIGN KEY (service_id) REFERENCES welfare_services (service_id) ON DELETE CASCADE
     ) ENGINE = InnoDB DEFAULT CHARSET = utf8mb4 COLLATE = utf8mb4_unicode_ci COMMENT = '복지 혜택 정보 (모든 조건 포함)';
 
+-- ================================================================================
+-- 3. v5 스키마 (json_db_converter_v5_limit_Birth_추가.py의 create_schema()와 같음)
+-- ================================================================================
+--   - danz_welfare_service_info: 서비스당 1행 (서비스명/URL/원문 텍스트)
+--   - danz_welfare_benefits: 혜택당 1행 (지역 + 혜택 정보 + AND/OR 조건 + 플래그 비트마스크)
+--   - danz_welfare_benefit_or: OR 조건 (혜택 키, 필드, 값) 1행씩
+--   - danz_welfare_services: 예전 통합 테이블 모양의 호환 뷰
+--   ⚠️ danz_welfare_services가 예전 통합 테이블인 DB는 migrate_to_split_schema()로 먼저 옮김
+CREATE TABLE IF NOT EXISTS
+    danz_welfare_service_info (
+        fd_service_id VARCHAR(50) PRIMARY KEY,
+        fd_service_name VARCHAR(200) NOT NULL,
+        fd_detail_url TEXT,
+        fd_target_text TEXT,
+        fd_criteria_text TEXT,
+        fd_support_text TEXT,
+        fd_content_hash CHAR(40) NULL COMMENT '서비스 내용 SHA1'
+    ) ENGINE = InnoDB DEFAULT CHARSET = utf8mb4 COLLATE = utf8mb4_unicode_ci COMMENT = '복지 서비스 (서비스당 1행)';
+
+CREATE TABLE IF NOT EXISTS
+    danz_welfare_benefits (
+        fd_benefit_id INT PRIMARY KEY AUTO_INCREMENT,
+        fd_service_id VARCHAR(50) NOT NULL,
+        fd_sido VARCHAR(50),
+        fd_sigungu VARCHAR(50),
+        fd_source VARCHAR(100),
+        fd_amount DECIMAL(15, 2),
+        fd_amount_type VARCHAR(50),
+        fd_amount_unit VARCHAR(20),
+        fd_benefit_type VARCHAR(50),
+        fd_payment_cycle VARCHAR(50),
+        fd_payment_method VARCHAR(100),
+        fd_payment_timing VARCHAR(100),
+        fd_description TEXT,
+        fd_age_min_months INT,
+        fd_age_max_months INT,
+        fd_income_type VARCHAR(100),
+        fd_income_min_percent INT,
+        fd_income_max_percent INT,
+        fd_household_type VARCHAR(100),
+        fd_household_members_min INT,
+        fd_household_members_max INT,
+        fd_children_min INT,
+        fd_children_max INT,
+        fd_birth_order INT,
+        fd_birth_order_min INT,
+        fd_birth_order_max INT,
+        fd_residence_min_months INT,
+        fd_childcare_type VARCHAR(100),
+        fd_requires_grandparent_care BOOLEAN,
+        fd_requires_dual_income BOOLEAN,
+        fd_requires_disability BOOLEAN,
+        fd_requires_parent_disability BOOLEAN,
+        fd_child_disability_level VARCHAR(100),
+        fd_parent_disability_level VARCHAR(100),
+        fd_child_has_serious_disease BOOLEAN,
+        fd_child_has_rare_disease BOOLEAN,
+        fd_child_has_chronic_disease BOOLEAN,
+        fd_child_has_cancer BOOLEAN,
+        fd_parent_has_serious_disease BOOLEAN,
+        fd_parent_has_rare_disease BOOLEAN,
+        fd_parent_has_chronic_disease BOOLEAN,
+        fd_parent_has_cancer BOOLEAN,
+        fd_parent_has_infertility BOOLEAN,
+        fd_is_violence_victim BOOLEAN,
+        fd_is_abuse_victim BOOLEAN,
+        fd_is_defector BOOLEAN,
+        fd_is_national_merit BOOLEAN,
+        fd_is_foster_child BOOLEAN,
+        fd_is_single_mother BOOLEAN,
+        fd_is_low_income BOOLEAN,
+        fd_pregnancy_weeks_min INT,
+        fd_pregnancy_weeks_max INT,
+        fd_birth_within_months INT,
+        fd_limit_birth_date DATE,
+        fd_education_level VARCHAR(100),
+        fd_is_enrolled BOOLEAN,
+        fd_housing_type VARCHAR(100),
+        fd_or_income_type VARCHAR(255),
+        fd_or_household_type VARCHAR(255),
+        fd_or_childcare_type VARCHAR(255),
+        fd_or_requires_grandparent_care VARCHAR(255),
+        fd_or_requires_dual_income VARCHAR(255),
+        fd_or_requires_disability VARCHAR(255),
+        fd_or_requires_parent_disability VARCHAR(255),
+        fd_or_disability_level VARCHAR(255),
+        fd_or_parent_disability_level VARCHAR(255),
+        fd_or_child_has_serious_disease VARCHAR(255),
+        fd_or_child_has_rare_disease VARCHAR(255),
+        fd_or_child_has_chronic_disease VARCHAR(255),
+        fd_or_child_has_cancer VARCHAR(255),
+        fd_or_parent_has_serious_disease VARCHAR(255),
+        fd_or_parent_has_rare_disease VARCHAR(255),
+        fd_or_parent_has_chronic_disease VARCHAR(255),
+        fd_or_parent_has_cancer VARCHAR(255),
+        fd_or_parent_has_infertility VARCHAR(255),
+        fd_or_is_violence_victim VARCHAR(255),
+        fd_or_is_abuse_victim VARCHAR(255),
+        fd_or_is_defector VARCHAR(255),
+        fd_or_is_national_merit VARCHAR(255),
+        fd_or_is_foster_child VARCHAR(255),
+        fd_or_is_single_mother VARCHAR(255),
+        fd_or_is_low_income VARCHAR(255),
+        fd_or_education_level VARCHAR(255),
+        fd_or_is_enrolled VARCHAR(255),
+        fd_or_housing_type VARCHAR(255),
+        fd_or_income_min_percent VARCHAR(255),
+        fd_or_income_max_percent VARCHAR(255),
+        fd_or_household_members_min VARCHAR(255),
+        fd_or_household_members_max VARCHAR(255),
+        fd_or_children_min VARCHAR(255),
+        fd_or_children_max VARCHAR(255),
+        fd_or_birth_order VARCHAR(255),
+        fd_or_birth_order_min VARCHAR(255),
+        fd_or_birth_order_max VARCHAR(255),
+        fd_or_residence_min_months VARCHAR(255),
+        fd_or_pregnancy_weeks_min VARCHAR(255),
+        fd_or_pregnancy_weeks_max VARCHAR(255),
+        fd_or_birth_within_months VARCHAR(255),
+        fd_or_age_min_months VARCHAR(255),
+        fd_or_age_max_months VARCHAR(255),
+        fd_or_limit_birth_date VARCHAR(255),
+        fd_and_mask BIGINT NOT NULL DEFAULT 0 COMMENT 'AND 플래그 비트마스크 (FLAG_FIELDS 순서)',
+        fd_or_mask BIGINT NOT NULL DEFAULT 0 COMMENT 'OR 플래그 비트마스크 (FLAG_FIELDS 순서)',
+        fd_benefit_key VARCHAR(80) NULL COMMENT '서비스ID#혜택순번 (업서트 키, OR 테이블 연결)',
+        fd_content_hash CHAR(40) NULL COMMENT '혜택 내용 SHA1',
+        UNIQUE INDEX uk_benefit_key (fd_benefit_key),
+        INDEX idx_service_id (fd_service_id),
+        INDEX idx_sido_sigungu (fd_sido, fd_sigungu),
+        INDEX idx_age (fd_age_min_months, fd_age_max_months)
+    ) ENGINE = InnoDB DEFAULT CHARSET = utf8mb4 COLLATE = utf8mb4_unicode_ci COMMENT = '복지 혜택 (혜택당 1행 + 조건)';
+
+CREATE TABLE IF NOT EXISTS
+    danz_welfare_benefit_or (
+        fd_benefit_key VARCHAR(80) NOT NULL,
+        fd_field VARCHAR(50) NOT NULL,
+        fd_value VARCHAR(100) NOT NULL,
+        fd_number DECIMAL(12, 2) NULL,
+        PRIMARY KEY (fd_benefit_key, fd_field, fd_value),
+        INDEX idx_field_value (fd_field, fd_value),
+        INDEX idx_field_number (fd_field, fd_number)
+    ) ENGINE = InnoDB DEFAULT CHARSET = utf8mb4 COLLATE = utf8mb4_unicode_ci COMMENT = '복지 혜택 OR 조건 (조건 값당 1행)';
+
+-- 호환 뷰 (create_compat_view()는 혜택 테이블의 실제 컬럼 목록으로 만듦)
+CREATE OR REPLACE VIEW
+    danz_welfare_services AS
+SELECT
+    b.*, s.fd_service_name, s.fd_detail_url, s.fd_target_text, s.fd_criteria_text, s.fd_support_text
+FROM
+    danz_welfare_benefits b
+    LEFT JOIN danz_welfare_service_info s ON s.fd_service_id = b.fd_service_id;
+
 -- ================================================================================
 -- 검색 쿼리 예시
 -- ================================================================================
@@ -0,0 +1,189 @@
+"""
+Few-shot 예시 검색 (수작업 검증본 정형화데이터/ 기반)
+- ⭐ 서비스 텍스트 TF-IDF (글자 2-gram, 한글 형태소 분석기 없이 동작)
+- ⭐ 새 서비스와 가장 비슷한 검증 예시 1~3개를 Step 2 프롬프트에 넣음
+  → 첫 파싱 정확도 ↑, 재파싱 호출 ↓
+- ⭐ 인덱스는 오프라인으로 1초 안에 생성, 디스크에 캐시
+  (원본 JSON 파일이 바뀌면 자동으로 다시 생성)
+"""
+import glob
+import json
+import math
+import os
+import pickle
+import re
+from collections import Counter
+
+TEXT_FIELDS = ('target_text', 'criteria_text', 'support_text')
+NON_WORD_PATTERN = re.compile(r'[^0-9A-Za-z가-힣]+')
+
+# 예시 1개당 원문 최대 길이 (프롬프트가 너무 길어지지 않도록)
+EXAMPLE_TEXT_CHARS = 300
+
+
+def char_ngrams(text, n=2):
+    """공백/기호 제거 후 글자 n-gram"""
+    grams = []
+    for word in NON_WORD_PATTERN.split(text or ''):
+        if len(word) < n:
+            if word:
+                grams.append(word)
+            continue
+        grams.extend(word[i:i + n] for i in range(len(word) - n + 1))
+    return grams
+
+
+def service_text(service_name, target_text, criteria_text, support_text):
+    return f"{service_name or ''}\n{target_text or ''}\n{criteria_text or ''}\n{support_text or ''}"
+
+
+def _compact_benefit(benefit):
+    """예시용 혜택 (값 있는 필드만)"""
+    compact = {
+        key: value for key, value in benefit.items()
+        if key not in ('and_conditions', 'or_conditions') and value not in (None, [], '')
+    }
+    for group in ('and_conditions', 'or_conditions'):
+        compact[group] = {
+            field: value for field, value in (benefit.get(group) or {}).items()
+            if value not in (None, False, [], '')
+        }
+    return compact
+
+
+class FewShotIndex:
+    def __init__(self):
+        self.examples = []   # [{service_id, service_name, texts, benefits}]
+        self.vectors = []    # [{gram: weight}] (L2 정규화)
+        self.idf = {}
+        self.signature = None
+
+    @staticmethod
+    def file_signature(json_paths):
+        """캐시 유효성 확인용 (경로, 크기, 수정 시각)"""
+        return [(path, os.path.getsize(path), int(os.path.getmtime(path))) for path in sorted(json_paths)]
+
+    def vectorize(self, text):
+        counts = Counter(char_ngrams(text))
+        vector = {gram: (1 + math.log(count)) * self.idf[gram] for gram, count in counts.items() if gram in self.idf}
+        norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+        return {gram: weight / norm for gram, weight in vector.items()} if norm else {}
+
+    def build(self, json_paths):
+        """검증본 JSON 파일들로 인덱스 생성 (혜택이 있는 서비스만)"""
+        self.examples = []
+        documents = []
+        for path in sorted(json_paths):
+            with open(path, 'r', encoding='utf-8') as f:
+                for service in json.load(f):
+                    benefits = (service.get('parsed_data') or {}).get('benefits') or []
+                    if not benefits:
+                        continue
+                    original = service.get('original_data') or {}
+                    texts = [original.get(field) or '' for field in TEXT_FIELDS]
+                    self.examples.append({
+                        "service_id": service.get('service_id'),
+                        "service_name": service.get('service_name'),
+                        "texts": texts,
+                        "benefits": [_compact_benefit(benefit) for benefit in benefits]
+                    })
+                    documents.append(set(char_ngrams(service_text(service.get('service_name'), *texts))))
+
+        doc_freq = Counter(gram for grams in documents for gram in grams)
+        total = len(documents)
+        self.idf = {gram: math.log((1 + total) / (1 + freq)) + 1 for gram, freq in doc_freq.items()}
+        self.vectors = [
+            self.vectorize(service_text(example["service_name"], *example["texts"]))
+            for example in self.examples
+        ]
+        self.signature = self.file_signature(json_paths)
+        return self
+
+    def save(self, cache_path):
+        with open(cache_path, 'wb') as f:
+            pickle.dump({
+                "signature": self.signature,
+                "examples": self.examples,
+                "vectors": self.vectors,
+                "idf": self.idf
+            }, f)
+
+    @classmethod
+    def load_or_build(cls, json_paths, cache_path='fewshot_index.pkl'):
+        """캐시가 있고 원본이 그대로면 불러오고, 아니면 새로 만들어서 저장"""
+        index = cls()
+        signature = cls.file_signature(json_paths)
+
+        if os.path.exists(cache_path):
+            try:
+                with open(cache_path, 'rb') as f:
+                    data = pickle.load(f)
+                if data["signature"] == signature:
+                    index.signature = signature
+                    index.examples = data["examples"]
+                    index.vectors = data["vectors"]
+                    index.idf = data["idf"]
+                    return index
+            except Exception as e:
+                print(f"⚠️ Few-shot 인덱스 캐시 무시 ({str(e)[:50]})")
+
+        index.build(json_paths)
+        index.save(cache_path)
+        return index
+
+    def search(self, service_name, target_text, criteria_text, support_text, k=3, min_score=0.2, service_id=None):
+        """가장 비슷한 검증 예시 k개 → [(점수, 예시)]
+
+        service_id: 파싱 중인 서비스 ID → 같은 ID의 검증 예시는 제외 (정답 유출 방지)
+        (점수로 거르면 안 됨: 압축한 텍스트로 검색하면 자기 자신도 0.92~0.99로 나옴)
+        """
+        query = self.vectorize(service_text(service_name, target_text, criteria_text, support_text))
+        if not query:
+            return []
+
+        scored = []
+        for vector, example in zip(self.vectors, self.examples):
+            if service_id is not None and example["service_id"] == service_id:
+                continue
+            score = sum(weight * vector.get(gram, 0.0) for gram, weight in query.items())
+            if score >= min_score:
+                scored.append((score, example))
+
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return scored[:k]
+
+    def format_examples(self, scored):
+        """프롬프트에 넣을 예시 텍스트"""
+        if not scored:
+            return ""
+
+        blocks = []
+        for idx, (_, example) in enumerate(scored, 1):
+            target, criteria, support = (' '.join(text.split())[:EXAMPLE_TEXT_CHARS] for text in example["texts"])
+            benefits = json.dumps(example["benefits"], ensure_ascii=False)
+            blocks.append(f"""[예시 {idx}] {example['service_name']}
+대상자: {target}
+선정기준: {criteria}
+지원내용: {support}
+정답 혜택: {benefits}""")
+
+        return "【참고: 검증된 유사 서비스 파싱 예시】\n(형식과 AND/OR 구분만 참고하고, 값은 반드시 위 원문에서 추출)\n\n" + "\n\n".join(blocks)
+
+
+# 사용 예시 (인덱스 미리 생성 + 검색 확인)
+if __name__ == '__main__':
+    import time
+
+    json_paths = glob.glob('정형화데이터/정형화데이터_*.json')
+
+    start_time = time.time()
+    index = FewShotIndex().build(json_paths)
+    index.save('fewshot_index.pkl')
+    print(f"📚 Few-shot 인덱스: 예시 {len(index.examples)}개, n-gram {len(index.idf):,}개 "
+          f"({time.time() - start_time:.2f}초)")
+    print("💾 저장: fewshot_index.pkl")
+
+    example = index.examples[0]
+    print(f"\n🔍 검색 테스트: {example['service_name']}")
+    for score, found in index.search(example["service_name"], *example["texts"], service_id=example["service_id"]):
+        print(f"  {score:.3f} {found['service_id']} {found['service_name']}")
@@ -3,21 +3,177 @@
 - ⭐ Step 1: 혜택 개수 파악
 - ⭐ Step 2: 각 혜택 조건 파싱
 - ⭐ Step 3: 이해 확인 및 재파싱
+- ⭐ 단계별 병렬 실행 (혜택 N개 → 단계당 1회 왕복 시간)
+- ⭐ Step 4 (근거 확인)는 옵션, 검증과 겹쳐서 실행
+- ⭐ Step 3 로컬 규칙 검증 (판단 불가일 때만 LLM 검증 호출)
+- ⭐ LLM 백엔드 선택 (openai | gemini | fake, llm_backends.py)
+- ⭐ 사용량 장부 (LLM_LEDGER, llm_ledger.py): 서비스/지역/프롬프트 버전별 토큰·비용
+- ⭐ 텍스트 압축 옵션 (text_compaction.py, 원문은 original_data에 그대로 저장)
+- ⭐ 검증본 유사 예시를 Step 2에 few-shot으로 추가 (fewshot_index.py)
 """
 import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from openai import OpenAI
 import xml.etree.ElementTree as ET
 
+from llm_backends import OpenAIBackend
+from welfare_schema import (
+    AGE_MONTHS_PATTERN, AGE_YEARS_PATTERN, BIRTH_ORDER_FIELDS, BIRTH_ORDER_WORDS, BOOLEAN_FIELDS, CATEGORY_FIELDS,
+    DATE_PATTERN, KEYWORD_FIELDS, MANWON_PATTERN, RANGE_FIELDS, is_number, years_to_months
+)
+
+
+def looks_like_years(value, age_years, age_months):
+    """개월 필드 값이 원문 'N세'의 N을 년 단위 그대로 넣은 것인지
+
+    value*12가 원문 나이('N세' → N*12개월)와 맞을 때만 의심, N*12 / N*12+11(N세의 마지막 달)이면 올바른 변환
+    >>> looks_like_years(6, {6}, set())              # "6세 이하" → 6
+    True
+    >>> looks_like_years(12, {1, 12}, set())         # "만 1세 이상 12세 이하" → 12 (= 1세)
+    False
+    >>> looks_like_years(24, {2, 24}, set())         # "2세 ~ 24세" → 24 (= 2세)
+    False
+    >>> looks_like_years(36, {3, 36}, set())         # "3세 ~ 36세" → 36 (= 3세)
+    False
+    >>> looks_like_years(12, {12}, {12})             # "12개월" 그대로
+    False
+    """
+    if not is_number(value) or value <= 0 or value in age_months:
+        return False
+    converted = {years * 12 for years in age_years} | {years * 12 + 11 for years in age_years}
+    # value*12 개월 = 원문의 'value세' → 년 숫자를 그대로 넣은 것
+    return value not in converted and value in age_years
+
+
+def step3_local_verify(original_text, parsed_benefit):
+    """Step 3 (로컬): 프로그램으로 확인 가능한 규칙 검사 (LLM 호출 없음, 캐스케이드에서도 사용)
+
+    LLM 검증(step3_verify_parsing)과 같은 형태로 반환합니다.
+    - 오류가 있으면 is_correct=False (LLM 호출 없이 바로 재파싱)
+    - 오류는 없지만 원문 키워드가 조건에 반영되지 않았으면 inconclusive=True (LLM 검증 필요)
+    - 키워드 추측(keyword_hints)은 missing_conditions에 넣지 않음 → 재파싱 피드백에는 안 들어가고 LLM 검증에만 전달
+    """
+    and_cond = parsed_benefit.get('and_conditions') or {}
+    or_cond = parsed_benefit.get('or_conditions') or {}
+
+    keyword_hints = []
+    wrong_conditions = []
+    type_errors = []
+
+    age_years = {int(n) for n in AGE_YEARS_PATTERN.findall(original_text)}
+    age_months = {int(n) for n in AGE_MONTHS_PATTERN.findall(original_text)}
+
+    for cond_name, cond in (('and_conditions', and_cond), ('or_conditions', or_cond)):
+        # 1. 년 단위 나이 필드
+        for key in ('age_min_years', 'age_max_years'):
+            if key in cond:
+                wrong_conditions.append(f"{cond_name}.{key}: 나이는 개월 단위(age_*_months)만 허용")
+
+        # 2. 개월 자리에 년 숫자 ("6세" → 6)
+        for key in ('age_min_months', 'age_max_months'):
+            value = cond.get(key)
+            if looks_like_years(value, age_years, age_months):
+                wrong_conditions.append(
+                    f"{cond_name}.{key}: {value} → 원문 '{value}세'를 년 단위로 넣은 것으로 보임 (개월 단위로 변환 필요)"
+                )
+
+        # 3. Boolean false 금지
+        for key, value in cond.items():
+            if value is False:
+                type_errors.append(f"{cond_name}.{key}: false 금지, true 또는 null만 허용")
+            elif key in BOOLEAN_FIELDS and value not in (None, True):
+                type_errors.append(f"{cond_name}.{key}: {value!r} → true 또는 null만 허용")
+
+        # 4. 최소 > 최대
+        for min_key, max_key in RANGE_FIELDS:
+            low, high = cond.get(min_key), cond.get(max_key)
+            if is_number(low) and is_number(high) and low > high:
+                wrong_conditions.append(f"{cond_name}.{min_key}({low}) > {max_key}({high}): 최소가 최대보다 큼")
+
+        # 5. limit_birth_date 형식
+        value = cond.get('limit_birth_date')
+        if value is not None and not (isinstance(value, str) and DATE_PATTERN.match(value)):
+            type_errors.append(f"{cond_name}.limit_birth_date: {value!r} → \"YYYY-MM-DD\" 형식만 허용")
+
+    # 6. 카테고리형: AND는 문자열, OR는 배열
+    for key in CATEGORY_FIELDS:
+        if isinstance(and_cond.get(key), list):
+            type_errors.append(f"and_conditions.{key}: 배열 금지! 문자열만 허용")
+        value = or_cond.get(key)
+        if value is not None and value != "null" and not isinstance(value, list):
+            type_errors.append(f"or_conditions.{key}: 문자열 금지! 배열만 허용")
+
+    # 7. 출생순서 ↔ 나이 혼동
+    if any(and_cond.get(key) or or_cond.get(key) for key in BIRTH_ORDER_FIELDS):
+        if age_years and not any(word in original_text for word in BIRTH_ORDER_WORDS):
+            wrong_conditions.append("birth_order: 원문에 출생순서 표현이 없음 → 나이('N세')를 출생순서로 착각한 것으로 보임")
+
+    # 8. 만원 ↔ 원 단위
+    amount = parsed_benefit.get('amount')
+    if is_number(amount) and amount > 0:
+        manwon = {int(n.replace(',', '')) for n in MANWON_PATTERN.findall(original_text)}
+        if amount in manwon:
+            wrong_conditions.append(
+                f"amount: {amount} → 원문 '{amount}만원'은 {int(amount * 10000)}원 (원 단위로 변환 필요)"
+            )
+
+    # 9. 원문 키워드가 조건에 반영됐는지 (규칙만으로는 판단 불가 → LLM 검증 후보)
+    for keyword, fields in KEYWORD_FIELDS.items():
+        if keyword in original_text and not any(and_cond.get(f) or or_cond.get(f) for f in fields):
+            keyword_hints.append(f"{keyword} ({', '.join(fields)} 확인 필요)")
+
+    is_correct = not (wrong_conditions or type_errors)
+
+    return {
+        "is_correct": is_correct,
+        "inconclusive": is_correct and bool(keyword_hints),
+        "missing_conditions": [],
+        "keyword_hints": keyword_hints,
+        "wrong_conditions": wrong_conditions,
+        "type_errors": type_errors,
+        "suggestions": "" if is_correct else "로컬 규칙 검사에서 발견된 오류를 수정하세요.",
+        "verified_by": "local"
+    }
+
+
 class WelfareParserV4_5:
-    def __init__(self, api_key):
-        """OpenAI API 초기화"""
-        self.client = OpenAI(api_key=api_key)
-        self.model = "gpt-4o-mini"
+    PROMPT_VERSION = "v4.6-4step"  # 프롬프트를 바꾸면 올려주세요 (사용량 장부에서 버전별 비교)
+    SYSTEM_PROMPTS = {
+        "step1": "You are a welfare benefit analyzer. Count benefits accurately based on support differences.",
+        "step2": "You are a welfare data parser. Return only valid JSON.",
+        "step3": "You are a data verification expert. Return only valid JSON.",
+        "step4": "You are a data reasoning explainer. Explain your parsing decisions clearly with AND/OR distinction."
+    }
     
-    def step1_count_benefits(self, service_name, target_text, criteria_text, support_text):
-        """Step 1: 혜택 개수 파악"""
-        prompt = f"""
+    def __init__(self, api_key=None, backend=None, max_workers=8, explain_reasoning=False, local_verify=True,
+                 compactor=None, fewshot_index=None, fewshot_k=2):
+        """LLM 백엔드 초기화 (backend가 없으면 OpenAI 사용)
+        
+        max_workers: 서비스 1개 안에서 동시에 보내는 최대 요청 수
+        explain_reasoning: True면 Step 4 (파싱 근거 설명) 실행
+        local_verify: True면 Step 3을 로컬 규칙으로 먼저 검사 (판단 불가일 때만 LLM 호출)
+        compactor: TextCompactor (text_compaction.py), 있으면 프롬프트에 압축한 텍스트 사용
+        fewshot_index: FewShotIndex (fewshot_index.py), 있으면 유사 검증 예시 fewshot_k개를 Step 2에 추가
+        """
+        self.backend = backend or OpenAIBackend(api_key=api_key)
+        self.model = self.backend.model
+        self.max_workers = max_workers
+        self.explain_reasoning = explain_reasoning
+        self.local_verify = local_verify
+        self.compactor = compactor
+        self.fewshot_index = fewshot_index
+        self.fewshot_k = fewshot_k
+        
+        # 첫 파싱 정확도 / 재파싱 통계
+        self.parsed_benefits = 0
+        self.reparsed_benefits = 0
+    
+    @staticmethod
+    def build_step1_prompt(service_name, target_text, criteria_text, support_text):
+        """Step 1 프롬프트 생성 (비용 예측에서도 사용)"""
+        return f"""
 서비스명: {service_name}
 대상자: {target_text}
 선정기준: {criteria_text}
@@ -88,22 +244,24 @@ JSON 형식으로 답하세요:
   "reasoning": "혜택을 이렇게 나눈 이유"
 }}
 """
+    
+    def step1_count_benefits(self, service_name, target_text, criteria_text, support_text):
+        """Step 1: 혜택 개수 파악"""
+        prompt = self.build_step1_prompt(service_name, target_text, criteria_text, support_text)
         
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {"role": "system", "content": "You are a welfare benefit analyzer. Count benefits accurately based on support differences."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.1,
-            response_format={"type": "json_object"}
+        return self.backend.call_json(
+            self.SYSTEM_PROMPTS["step1"],
+            prompt,
+            step="step1"
         )
-        
-        return json.loads(response.choices[0].message.content)
     
-    def step2_parse_benefit(self, service_name, benefit_description, target_text, criteria_text, support_text):
-        """Step 2: 개별 혜택 파싱"""
-        prompt = f"""
+    @staticmethod
+    def build_step2_prompt(service_name, benefit_description, target_text, criteria_text, support_text, examples=""):
+        """Step 2 프롬프트 생성 (비용 예측에서도 사용)
+        
+        examples: FewShotIndex.format_examples() 결과 (없으면 빈 문자열)
+        """
+        return f"""
 서비스명: {service_name}
 혜택 설명: {benefit_description}
 
@@ -113,6 +271,7 @@ JSON 형식으로 답하세요:
 지원내용: {support_text}
 
 ---
+{examples}
 
 【⭐ 필수 JSON 구조 ⭐】
 
@@ -238,21 +397,24 @@ JSON 형식으로 답하세요:
 
 JSON만 반환하세요. 설명 없이!
 """
+    
+    def step2_parse_benefit(self, service_name, benefit_description, target_text, criteria_text, support_text,
+                            examples=""):
+        """Step 2: 개별 혜택 파싱"""
+        prompt = self.build_step2_prompt(service_name, benefit_description, target_text, criteria_text, support_text,
+                                         examples)
         
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {"role": "system", "content": "You are a welfare data parser. Return only valid JSON."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.1,
-            response_format={"type": "json_object"}
+        return self.backend.call_json(
+            self.SYSTEM_PROMPTS["step2"],
+            prompt,
+            step="step2"
         )
-        
-        return json.loads(response.choices[0].message.content)
     
-    def step3_verify_parsing(self, original_text, parsed_benefit):
-        """Step 3: 이해 확인"""
+    def step3_verify_parsing(self, original_text, parsed_benefit, keyword_hints=()):
+        """Step 3: 이해 확인
+        
+        keyword_hints: 로컬 검사에서 조건에 반영 안 된 것 같은 원문 키워드 (추측이라 LLM이 확인)
+        """
         and_cond = parsed_benefit.get('and_conditions', {})
         or_cond = parsed_benefit.get('or_conditions', {})
         
@@ -284,13 +446,21 @@ JSON만 반환하세요. 설명 없이!
         if or_cond.get('income_type'):
             extracted.append(f"소득(OR): {' 또는 '.join(or_cond['income_type'])}")
         
+        hints = ""
+        if keyword_hints:
+            hints = (
+                "\n확인 필요 (원문 키워드가 조건에 없음, 자동 검사라 면책 문구 등 오탐일 수 있음):\n"
+                + "\n".join(f"- {hint}" for hint in keyword_hints)
+                + "\n→ 실제로 자격 조건이면 missing_conditions에, 아니면 무시하세요.\n"
+            )
+        
         prompt = f"""
 원본 텍스트:
 {original_text}
 
 추출한 조건:
 {chr(10).join(f"- {item}" for item in extracted)}
-
+{hints}
 ---
 
 다음 데이터를 정확히 추출했나요?
@@ -393,17 +563,28 @@ JSON 형식으로 답하세요:
 }}
 """
         
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {"role": "system", "content": "You are a data verification expert. Return only valid JSON."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.1,
-            response_format={"type": "json_object"}
+        return self.backend.call_json(
+            self.SYSTEM_PROMPTS["step3"],
+            prompt,
+            step="step3"
         )
+    
+    def step3_local_verify(self, original_text, parsed_benefit):
+        """Step 3 (로컬): 모듈 함수 step3_local_verify와 같음"""
+        return step3_local_verify(original_text, parsed_benefit)
+    
+    def verify_benefit(self, original_text, parsed_benefit):
+        """Step 3: 로컬 규칙 검증 → 판단 불가일 때만 LLM 검증"""
+        keyword_hints = ()
+        if self.local_verify:
+            verification = self.step3_local_verify(original_text, parsed_benefit)
+            if not verification['inconclusive']:
+                return verification
+            keyword_hints = verification['keyword_hints']
         
-        return json.loads(response.choices[0].message.content)
+        verification = self.step3_verify_parsing(original_text, parsed_benefit, keyword_hints)
+        verification['verified_by'] = "llm"
+        return verification
     
     def step4_explain_reasoning(self, original_text, parsed_benefit):
         """Step 4: 파싱 근거 확인"""
@@ -519,21 +700,79 @@ JSON 형식으로 답하세요:
 }}
 """
         
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {"role": "system", "content": "You are a data reasoning explainer. Explain your parsing decisions clearly with AND/OR distinction."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.1,
-            response_format={"type": "json_object"}
+        return self.backend.call_json(
+            self.SYSTEM_PROMPTS["step4"],
+            prompt,
+            step="step4"
         )
+    
+    def print_reasoning(self, reasoning, title):
+        """Step 4 근거 출력"""
+        print(f"\n    ╔══════════════════════════════════════════════════════════════╗")
+        print(f"    ║ 【{title}】")
+        print(f"    ╚══════════════════════════════════════════════════════════════╝")
+        
+        # AND 조건 - 값이 있는 필드
+        and_filled = reasoning.get('and_filled_reasoning', {})
+        if and_filled:
+            print(f"\n    ✅ AND 조건 (값이 있는 필드):")
+            for field, info in and_filled.items():
+                print(f"       📌 {field}: {info.get('value')}")
+                print(f"          └─ {info.get('reason')}")
+        
+        # OR 조건 - 값이 있는 필드
+        or_filled = reasoning.get('or_filled_reasoning', {})
+        if or_filled:
+            print(f"\n    🔀 OR 조건 (값이 있는 필드):")
+            for field, info in or_filled.items():
+                print(f"       📌 {field}: {info.get('value')}")
+                print(f"          └─ {info.get('reason')}")
         
-        return json.loads(response.choices[0].message.content)
+        # AND 조건 - 값이 없는 필드
+        and_empty = reasoning.get('and_empty_reasoning', {})
+        if and_empty:
+            print(f"\n    ⭕ AND 조건 (값이 없는 필드):")
+            for field, info in and_empty.items():
+                print(f"       📌 {field}: null")
+                print(f"          └─ {info.get('reason')}")
+        
+        # 총 요약
+        summary = reasoning.get('summary', {})
+        if summary:
+            print(f"\n    ╔══════════════════════════════════════════════════════════════╗")
+            print(f"    ║ 【총 요약】                                                  ║")
+            print(f"    ╚══════════════════════════════════════════════════════════════╝")
+            
+            if summary.get('core_conditions'):
+                print(f"\n    💡 핵심: {summary['core_conditions']}")
+            
+            if summary.get('warnings'):
+                print(f"\n    ⚠️  주의:")
+                for warning in summary['warnings']:
+                    print(f"       - {warning}")
+            
+            if summary.get('need_fix'):
+                print(f"\n    🔧 수정 필요:")
+                for fix in summary['need_fix']:
+                    print(f"       - {fix}")
+            
+            if summary.get('need_reparse'):
+                print(f"\n    🔄 재파싱 권장")
+            
+            print(f"\n    신뢰도: {summary.get('overall_confidence', '중간')}")
+        
+        print()  # 줄바꿈
     
-    def parse_service(self, service_name, target_text, criteria_text, support_text, max_retries=2):
-        """전체 파싱 프로세스"""
-        import time
+    def parse_service(self, service_name, target_text, criteria_text, support_text, max_retries=2, service_id=None):
+        """전체 파싱 프로세스 (단계별 병렬 실행)
+        
+        service_id: 있으면 같은 서비스의 검증본은 few-shot 예시에서 제외
+        - Step 2: 모든 혜택을 동시에 파싱
+        - Step 3: 모든 혜택을 동시에 검증 (로컬 규칙 우선, Step 4는 검증과 겹쳐서 실행)
+        - 재파싱: 검증 실패한 혜택만 동시에 재파싱
+        - Step 4: explain_reasoning=True 일 때만 실행 (결과에는 영향 없음, 출력용)
+        """
+        original_text = f"{target_text}\n{criteria_text}\n{support_text}"
         
         try:
             # Step 1: 혜택 개수 파악
@@ -547,105 +786,58 @@ JSON 형식으로 답하세요:
             if reasoning:
                 print(f"      └─ {reasoning}")
             
-            benefits = []
+            if not benefit_descriptions:
+                return {"benefits": []}
+            
+            # Few-shot 예시 (서비스당 1번 검색, 모든 혜택에 같이 사용)
+            examples = ""
+            if self.fewshot_index:
+                scored = self.fewshot_index.search(service_name, target_text, criteria_text, support_text,
+                                                   k=self.fewshot_k, service_id=service_id)
+                examples = self.fewshot_index.format_examples(scored)
+                if scored:
+                    print(f"  📚 Few-shot 예시: {', '.join(example['service_name'][:20] for _, example in scored)}")
             
-            # Step 2: 각 혜택 파싱
-            for idx, desc in enumerate(benefit_descriptions, 1):
-                print(f"  🔍 Step 2-{idx}: 혜택 파싱...", end=' ')
-                benefit = self.step2_parse_benefit(service_name, desc, target_text, criteria_text, support_text)
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                # Step 2: 각 혜택 동시 파싱
+                print(f"  🔍 Step 2: 혜택 {len(benefit_descriptions)}개 동시 파싱...", end=' ')
+                step2_futures = [
+                    executor.submit(self.step2_parse_benefit, service_name, desc, target_text, criteria_text,
+                                    support_text, examples)
+                    for desc in benefit_descriptions
+                ]
+                benefits = [future.result() for future in step2_futures]
                 print("✅")
                 
-                # Step 3: 이해 확인
-                print(f"  ✔️  Step 3-{idx}: 이해 확인...", end=' ')
-                verification = self.step3_verify_parsing(
-                    f"{target_text}\n{criteria_text}\n{support_text}",
-                    benefit
-                )
+                # Step 3: 이해 확인 (+ Step 4 근거 확인을 동시에)
+                print(f"  ✔️  Step 3: 이해 확인 {len(benefits)}개 동시 실행...", end=' ')
+                step3_futures = [
+                    executor.submit(self.verify_benefit, original_text, benefit)
+                    for benefit in benefits
+                ]
+                step4_futures = {}
+                if self.explain_reasoning:
+                    step4_futures = {
+                        idx: executor.submit(self.step4_explain_reasoning, original_text, benefit)
+                        for idx, benefit in enumerate(benefits)
+                    }
                 
-                if verification.get('is_correct'):
-                    print("정확!")
-                    
-                    # Step 4: 근거 확인 (정확한 경우에만)
-                    print(f"  📝 Step 4-{idx}: 근거 확인...", end=' ')
-                    reasoning = self.step4_explain_reasoning(
-                        f"{target_text}\n{criteria_text}\n{support_text}",
-                        benefit
-                    )
-                    print("✅")
-                    
-                    # 근거 출력
-                    print(f"\n    ╔══════════════════════════════════════════════════════════════╗")
-                    print(f"    ║ 【파싱 근거】                                                ║")
-                    print(f"    ╚══════════════════════════════════════════════════════════════╝")
-                    
-                    # AND 조건 - 값이 있는 필드
-                    and_filled_reasoning = reasoning.get('and_filled_reasoning', {})
-                    if and_filled_reasoning:
-                        print(f"\n    ✅ AND 조건 (값이 있는 필드):")
-                        for field, info in and_filled_reasoning.items():
-                            print(f"       📌 {field}: {info.get('value')}")
-                            print(f"          └─ {info.get('reason')}")
-                    
-                    # OR 조건 - 값이 있는 필드
-                    or_filled_reasoning = reasoning.get('or_filled_reasoning', {})
-                    if or_filled_reasoning:
-                        print(f"\n    🔀 OR 조건 (값이 있는 필드):")
-                        for field, info in or_filled_reasoning.items():
-                            print(f"       📌 {field}: {info.get('value')}")
-                            print(f"          └─ {info.get('reason')}")
-                    
-                    # AND 조건 - 값이 없는 필드
-                    and_empty_reasoning = reasoning.get('and_empty_reasoning', {})
-                    if and_empty_reasoning:
-                        print(f"\n    ⭕ AND 조건 (값이 없는 필드):")
-                        for field, info in and_empty_reasoning.items():
-                            print(f"       📌 {field}: null")
-                            print(f"          └─ {info.get('reason')}")
-                    
-                    # 총 요약
-                    summary = reasoning.get('summary', {})
-                    if summary:
-                        print(f"\n    ╔══════════════════════════════════════════════════════════════╗")
-                        print(f"    ║ 【총 요약】                                                  ║")
-                        print(f"    ╚══════════════════════════════════════════════════════════════╝")
-                        
-                        if summary.get('core_conditions'):
-                            print(f"\n    💡 핵심: {summary['core_conditions']}")
-                        
-                        if summary.get('warnings'):
-                            print(f"\n    ⚠️  주의:")
-                            for warning in summary['warnings']:
-                                print(f"       - {warning}")
-                        
-                        if summary.get('need_fix'):
-                            print(f"\n    🔧 수정 필요:")
-                            for fix in summary['need_fix']:
-                                print(f"       - {fix}")
-                        
-                        if summary.get('need_reparse'):
-                            print(f"\n    🔄 재파싱 권장")
-                        
-                        print(f"\n    신뢰도: {summary.get('overall_confidence', '중간')}")
-                    
-                    print()  # 줄바꿈
-                    
-                    benefits.append(benefit)
-                else:
-                    print("⚠️ 재파싱 필요")
-                    
-                    # 누락/오류 정보 출력
-                    if verification.get('missing_conditions'):
-                        print(f"    - 누락: {', '.join(verification['missing_conditions'])}")
-                    if verification.get('wrong_conditions'):
-                        print(f"    - 오류: {', '.join(verification['wrong_conditions'])}")
-                    if verification.get('type_errors'):
-                        print(f"    - 타입: {', '.join(verification['type_errors'])}")
-                    
-                    # 재파싱 (최대 1회)
-                    if max_retries > 0:
-                        print(f"  🔄 재파싱 중...", end=' ')
+                verifications = [future.result() for future in step3_futures]
+                retry_indexes = [idx for idx, v in enumerate(verifications) if not v.get('is_correct')]
+                llm_verified = sum(1 for v in verifications if v.get('verified_by') == "llm")
+                print(f"정확 {len(benefits) - len(retry_indexes)}개, 재파싱 필요 {len(retry_indexes)}개 "
+                      f"(로컬 {len(benefits) - llm_verified}개 / LLM {llm_verified}개)")
+                self.parsed_benefits += len(benefits)
+                self.reparsed_benefits += len(retry_indexes)
+                
+                # 재파싱 (최대 1회, 실패한 혜택만 동시에)
+                if retry_indexes and max_retries > 0:
+                    retry_futures = {}
+                    for idx in retry_indexes:
+                        verification = verifications[idx]
                         
-                        # 피드백 포함하여 재파싱
+                        # 누락/오류 정보 출력 + 피드백 구성
+                        print(f"    ⚠️ 혜택 {idx + 1} 재파싱 필요")
                         feedback = []
                         if verification.get('missing_conditions'):
                             feedback.append(f"누락: {', '.join(verification['missing_conditions'])}")
@@ -653,80 +845,40 @@ JSON 형식으로 답하세요:
                             feedback.append(f"오류: {', '.join(verification['wrong_conditions'])}")
                         if verification.get('type_errors'):
                             feedback.append(f"타입: {', '.join(verification['type_errors'])}")
+                        for line in feedback:
+                            print(f"    - {line}")
                         
-                        retry_benefit = self.step2_parse_benefit(
+                        # 이전 결과의 근거 확인은 더 이상 필요 없음
+                        if idx in step4_futures:
+                            step4_futures.pop(idx).cancel()
+                        
+                        retry_futures[executor.submit(
+                            self.step2_parse_benefit,
                             service_name,
-                            desc + f"\n\n주의사항:\n" + "\n".join(feedback),
+                            benefit_descriptions[idx] + f"\n\n주의사항:\n" + "\n".join(feedback),
                             target_text,
                             criteria_text,
-                            support_text
-                        )
-                        print("✅")
-                        
-                        # 재파싱 후에도 근거 확인
-                        print(f"  📝 Step 4-{idx}: 재파싱 근거 확인...", end=' ')
-                        reasoning = self.step4_explain_reasoning(
-                            f"{target_text}\n{criteria_text}\n{support_text}",
-                            retry_benefit
-                        )
-                        print("✅")
-                        
-                        # 재파싱 근거 출력 - 모든 필드 나열
-                        print(f"\n    ╔══════════════════════════════════════════════════════════════╗")
-                        print(f"    ║ 【재파싱 근거】                                              ║")
-                        print(f"    ╚══════════════════════════════════════════════════════════════╝")
-                        
-                        # AND 조건 - 값이 있는 필드
-                        and_filled = reasoning.get('and_filled_reasoning', {})
-                        if and_filled:
-                            print(f"\n    ✅ AND 조건 (값이 있는 필드):")
-                            for field, info in and_filled.items():
-                                print(f"       📌 {field}: {info.get('value')}")
-                                print(f"          └─ {info.get('reason')}")
-                        
-                        # OR 조건 - 값이 있는 필드
-                        or_filled = reasoning.get('or_filled_reasoning', {})
-                        if or_filled:
-                            print(f"\n    🔀 OR 조건 (값이 있는 필드):")
-                            for field, info in or_filled.items():
-                                print(f"       📌 {field}: {info.get('value')}")
-                                print(f"          └─ {info.get('reason')}")
-                        
-                        # AND 조건 - 값이 없는 필드
-                        and_empty = reasoning.get('and_empty_reasoning', {})
-                        if and_empty:
-                            print(f"\n    ⭕ AND 조건 (값이 없는 필드):")
-                            for field, info in and_empty.items():
-                                print(f"       📌 {field}: null")
-                                print(f"          └─ {info.get('reason')}")
-                        
-                        # 총 요약
-                        summary = reasoning.get('summary', {})
-                        if summary:
-                            print(f"\n    ╔══════════════════════════════════════════════════════════════╗")
-                            print(f"    ║ 【총 요약】                                                  ║")
-                            print(f"    ╚══════════════════════════════════════════════════════════════╝")
-                            
-                            if summary.get('core_conditions'):
-                                print(f"\n    💡 핵심: {summary['core_conditions']}")
-                            
-                            if summary.get('warnings'):
-                                print(f"\n    ⚠️  주의:")
-                                for warning in summary['warnings']:
-                                    print(f"       - {warning}")
-                            
-                            if summary.get('need_fix'):
-                                print(f"\n    🔧 수정 필요:")
-                                for fix in summary['need_fix']:
-                                    print(f"       - {fix}")
-                            
-                            print(f"\n    신뢰도: {summary.get('overall_confidence', '중간')}")
-                        
-                        print()
+                            support_text,
+                            examples
+                        )] = idx
+                    
+                    print(f"  🔄 재파싱 {len(retry_futures)}개 동시 실행...", end=' ')
+                    for future in as_completed(retry_futures):
+                        idx = retry_futures[future]
+                        benefits[idx] = future.result()
                         
-                        benefits.append(retry_benefit)
-                    else:
-                        benefits.append(benefit)
+                        # 재파싱 결과의 근거 확인은 끝나는 즉시 시작
+                        if self.explain_reasoning:
+                            step4_futures[idx] = executor.submit(self.step4_explain_reasoning, original_text, benefits[idx])
+                    print("✅")
+                
+                # Step 4: 근거 출력 (옵션)
+                for idx in sorted(step4_futures):
+                    title = "재파싱 근거" if idx in retry_indexes and max_retries > 0 else "파싱 근거"
+                    try:
+                        self.print_reasoning(step4_futures[idx].result(), f"혜택 {idx + 1} {title}")
+                    except Exception as e:
+                        print(f"    ⚠️ Step 4-{idx + 1} 근거 확인 실패: {str(e)[:50]}")
             
             return {"benefits": benefits}
             
@@ -739,15 +891,8 @@ JSON 형식으로 답하세요:
         and_cond = benefit.get('and_conditions', {})
         
         # 1. years → months 자동 변환
-        if 'age_min_years' in and_cond:
-            years = and_cond.pop('age_min_years')
-            and_cond['age_min_months'] = years * 12
-            print(f"    ⚠️ 수정: age_min_years: {years} → age_min_months: {years * 12}")
-        
-        if 'age_max_years' in and_cond:
-            years = and_cond.pop('age_max_years')
-            and_cond['age_max_months'] = years * 12
-            print(f"    ⚠️ 수정: age_max_years: {years} → age_max_months: {years * 12}")
+        for field, years, months in years_to_months(and_cond):
+            print(f"    ⚠️ 수정: {field}: {years} → {field.replace('years', 'months')}: {months}")
         
         # 2. False 값 제거
         for key, value in list(and_cond.items()):
@@ -760,6 +905,7 @@ JSON 형식으로 답하세요:
     def batch_parse_xml(self, xml_path, limit=None):
         """XML 파일 배치 파싱"""
         print(f"📂 XML 파일 읽기: {xml_path}")
+        region = os.path.basename(xml_path).replace('복지목록', '').replace('.xml', '')
         
         tree = ET.parse(xml_path)
         root = tree.getroot()
@@ -776,6 +922,7 @@ JSON 형식으로 답하세요:
         
         success_count = 0
         error_count = 0
+        start_time = time.time()
         
         for idx, serv in enumerate(serv_list, 1):
             service_id = serv.find('servId').text if serv.find('servId') is not None else ''
@@ -794,12 +941,22 @@ JSON 형식으로 답하세요:
                 criteria_text = ''
                 support_text = ''
             
+            # 사용량 장부: 지금부터의 호출은 이 서비스 것
+            if self.backend.ledger is not None:
+                self.backend.ledger.set_context(service_id=service_id, region=region, prompt_version=self.PROMPT_VERSION)
+            
+            # 프롬프트에는 압축본, 저장은 원문
+            if self.compactor:
+                prompt_texts = self.compactor.compact_service(target_text, criteria_text, support_text)
+            else:
+                prompt_texts = (target_text, criteria_text, support_text)
+            
             print(f"\n{'='*80}")
             print(f"[{idx}/{len(serv_list)}] {service_name}")
             print(f"{'='*80}")
             
             try:
-                parsed = self.parse_service(service_name, target_text, criteria_text, support_text)
+                parsed = self.parse_service(service_name, *prompt_texts, service_id=service_id)
                 
                 # 후처리
                 if parsed and 'benefits' in parsed:
@@ -837,6 +994,11 @@ JSON 형식으로 답하세요:
         print(f"✅ 성공: {success_count}개")
         print(f"❌ 실패: {error_count}개")
         print(f"📈 성공률: {success_count / len(serv_list) * 100:.1f}%")
+        if self.parsed_benefits:
+            first_pass = (self.parsed_benefits - self.reparsed_benefits) / self.parsed_benefits * 100
+            print(f"🔄 재파싱: {self.reparsed_benefits}/{self.parsed_benefits}개 혜택 (첫 파싱 정확도 {first_pass:.1f}%)")
+        print(f"⏱️ 소요 시간: {time.time() - start_time:.1f}초")
+        self.backend.print_stats()
         
         return services
     
@@ -849,18 +1011,35 @@ JSON 형식으로 답하세요:
 
 # 사용 예시
 if __name__ == '__main__':
-    import os
     from dotenv import load_dotenv
     from datetime import datetime
+    from llm_backends import create_backend
 
     load_dotenv()
-    API_KEY = os.getenv('OPENAI_API_KEY')
     
-    if not API_KEY:
-        print("❌ OPENAI_API_KEY를 .env 파일에 설정하세요!")
+    try:
+        backend = create_backend()  # .env의 LLM_BACKEND (openai | gemini | fake), LLM_CASSETTE (녹화/재생)
+    except ValueError as e:
+        print(f"❌ {e}")
         exit(1)
     
-    parser = WelfareParserV4_5(api_key=API_KEY)
+    # 텍스트 압축 (python 툴/text_compaction.py 로 학습한 상투 문구 파일이 있으면 사용)
+    from text_compaction import TextCompactor
+    compactor = TextCompactor.load('text_compaction_boilerplate.json') if os.path.exists('text_compaction_boilerplate.json') else TextCompactor()
+    
+    # Few-shot 인덱스 (정형화데이터/ 검증본, fewshot_index.pkl에 캐시)
+    import glob
+    from fewshot_index import FewShotIndex
+    fewshot_index = FewShotIndex.load_or_build(glob.glob('정형화데이터/정형화데이터_*.json'))
+    
+    parser = WelfareParserV4_5(
+        backend=backend,
+        max_workers=8,
+        explain_reasoning=False,  # True: Step 4 근거 출력 (호출 수 증가)
+        compactor=compactor,  # None: 원문 그대로 사용
+        fewshot_index=fewshot_index,  # None: few-shot 예시 없이 파싱
+        fewshot_k=2
+    )
     
     results = parser.batch_parse_xml(
         'wantedDtl포함된xml목록/복지목록울산.xml',
@@ -880,6 +1059,11 @@ if __name__ == '__main__':
     print("  1. Step 1: 혜택 개수 파악 + reasoning")
     print("  2. Step 2: 각 혜택 개별 파싱")
     print("  3. Step 3: 이해 확인 및 타입 검증 (필드별 설명)")
-    print("  4. Step 4: 파싱 근거 설명 (AND/OR 구분)")
+    print("  4. Step 4: 파싱 근거 설명 (AND/OR 구분, 옵션)")
     print("  5. 재파싱 시 구체적 피드백")
-    print("  6. AND household_type: 문자열, OR household_type: 배열")
\ No newline at end of file
+    print("  6. AND household_type: 문자열, OR household_type: 배열")
+    print("  7. 단계별 병렬 실행 (Step 2/3/재파싱 동시 요청)")
+    print("  8. Step 3 로컬 규칙 검증 (판단 불가일 때만 LLM 호출)")
+    print(f"  9. LLM 백엔드: {backend.name} ({backend.model})")
+    print("  10. 텍스트 압축 (공백/상투 문구 제거, 원문은 그대로 저장)")
+    print("  11. 검증본 유사 예시 few-shot (Step 2)")
\ No newline at end of file
@@ -4,21 +4,53 @@
 - ⭐ requires_parent_disability_level 추가
 - ⭐ 모든 필드 타입 명시 (숫자|문자열|true|null)
 - ⭐ and_conditions 모든 필드 필수! 값 없으면 null
+- ⭐ LLM 백엔드 선택 (openai | gemini | fake, llm_backends.py)
+- ⭐ 사용량 장부 (LLM_LEDGER, llm_ledger.py): 서비스/지역/프롬프트 버전별 토큰·비용
+- ⭐ 잘린 응답 복구: 완성된 혜택은 살리고 나머지 혜택만 다시 요청 (json_repair.py)
+- ⭐ 스트리밍 옵션 (stream=True): 받는 중에 구조 위반(최상위 and_conditions, 나이 년 단위)이 보이면 바로 중단 + 재시도
+  (재시도는 감시 없이 끝까지 받고 자동 수정: 최상위 조건 → 혜택에 병합, 년 → 개월)
+- ⭐ 텍스트 압축 옵션 (text_compaction.py, 원문은 original_data에 그대로 저장)
 """
 import json
+import os
+import time
 from datetime import datetime
-from openai import OpenAI
 import xml.etree.ElementTree as ET
 
+from json_repair import JSONKeyWatcher, PartialJSON
+from llm_backends import OpenAIBackend
+from welfare_schema import AGE_YEARS_FIELDS, AND_FIELDS, years_to_months
+
+# 스트리밍 중 보이면 바로 중단할 키
+# - 조건은 반드시 benefits[] 안에 (인수인계 문서: 최상위 and_conditions 금지)
+# - 나이는 개월 단위 (age_*_months)
+STREAM_FORBIDDEN_TOP_LEVEL = ('and_conditions', 'or_conditions')
+STREAM_FORBIDDEN_KEYS = ('age_min_years', 'age_max_years')
+
 class WelfareParserV4_5:
-    def __init__(self, api_key):
-        """OpenAI API 초기화"""
-        self.client = OpenAI(api_key=api_key)
-        self.model = "gpt-4o-mini"
+    PROMPT_VERSION = "v4.5-parse"  # 프롬프트를 바꾸면 올려주세요 (사용량 장부에서 버전별 비교)
+    SYSTEM_PROMPT = "You are a welfare data parser. ALL fields in and_conditions are REQUIRED. If no value, use null. Follow the exact JSON structure."
+    
+    def __init__(self, api_key=None, backend=None, compactor=None, stream=False):
+        """LLM 백엔드 초기화 (backend가 없으면 OpenAI 사용)
+        
+        compactor: TextCompactor (text_compaction.py), 있으면 프롬프트에 압축한 텍스트 사용
+        stream: True면 응답을 스트리밍으로 받으면서 구조 위반 감시 (위반 시 바로 재시도, 재시도는 감시 없이)
+        """
+        self.backend = backend or OpenAIBackend(api_key=api_key)
+        self.model = self.backend.model
+        self.compactor = compactor
+        self.stream = stream
+        
+        # 잘린 응답 복구 통계
+        self.max_continuations = 2
+        self.salvaged_calls = 0
+        self.salvaged_benefits = 0
     
-    def parse_service(self, service_name, target_text, criteria_text, support_text, max_retries=3):
-        """GPT로 파싱 (재시도 로직 포함)"""
-        prompt = f"""
+    @staticmethod
+    def build_prompt(service_name, target_text, criteria_text, support_text):
+        """파싱 프롬프트 생성 (비용 예측에서도 사용)"""
+        return f"""
 복지 서비스 정보를 정형 데이터로 변환하세요.
 
 서비스명: {service_name}
@@ -169,68 +201,109 @@ class WelfareParserV4_5:
 
 JSON만 반환하세요. 설명 없이!
 """
+    
+    @staticmethod
+    def build_rest_prompt(prompt, received):
+        """잘린 응답 이후 나머지 혜택만 요청하는 프롬프트"""
+        lines = []
+        for benefit in received:
+            amount = benefit.get('amount')
+            amount_text = f"{amount}{benefit.get('amount_unit') or ''}" if amount else "금액 없음"
+            lines.append(f"- {benefit.get('description') or ''} ({amount_text})")
         
-        import time
+        return prompt + f"""
+
+【이어서 작성】
+이전 응답이 중간에 잘렸습니다. 아래 혜택 {len(received)}개는 이미 받았습니다 (다시 반환하지 마세요):
+{chr(10).join(lines)}
+
+나머지 혜택만 같은 JSON 형식 {{"benefits": [...]}}으로 반환하세요. 남은 혜택이 없으면 {{"benefits": []}}
+"""
+    
+    @staticmethod
+    def watcher_factory():
+        """call_json용 감시자 생성 함수 (첫 시도만 감시)
         
-        for attempt in range(max_retries):
-            try:
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=[
-                        {"role": "system", "content": "You are a welfare data parser. ALL fields in and_conditions are REQUIRED. If no value, use null. Follow the exact JSON structure."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    temperature=0.1,
-                    response_format={"type": "json_object"}
-                )
-                
-                result = json.loads(response.choices[0].message.content)
-                
-                # 구조 검증
-                if result and 'benefits' in result:
-                    for benefit in result['benefits']:
-                        benefit = self.validate_benefit_structure(benefit, "current_service")
-                
-                return result
-                
-            except Exception as e:
-                error_msg = str(e)
-                
-                if "rate_limit" in error_msg.lower() or "429" in error_msg:
-                    wait_time = (attempt + 1) * 10
-                    print(f"⏳ (Rate limit, {wait_time}초 대기 후 재시도 {attempt + 1}/{max_retries})", end=' ')
-                    time.sleep(wait_time)
-                    continue
-                
-                elif attempt < max_retries - 1:
-                    wait_time = 3
-                    print(f"⏳ (오류, {wait_time}초 대기 후 재시도 {attempt + 1}/{max_retries})", end=' ')
-                    time.sleep(wait_time)
-                    continue
-                else:
-                    print(f"❌ 최종 실패: {error_msg[:50]}")
-                    return {"benefits": []}
+        같은 프롬프트로 다시 보내면 대개 같은 위반이 나옴 → 재시도는 끝까지 받고
+        lift_top_level_conditions / fix_parsed_data로 고쳐서 사용 (빈 결과로 버리지 않음)
+        """
+        attempts = []
+        
+        def make_watcher():
+            attempts.append(None)
+            if len(attempts) > 1:
+                return None
+            return JSONKeyWatcher(STREAM_FORBIDDEN_TOP_LEVEL, STREAM_FORBIDDEN_KEYS)
+        
+        return make_watcher
+    
+    @staticmethod
+    def lift_top_level_conditions(result, benefits):
+        """최상위 and_conditions / or_conditions → 각 혜택에 병합 (혜택에 값이 있으면 유지)"""
+        for group in STREAM_FORBIDDEN_TOP_LEVEL:
+            top = result.pop(group, None)
+            if not isinstance(top, dict) or not benefits:
+                continue
+            print(f"    ⚠️ 최상위 {group} → 혜택 {len(benefits)}개에 병합")
+            for benefit in benefits:
+                cond = benefit.get(group)
+                if not isinstance(cond, dict):
+                    cond = benefit[group] = {}
+                for key, value in top.items():
+                    if cond.get(key) is None:
+                        cond[key] = value
+    
+    def parse_service(self, service_name, target_text, criteria_text, support_text, max_retries=3, service_id=None):
+        """GPT로 파싱 (재시도 로직 포함)
+        
+        응답이 잘리면 완성된 혜택은 그대로 쓰고 나머지 혜택만 다시 요청 (최대 max_continuations회)
+        service_id: 4단계 파서와 같은 호출 형식용 (few-shot이 없어서 사용 안 함)
+        """
+        prompt = self.build_prompt(service_name, target_text, criteria_text, support_text)
         
-        return {"benefits": []}
+        result = {}
+        benefits = []
+        request, step = prompt, "parse"
+        try:
+            for _ in range(self.max_continuations + 1):
+                try:
+                    result = self.backend.call_json(
+                        self.SYSTEM_PROMPT,
+                        request,
+                        step=step,
+                        max_retries=max_retries,
+                        partial_key="benefits",
+                        watcher=self.watcher_factory() if self.stream else None
+                    )
+                    benefits.extend(result.get('benefits') or [])
+                    break
+                except PartialJSON as e:
+                    benefits.extend(e.items)
+                    self.salvaged_calls += 1
+                    self.salvaged_benefits += len(e.items)
+                    print(f"🩹 (잘린 응답에서 혜택 {len(e.items)}개 복구, 나머지 요청)", end=' ')
+                    request, step = self.build_rest_prompt(prompt, benefits), "parse_rest"
+        except Exception as e:
+            if not benefits:
+                print(f"❌ 최종 실패: {str(e)[:50]}")
+                return {"benefits": []}
+            print(f"⚠️ 나머지 요청 실패, 복구한 혜택 {len(benefits)}개만 사용: {str(e)[:50]}")
+        
+        result = dict(result or {})
+        result['benefits'] = benefits
+        self.lift_top_level_conditions(result, benefits)
+        
+        # 구조 검증
+        if result and 'benefits' in result:
+            for benefit in result['benefits']:
+                benefit = self.validate_benefit_structure(benefit, "current_service")
+        
+        return result
     
     def validate_benefit_structure(self, benefit, service_name):
         """혜택 구조 검증"""
-        required_fields = [
-            'age_min_months', 'age_max_months',
-            'income_type', 'income_min_percent', 'income_max_percent',
-            'household_type', 'household_members_min', 'household_members_max',
-            'children_min', 'children_max', 'birth_order','birth_order_min','birth_order_max',
-            'residence_min_months',
-            'childcare_type', 'requires_grandparent_care', 'requires_dual_income',
-            'requires_disability', 'requires_parent_disability', 'child_disability_level',
-            'child_has_serious_disease', 'child_has_rare_disease', 'child_has_chronic_disease', 'child_has_cancer',
-            'parent_has_serious_disease', 'parent_has_rare_disease', 'parent_has_chronic_disease', 'parent_has_cancer', 'parent_has_infertility',
-            'is_violence_victim', 'is_abuse_victim', 'is_defector', 'is_national_merit', 'is_foster_child', 'is_single_mother', 'is_low_income',
-            'pregnancy_weeks_min', 'pregnancy_weeks_max', 'birth_within_months',
-            'limit_birth_date',
-            'education_level', 'is_enrolled',
-            'housing_type'
-        ]
+        # parent_disability_level은 OR 조건에만 사용 (프롬프트 규칙 2)
+        required_fields = [field for field in AND_FIELDS if field != 'parent_disability_level']
         
         and_cond = benefit.get('and_conditions', {})
         
@@ -242,8 +315,8 @@ JSON만 반환하세요. 설명 없이!
             for field in missing:
                 and_cond[field] = None
         
-        # 불필요한 필드 체크
-        extra = [f for f in and_cond.keys() if f not in required_fields]
+        # 불필요한 필드 체크 (년 단위 나이는 fix_parsed_data에서 개월로 변환)
+        extra = [f for f in and_cond.keys() if f not in required_fields and f not in AGE_YEARS_FIELDS]
         
         if extra:
             print(f"    ⚠️ 불필요한 필드 제거: {extra}")
@@ -262,11 +335,17 @@ JSON만 반환하세요. 설명 없이!
                 and_cond[key] = None
                 print(f"    ⚠️ 수정: {key}: false → null")
         
+        # 년 → 개월 변환
+        for cond in (and_cond, benefit.get('or_conditions') or {}):
+            for years_field, years, months in years_to_months(cond):
+                print(f"    ⚠️ 수정: {years_field}: {years}년 → {months}개월")
+        
         return benefit
     
     def batch_parse_xml(self, xml_path, limit=None):
         """XML 파일 배치 파싱"""
         print(f"📂 XML 파일 읽기: {xml_path}")
+        region = os.path.basename(xml_path).replace('복지목록', '').replace('.xml', '')
         
         tree = ET.parse(xml_path)
         root = tree.getroot()
@@ -283,6 +362,7 @@ JSON만 반환하세요. 설명 없이!
         
         success_count = 0
         error_count = 0
+        start_time = time.time()
         error_services = []
         
         for idx, serv in enumerate(serv_list, 1):
@@ -302,10 +382,20 @@ JSON만 반환하세요. 설명 없이!
                 criteria_text = ''
                 support_text = ''
             
+            # 사용량 장부: 지금부터의 호출은 이 서비스 것
+            if self.backend.ledger is not None:
+                self.backend.ledger.set_context(service_id=service_id, region=region, prompt_version=self.PROMPT_VERSION)
+            
+            # 프롬프트에는 압축본, 저장은 원문
+            if self.compactor:
+                prompt_texts = self.compactor.compact_service(target_text, criteria_text, support_text)
+            else:
+                prompt_texts = (target_text, criteria_text, support_text)
+            
             print(f"[{idx}/{len(serv_list)}] {service_name[:50]}...", end=' ')
             
             try:
-                parsed = self.parse_service(service_name, target_text, criteria_text, support_text)
+                parsed = self.parse_service(service_name, *prompt_texts, service_id=service_id)
                 
                 # 후처리
                 if parsed and 'benefits' in parsed:
@@ -347,6 +437,11 @@ JSON만 반환하세요. 설명 없이!
         print(f"✅ 성공: {success_count}개")
         print(f"❌ 실패: {error_count}개")
         print(f"📈 성공률: {success_count / len(serv_list) * 100:.1f}%")
+        if self.salvaged_calls:
+            print(f"🩹 잘린 응답 복구: {self.salvaged_calls}회 (혜택 {self.salvaged_benefits}개 재사용, 나머지만 요청)")
+        print(f"⏱️ 소요 시간: {time.time() - start_time:.1f}초")
+        self.backend.print_stream_stats()
+        self.backend.print_stats()
         
         if error_services:
             print(f"\n⚠️ 오류 발생 서비스:")
@@ -366,17 +461,22 @@ JSON만 반환하세요. 설명 없이!
 
 # 사용 예시
 if __name__ == '__main__':
-    import os
     from dotenv import load_dotenv
+    from llm_backends import create_backend
 
     load_dotenv()
-    API_KEY = os.getenv('OPENAI_API_KEY')
     
-    if not API_KEY:
-        print("❌ OPENAI_API_KEY를 .env 파일에 설정하세요!")
+    try:
+        backend = create_backend()  # .env의 LLM_BACKEND (openai | gemini | fake), LLM_CASSETTE (녹화/재생)
+    except ValueError as e:
+        print(f"❌ {e}")
         exit(1)
     
-    parser = WelfareParserV4_5(api_key=API_KEY)
+    # 텍스트 압축 (python 툴/text_compaction.py 로 학습한 상투 문구 파일이 있으면 사용)
+    from text_compaction import TextCompactor
+    compactor = TextCompactor.load('text_compaction_boilerplate.json') if os.path.exists('text_compaction_boilerplate.json') else TextCompactor()
+    
+    parser = WelfareParserV4_5(backend=backend, compactor=compactor, stream=True)
     
     results = parser.batch_parse_xml(
         'wantedDtl포함된xml목록/복지목록경기.xml',
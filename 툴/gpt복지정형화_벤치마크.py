@@ -0,0 +1,327 @@
+"""
+파싱 품질 + 처리량 벤치마크 (골든셋 = 수작업 검증본 정형화데이터/)
+- ⭐ 검증본에서 골든셋을 고정 seed로 뽑아서 파서 실행 (실제 호출 또는 카세트 재생)
+- ⭐ and_conditions / or_conditions 필드 단위 precision / recall (필드별 상세 포함)
+- ⭐ 혜택 개수 정확도, 서비스당 호출 수 / 토큰 수, 초당 서비스 수
+- ⭐ 결과는 JSON 리포트 → 버전끼리 비교 (--compare)
+
+사용법:
+  python 툴/gpt복지정형화_벤치마크.py                     → 벤치마크 실행 (.env의 LLM_BACKEND / LLM_CASSETTE)
+  python 툴/gpt복지정형화_벤치마크.py --compare a.json b.json → 두 리포트 비교
+
+재현 가능한 비교: LLM_CASSETTE=benchmark.cassette.gz 로 한 번 녹화 → 이후 LLM_CASSETTE_MODE=replay
+"""
+import glob
+import json
+import os
+import random
+import time
+from collections import defaultdict
+from datetime import datetime
+
+from llm_backends import HedgedBackend
+from llm_ledger import SUCCESS_OUTCOMES, UsageLedger
+
+CONDITION_GROUPS = ('and_conditions', 'or_conditions')
+
+
+def golden_set(json_paths, size=40, seed=0):
+    """검증본에서 혜택이 있는 서비스를 고정 seed로 size개 선택 → [(지역, 서비스)]"""
+    candidates = []
+    for path in sorted(json_paths):
+        region = os.path.basename(path).replace('정형화데이터_', '').replace('.json', '')
+        with open(path, 'r', encoding='utf-8') as f:
+            for service in json.load(f):
+                if (service.get('parsed_data') or {}).get('benefits'):
+                    candidates.append((region, service))
+
+    if size and size < len(candidates):
+        candidates = random.Random(seed).sample(candidates, size)
+    return sorted(candidates, key=lambda item: item[1].get('service_id') or '')
+
+
+def _normalize(value):
+    if isinstance(value, list):
+        return tuple(sorted(str(item).strip() for item in value))
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)):
+        return float(value)
+    return str(value).strip()
+
+
+def condition_pairs(benefit, group):
+    """혜택 1개의 (필드, 값) 집합 (값 없는 필드 제외)"""
+    return {
+        (field, _normalize(value))
+        for field, value in ((benefit or {}).get(group) or {}).items()
+        if value not in (None, False, [], '')
+    }
+
+
+def match_benefits(expected, predicted):
+    """검증 혜택 ↔ 파싱 혜택 짝짓기 (겹치는 조건이 많은 순서로 greedy)"""
+    scores = []
+    for i, exp in enumerate(expected):
+        exp_pairs = condition_pairs(exp, 'and_conditions') | condition_pairs(exp, 'or_conditions')
+        for j, pred in enumerate(predicted):
+            pred_pairs = condition_pairs(pred, 'and_conditions') | condition_pairs(pred, 'or_conditions')
+            union = exp_pairs | pred_pairs
+            overlap = len(exp_pairs & pred_pairs) / len(union) if union else 1.0
+            same_amount = exp.get('amount') == pred.get('amount')
+            scores.append((overlap + 0.5 * same_amount, i, j))
+
+    pairs = []
+    used_expected, used_predicted = set(), set()
+    for _, i, j in sorted(scores, reverse=True):
+        if i in used_expected or j in used_predicted:
+            continue
+        used_expected.add(i)
+        used_predicted.add(j)
+        pairs.append((i, j))
+
+    unmatched_expected = [i for i in range(len(expected)) if i not in used_expected]
+    unmatched_predicted = [j for j in range(len(predicted)) if j not in used_predicted]
+    return pairs, unmatched_expected, unmatched_predicted
+
+
+def score_service(expected, predicted, counts):
+    """서비스 1개 채점 → counts[group][field] = {tp, fp, fn} 누적"""
+    pairs, missing, extra = match_benefits(expected, predicted)
+
+    comparisons = [(expected[i], predicted[j]) for i, j in pairs]
+    comparisons += [(expected[i], {}) for i in missing]
+    comparisons += [({}, predicted[j]) for j in extra]
+
+    for exp, pred in comparisons:
+        for group in CONDITION_GROUPS:
+            exp_pairs = condition_pairs(exp, group)
+            pred_pairs = condition_pairs(pred, group)
+            for field, _ in exp_pairs & pred_pairs:
+                counts[group][field]["tp"] += 1
+            for field, _ in pred_pairs - exp_pairs:
+                counts[group][field]["fp"] += 1
+            for field, _ in exp_pairs - pred_pairs:
+                counts[group][field]["fn"] += 1
+
+
+def precision_recall(tp, fp, fn):
+    precision = tp / (tp + fp) if tp + fp else None
+    recall = tp / (tp + fn) if tp + fn else None
+    if precision and recall:
+        f1 = 2 * precision * recall / (precision + recall)
+    else:
+        f1 = 0.0 if precision is not None and recall is not None else None
+    return {"precision": precision, "recall": recall, "f1": f1, "tp": tp, "fp": fp, "fn": fn}
+
+
+class ParseBenchmark:
+    def __init__(self, parser, golden):
+        """
+        parser: WelfareParserV4_5 (단일 호출 / 4단계 어느 쪽이든, parse_service + fix_parsed_data 사용)
+        golden: golden_set() 결과
+        """
+        self.parser = parser
+        self.golden = golden
+
+    def run(self):
+        """골든셋 전체 실행 → 리포트 딕셔너리"""
+        backend = self.parser.backend
+        ledger = UsageLedger()  # 메모리 기록
+        # 카세트 안쪽의 HedgedBackend도 버린 응답 사용량을 기록 (create_backend와 같은 연결) → 같이 교체
+        backends = [backend]
+        if isinstance(getattr(backend, 'inner', None), HedgedBackend):
+            backends.append(backend.inner)
+        previous_ledgers = [item.ledger for item in backends]
+        for item in backends:
+            item.ledger = ledger
+
+        counts = {group: defaultdict(lambda: {"tp": 0, "fp": 0, "fn": 0}) for group in CONDITION_GROUPS}
+        per_service = []
+        count_correct = 0
+        compactor = getattr(self.parser, 'compactor', None)
+
+        start_time = time.time()
+        try:
+            for idx, (region, service) in enumerate(self.golden, 1):
+                original = service.get('original_data') or {}
+                texts = (original.get('target_text') or '', original.get('criteria_text') or '',
+                         original.get('support_text') or '')
+                if compactor:
+                    texts = compactor.compact_service(*texts)
+
+                ledger.set_context(service_id=service.get('service_id'), region=region,
+                                   prompt_version=getattr(self.parser, 'PROMPT_VERSION', None))
+                print(f"[{idx}/{len(self.golden)}] {service['service_name'][:50]}...", end=' ')
+                service_start = time.time()
+
+                try:
+                    # service_id → 이 서비스의 검증본(정답)은 few-shot 예시로 쓰지 않음
+                    parsed = self.parser.parse_service(service['service_name'], *texts,
+                                                       service_id=service.get('service_id'))
+                    predicted = [self.parser.fix_parsed_data(benefit) for benefit in parsed.get('benefits', [])]
+                    error = None
+                except Exception as e:
+                    predicted = []
+                    error = str(e)[:100]
+
+                expected = service['parsed_data']['benefits']
+                score_service(expected, predicted, counts)
+                count_correct += len(expected) == len(predicted)
+
+                per_service.append({
+                    "service_id": service.get('service_id'),
+                    "region": region,
+                    "expected_benefits": len(expected),
+                    "predicted_benefits": len(predicted),
+                    "seconds": round(time.time() - service_start, 3),
+                    "error": error
+                })
+                print("✅" if len(expected) == len(predicted) else f"⚠️ (혜택 {len(predicted)}/{len(expected)})")
+        finally:
+            for item, previous in zip(backends, previous_ledgers):
+                item.ledger = previous
+
+        elapsed = time.time() - start_time
+        return self.build_report(counts, per_service, count_correct, ledger.entries, elapsed)
+
+    def build_report(self, counts, per_service, count_correct, entries, elapsed):
+        services = len(per_service) or 1
+        calls_by_service = defaultdict(int)
+        for entry in entries:
+            calls_by_service[entry['service_id']] += 1
+        for row in per_service:
+            row["calls"] = calls_by_service.get(row["service_id"], 0)
+
+        groups = {}
+        fields = {}
+        for group in CONDITION_GROUPS:
+            totals = {"tp": 0, "fp": 0, "fn": 0}
+            for field, row in sorted(counts[group].items()):
+                fields[f"{group}.{field}"] = precision_recall(row["tp"], row["fp"], row["fn"])
+                for key in totals:
+                    totals[key] += row[key]
+            groups[group] = precision_recall(totals["tp"], totals["fp"], totals["fn"])
+
+        backend = self.parser.backend
+        return {
+            "created_at": datetime.now().isoformat(timespec='seconds'),
+            "parser": type(self.parser).__module__,
+            "prompt_version": getattr(self.parser, 'PROMPT_VERSION', None),
+            "backend": backend.name,
+            "model": backend.model,
+            "services": len(per_service),
+            "metrics": {
+                "and_conditions": groups["and_conditions"],
+                "or_conditions": groups["or_conditions"],
+                "benefit_count_accuracy": count_correct / services,
+                "calls_per_service": len(entries) / services,
+                "failed_calls": sum(entry['outcome'] not in SUCCESS_OUTCOMES for entry in entries),
+                "input_tokens_per_service": sum(entry['input_tokens'] for entry in entries) / services,
+                "output_tokens_per_service": sum(entry['output_tokens'] for entry in entries) / services,
+                "services_per_second": len(per_service) / elapsed if elapsed else None,
+                "elapsed_seconds": round(elapsed, 2)
+            },
+            "fields": fields,
+            "per_service": per_service
+        }
+
+
+def _fmt(value, percent=True):
+    if value is None:
+        return "-"
+    return f"{value * 100:.1f}%" if percent else f"{value:,.2f}"
+
+
+def print_summary(report):
+    metrics = report["metrics"]
+    print(f"\n{'='*80}")
+    print(f"📏 벤치마크 결과 ({report['parser']}, {report['prompt_version']}, {report['backend']}/{report['model']})")
+    print(f"{'='*80}")
+    for group in CONDITION_GROUPS:
+        row = metrics[group]
+        print(f"  {group}: precision {_fmt(row['precision'])}, recall {_fmt(row['recall'])}, f1 {_fmt(row['f1'])}")
+    print(f"  혜택 개수 정확도: {_fmt(metrics['benefit_count_accuracy'])}")
+    print(f"  서비스당 호출: {_fmt(metrics['calls_per_service'], False)}회 (실패 {metrics['failed_calls']}회)")
+    print(f"  서비스당 토큰: 입력 {_fmt(metrics['input_tokens_per_service'], False)} / "
+          f"출력 {_fmt(metrics['output_tokens_per_service'], False)}")
+    print(f"  처리량: {_fmt(metrics['services_per_second'], False)} 서비스/초 ({metrics['elapsed_seconds']}초)")
+
+    worst = sorted(
+        (item for item in report["fields"].items() if item[1]["fn"] + item[1]["fp"]),
+        key=lambda item: item[1]["fn"] + item[1]["fp"],
+        reverse=True
+    )
+    if worst:
+        print("\n  틀린 필드 상위 10개:")
+        for field, row in worst[:10]:
+            print(f"    - {field}: 누락 {row['fn']}, 잘못 추가 {row['fp']}")
+
+
+def compare_reports(path_a, path_b):
+    """두 리포트의 주요 지표 비교 (B - A)"""
+    with open(path_a, 'r', encoding='utf-8') as f:
+        a = json.load(f)
+    with open(path_b, 'r', encoding='utf-8') as f:
+        b = json.load(f)
+
+    rows = [
+        ("and precision", a["metrics"]["and_conditions"]["precision"], b["metrics"]["and_conditions"]["precision"]),
+        ("and recall", a["metrics"]["and_conditions"]["recall"], b["metrics"]["and_conditions"]["recall"]),
+        ("or precision", a["metrics"]["or_conditions"]["precision"], b["metrics"]["or_conditions"]["precision"]),
+        ("or recall", a["metrics"]["or_conditions"]["recall"], b["metrics"]["or_conditions"]["recall"]),
+        ("혜택 개수 정확도", a["metrics"]["benefit_count_accuracy"], b["metrics"]["benefit_count_accuracy"]),
+        ("서비스당 호출", a["metrics"]["calls_per_service"], b["metrics"]["calls_per_service"]),
+        ("서비스당 입력 토큰", a["metrics"]["input_tokens_per_service"], b["metrics"]["input_tokens_per_service"]),
+        ("서비스당 출력 토큰", a["metrics"]["output_tokens_per_service"], b["metrics"]["output_tokens_per_service"]),
+        ("서비스/초", a["metrics"]["services_per_second"], b["metrics"]["services_per_second"]),
+    ]
+
+    print(f"\n📊 A: {path_a} ({a['prompt_version']}, {a['model']})")
+    print(f"📊 B: {path_b} ({b['prompt_version']}, {b['model']})")
+    for name, value_a, value_b in rows:
+        delta = f"{value_b - value_a:+.3f}" if value_a is not None and value_b is not None else "-"
+        print(f"  {name}: {value_a if value_a is None else round(value_a, 3)} → "
+              f"{value_b if value_b is None else round(value_b, 3)} ({delta})")
+
+
+# 사용 예시
+if __name__ == '__main__':
+    import sys
+
+    if '--compare' in sys.argv:
+        index = sys.argv.index('--compare')
+        compare_reports(sys.argv[index + 1], sys.argv[index + 2])
+        exit(0)
+
+    from dotenv import load_dotenv
+    from llm_backends import create_backend
+
+    load_dotenv()
+
+    try:
+        backend = create_backend()  # 재현 가능한 비교: LLM_CASSETTE + LLM_CASSETTE_MODE=replay
+    except ValueError as e:
+        print(f"❌ {e}")
+        exit(1)
+
+    mode = "parse"  # "parse" (단일 호출) | "4step"
+    if mode == "parse":
+        from gpt복지정형화_강제필드_4_5_limitBirth_추가 import WelfareParserV4_5
+        parser = WelfareParserV4_5(backend=backend)
+    else:
+        from gpt복지정형화_v4_6_4step import WelfareParserV4_5
+        parser = WelfareParserV4_5(backend=backend, max_workers=8)
+
+    golden = golden_set(glob.glob('정형화데이터/정형화데이터_*.json'), size=40, seed=0)
+    print(f"🏅 골든셋: {len(golden)}개 서비스 (seed=0)")
+
+    report = ParseBenchmark(parser, golden).run()
+    print_summary(report)
+
+    timestamp = datetime.now().strftime("%m%d_%H%M")
+    output_path = f"benchmark_{mode}_{report['prompt_version']}_{timestamp}.json"
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 리포트 저장: {output_path}")
+    backend.print_stats()
@@ -0,0 +1,270 @@
+"""
+파싱 비용 예측 (dry-run, API 호출 없음)
+- ⭐ 실제 프롬프트 템플릿 + 서비스 텍스트로 로컬 토큰 계산 (tiktoken, 없으면 근사치)
+- ⭐ 입력/출력 토큰, 비용, 예상 소요 시간 (동시 실행 수 + rate limit 반영)
+- ⭐ 예산을 넘는 이상치 서비스 표시
+- ⭐ XML은 스트리밍으로 읽음 (지역 전체도 몇 초 안에 끝남)
+- ⭐ 파서와 같은 옵션 반영: 텍스트 압축 (compactor) / Step 2 few-shot 예시 (fewshot_index, 4step만)
+  → 파서에 넘기는 것과 같은 객체를 넘겨야 실제 프롬프트와 같은 토큰 수 (안 넘기면 압축/예시 없이 계산)
+"""
+import statistics
+import time
+
+from llm_backends import FakeBackend
+from welfare_xml import iter_services
+
+# 모델별 가격 (USD / 1M 토큰: 입력, 캐시된 입력, 출력)
+MODEL_PRICES = {
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+    "gpt-4o": (2.50, 1.25, 10.00),
+    "gemini-2.5-flash": (0.30, 0.075, 2.50),
+    "gemini-2.5-pro": (1.25, 0.31, 10.00),
+}
+
+# 호출 1회당 예상 출력 토큰 (parse / step2는 혜택 1개 기준)
+OUTPUT_TOKENS = {
+    "parse": 1100,
+    "step1": 200,
+    "step2": 900,
+    "step3": 150,
+    "step4": 900,
+}
+
+# 메시지 포맷 오버헤드 (system + user)
+MESSAGE_OVERHEAD_TOKENS = 11
+
+# 응답 생성 속도 (토큰/초) + 기본 지연 (초) → 호출당 예상 지연시간
+OUTPUT_TOKENS_PER_SECOND = 80
+BASE_LATENCY_SECONDS = 0.6
+
+
+def approx_tokens(text):
+    """tiktoken이 없을 때 근사치 (한글 1자 ≈ 1토큰, 그 외 4자 ≈ 1토큰, 보수적)"""
+    hangul = sum(1 for ch in text if '가' <= ch <= '힣')
+    return hangul + (len(text) - hangul + 3) // 4
+
+
+def make_token_counter(model):
+    """(토큰 계산 함수, 방식 이름)"""
+    try:
+        import tiktoken
+    except ImportError:
+        return approx_tokens, "근사치 (tiktoken 없음)"
+
+    try:
+        encoding = tiktoken.encoding_for_model(model)
+    except KeyError:
+        encoding = tiktoken.get_encoding("o200k_base")
+    return (lambda text: len(encoding.encode(text))), f"tiktoken ({encoding.name})"
+
+
+class ParseCostEstimator:
+    def __init__(self, model="gpt-4o-mini", mode="parse", concurrency=1, rpm=500, tpm=200000,
+                 benefits_per_service=1.4, llm_verify_ratio=0.3, explain_reasoning=False,
+                 max_service_tokens=12000, compactor=None, fewshot_index=None, fewshot_k=2):
+        """
+        mode: "parse" (단일 호출 파서) | "4step" (4단계 파서)
+        concurrency: 동시 요청 수 (batch_parse_xml은 현재 1)
+        rpm / tpm: 분당 요청 수 / 분당 토큰 수 한도
+        benefits_per_service: 서비스당 평균 혜택 수 (정형화데이터 기준 약 1.35)
+        llm_verify_ratio: 4step에서 로컬 검증으로 판단 못 해 LLM 검증하는 비율
+        max_service_tokens: 서비스 1개가 이 토큰(입력+출력)을 넘으면 이상치로 표시
+        compactor: TextCompactor (text_compaction.py), 파서가 압축한 텍스트를 쓰면 같은 것을 넘김
+        fewshot_index / fewshot_k: 4step 파서의 Step 2 few-shot 예시 (fewshot_index.py)
+        """
+        if mode not in ("parse", "4step"):
+            raise ValueError(f"알 수 없는 모드: {mode} (parse | 4step)")
+
+        self.model = model
+        self.mode = mode
+        self.concurrency = concurrency
+        self.rpm = rpm
+        self.tpm = tpm
+        self.benefits_per_service = benefits_per_service
+        self.llm_verify_ratio = llm_verify_ratio
+        self.explain_reasoning = explain_reasoning
+        self.max_service_tokens = max_service_tokens
+        self.compactor = compactor
+        self.fewshot_index = fewshot_index if mode == "4step" else None
+        self.fewshot_k = fewshot_k
+        self.count_tokens, self.tokenizer_name = make_token_counter(model)
+
+        if mode == "parse":
+            from gpt복지정형화_강제필드_4_5_limitBirth_추가 import WelfareParserV4_5
+            self.parser = WelfareParserV4_5(backend=FakeBackend())
+        else:
+            from gpt복지정형화_v4_6_4step import WelfareParserV4_5
+            self.parser = WelfareParserV4_5(backend=FakeBackend())
+            self.step3_template_tokens = self.measure_template(self.parser.step3_verify_parsing)
+            self.step4_template_tokens = self.measure_template(self.parser.step4_explain_reasoning)
+
+    def measure_template(self, step_fn):
+        """Step 3/4 프롬프트의 고정 부분 토큰 수 (원문 없이 한 번 만들어서 측정)"""
+        step_fn("", {"and_conditions": {}, "or_conditions": {}})
+        _, prompt = self.parser.backend.calls[-1]
+        return self.count_tokens(prompt)
+
+    def latency(self, output_tokens):
+        return BASE_LATENCY_SECONDS + output_tokens / OUTPUT_TOKENS_PER_SECOND
+
+    def estimate_service(self, service):
+        """서비스 1개 → {calls, input_tokens, output_tokens, latency}"""
+        name = service['service_name'] or ''
+        target = service['target_text'] or ''
+        criteria = service['criteria_text'] or ''
+        support = service['support_text'] or ''
+        benefits = self.benefits_per_service
+
+        # 파서와 같이 프롬프트에는 압축본 사용
+        if self.compactor:
+            target, criteria, support = self.compactor.compact_service(target, criteria, support)
+
+        if self.mode == "parse":
+            prompt = self.parser.build_prompt(name, target, criteria, support)
+            input_tokens = self.count_tokens(self.parser.SYSTEM_PROMPT) + self.count_tokens(prompt) + MESSAGE_OVERHEAD_TOKENS
+            output_tokens = OUTPUT_TOKENS["parse"] * benefits
+            return {
+                "calls": 1,
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "latency": self.latency(output_tokens)
+            }
+
+        systems = self.parser.SYSTEM_PROMPTS
+        text_tokens = self.count_tokens(f"{target}\n{criteria}\n{support}")
+
+        step1 = self.count_tokens(systems["step1"]) + MESSAGE_OVERHEAD_TOKENS + self.count_tokens(
+            self.parser.build_step1_prompt(name, target, criteria, support))
+        examples = ""
+        if self.fewshot_index:
+            scored = self.fewshot_index.search(name, target, criteria, support, k=self.fewshot_k,
+                                               service_id=service['service_id'])
+            examples = self.fewshot_index.format_examples(scored)
+        step2 = self.count_tokens(systems["step2"]) + MESSAGE_OVERHEAD_TOKENS + self.count_tokens(
+            self.parser.build_step2_prompt(name, "대상자 - 지원내용", target, criteria, support, examples))
+        step3 = self.step3_template_tokens + text_tokens + MESSAGE_OVERHEAD_TOKENS
+        step4 = self.step4_template_tokens + text_tokens + MESSAGE_OVERHEAD_TOKENS
+
+        step3_calls = benefits * self.llm_verify_ratio
+        step4_calls = benefits if self.explain_reasoning else 0
+
+        input_tokens = step1 + step2 * benefits + step3 * step3_calls + step4 * step4_calls
+        output_tokens = (OUTPUT_TOKENS["step1"] + OUTPUT_TOKENS["step2"] * benefits
+                         + OUTPUT_TOKENS["step3"] * step3_calls + OUTPUT_TOKENS["step4"] * step4_calls)
+
+        # 단계별 병렬 실행 → 서비스 지연 = 단계별 최대 지연의 합
+        latency = self.latency(OUTPUT_TOKENS["step1"]) + self.latency(OUTPUT_TOKENS["step2"])
+        if step3_calls:
+            latency += self.latency(OUTPUT_TOKENS["step3"])
+        if step4_calls:
+            latency += self.latency(OUTPUT_TOKENS["step4"])
+
+        return {
+            "calls": 1 + benefits + step3_calls + step4_calls,
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "latency": latency
+        }
+
+    def estimate(self, xml_path, limit=None):
+        """XML 전체 예측 + 리포트 출력"""
+        start_time = time.time()
+        print(f"📂 XML 파일 읽기 (스트리밍): {xml_path}")
+
+        rows = []
+        for service in iter_services(xml_path, limit):
+            estimate = self.estimate_service(service)
+            estimate["service_id"] = service['service_id']
+            estimate["service_name"] = service['service_name']
+            rows.append(estimate)
+
+        if not rows:
+            print("❌ 서비스가 없습니다!")
+            return None
+
+        calls = sum(row["calls"] for row in rows)
+        input_tokens = sum(row["input_tokens"] for row in rows)
+        output_tokens = sum(row["output_tokens"] for row in rows)
+
+        input_price, _, output_price = MODEL_PRICES.get(self.model, MODEL_PRICES["gpt-4o-mini"])
+        cost = input_tokens / 1_000_000 * input_price + output_tokens / 1_000_000 * output_price
+
+        # 예상 소요 시간: 지연시간 / 동시 실행 수, RPM, TPM 중 가장 느린 것
+        latency_bound = sum(row["latency"] for row in rows) / self.concurrency
+        rpm_bound = calls / self.rpm * 60
+        tpm_bound = (input_tokens + output_tokens) / self.tpm * 60
+        wall_time = max(latency_bound, rpm_bound, tpm_bound)
+        bottleneck = {latency_bound: "응답 지연", rpm_bound: "RPM 한도", tpm_bound: "TPM 한도"}[wall_time]
+
+        # 이상치: 예산 초과 또는 평균 + 3σ 초과
+        totals = [row["input_tokens"] + row["output_tokens"] for row in rows]
+        mean = statistics.mean(totals)
+        stdev = statistics.pstdev(totals)
+        threshold = min(self.max_service_tokens, mean + 3 * stdev) if stdev else self.max_service_tokens
+        outliers = sorted(
+            (row for row, total in zip(rows, totals) if total > threshold),
+            key=lambda row: row["input_tokens"] + row["output_tokens"],
+            reverse=True
+        )
+
+        print(f"\n{'='*80}")
+        print(f"💰 파싱 비용 예측 ({self.mode}, {self.model})")
+        print(f"{'='*80}")
+        print(f"🔢 토큰 계산: {self.tokenizer_name}")
+        print(f"🗜️ 텍스트 압축: {'반영' if self.compactor else '없음 (원문 기준)'}"
+              + (f", few-shot 예시: {f'반영 ({self.fewshot_k}개)' if self.fewshot_index else '없음'}"
+                 if self.mode == "4step" else ""))
+        print(f"📊 서비스: {len(rows)}개, 예상 호출: {calls:.0f}회")
+        print(f"📥 입력 토큰: {input_tokens:,.0f} (서비스당 평균 {input_tokens / len(rows):,.0f})")
+        print(f"📤 출력 토큰: {output_tokens:,.0f} (추정, 서비스당 혜택 {self.benefits_per_service}개 기준)")
+        print(f"💵 예상 비용: ${cost:.4f}")
+        print(f"⏱️ 예상 소요 시간: {wall_time / 60:.1f}분 "
+              f"(동시 {self.concurrency}개, {self.rpm} RPM, {self.tpm:,} TPM → 병목: {bottleneck})")
+
+        if outliers:
+            print(f"\n⚠️ 이상치 서비스 {len(outliers)}개 (서비스당 {threshold:,.0f} 토큰 초과):")
+            for row in outliers[:10]:
+                print(f"  - {row['service_id']} {(row['service_name'] or '')[:40]}: "
+                      f"입력 {row['input_tokens']:,.0f} / 출력 {row['output_tokens']:,.0f}")
+            if len(outliers) > 10:
+                print(f"  ... 외 {len(outliers) - 10}개")
+
+        print(f"\n(예측 소요 시간: {time.time() - start_time:.2f}초)")
+
+        return {
+            "services": len(rows),
+            "calls": calls,
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "cost_usd": cost,
+            "wall_time_seconds": wall_time,
+            "outliers": [row["service_id"] for row in outliers]
+        }
+
+
+# 사용 예시
+if __name__ == '__main__':
+    import glob
+    import os
+
+    mode = "parse"  # "parse" | "4step"
+
+    # 파서 __main__과 같은 옵션 (압축 / few-shot)
+    from text_compaction import TextCompactor
+    compactor = TextCompactor.load('text_compaction_boilerplate.json') if os.path.exists('text_compaction_boilerplate.json') else TextCompactor()
+
+    fewshot_index = None
+    if mode == "4step":
+        from fewshot_index import FewShotIndex
+        fewshot_index = FewShotIndex.load_or_build(glob.glob('정형화데이터/정형화데이터_*.json'))
+
+    estimator = ParseCostEstimator(
+        model="gpt-4o-mini",
+        mode=mode,
+        concurrency=1,
+        compactor=compactor,  # None: 원문 기준
+        fewshot_index=fewshot_index,  # None: few-shot 예시 없이
+        fewshot_k=2
+    )
+
+    estimator.estimate('wantedDtl포함된xml목록/복지목록경기.xml')
@@ -0,0 +1,220 @@
+"""
+복지 데이터 파서 캐스케이드 (싼 모델 먼저, 애매한 서비스만 상위 단계로)
+- ⭐ 1단계: 빠른 모델 (gpt-4o-mini / gemini-2.5-flash) 단일 호출 파서 + 자기 평가 신뢰도 (overall_confidence)
+- ⭐ 다음 단계로 넘기는 경우만:
+  1) benefits가 비어 있음
+  2) 로컬 규칙 검증 실패 (4단계 파서의 step3_local_verify와 같은 규칙)
+  3) 신뢰도가 낮음 ("낮음")
+- ⭐ 상위 단계: 더 강한 모델 (gpt-4o / gemini-2.5-pro) 또는 4단계 파서 (tiers로 자유롭게 구성)
+- ⭐ 모델 기본값은 LLM_BACKEND별 (CASCADE_MODELS), CASCADE_FAST_MODEL / CASCADE_STRONG_MODEL로 변경
+- ⭐ 단계별 처리 수 / 통과 수 / 넘긴 이유 / 지연시간 리포트
+"""
+import json
+import os
+import time
+from collections import Counter
+from datetime import datetime
+
+from gpt복지정형화_강제필드_4_5_limitBirth_추가 import WelfareParserV4_5 as SingleCallParser
+from gpt복지정형화_v4_6_4step import WelfareParserV4_5 as FourStepParser, step3_local_verify
+from welfare_xml import iter_services
+
+CONFIDENCE_LEVELS = ("높음", "중간", "낮음")
+
+# 백엔드별 (빠른 모델, 강한 모델) 기본값
+CASCADE_MODELS = {
+    "openai": ("gpt-4o-mini", "gpt-4o"),
+    "gemini": ("gemini-2.5-flash", "gemini-2.5-pro"),
+    "fake": ("fake", "fake-strong"),
+}
+
+
+class ConfidenceParser(SingleCallParser):
+    """단일 호출 파서 + 응답에 자기 평가 신뢰도 추가"""
+    PROMPT_VERSION = "v4.5-parse+confidence"
+
+    @staticmethod
+    def build_prompt(service_name, target_text, criteria_text, support_text):
+        return SingleCallParser.build_prompt(service_name, target_text, criteria_text, support_text) + """
+추가: JSON 최상위에 "overall_confidence": "높음" | "중간" | "낮음" 을 넣으세요.
+(원문이 모호하거나 조건 해석이 불확실하면 "낮음")
+"""
+
+
+class CascadeParser:
+    def __init__(self, tiers, escalate_confidence=("낮음",), escalate_inconclusive=False):
+        """
+        tiers: [(이름, 파서)] 싼 순서대로 (파서는 parse_service / fix_parsed_data / backend / compactor / PROMPT_VERSION 필요)
+        escalate_confidence: 이 신뢰도면 다음 단계로 (응답에 overall_confidence가 있을 때만)
+        escalate_inconclusive: True면 로컬 검증 "판단 불가" (키워드 누락 의심)도 다음 단계로
+        """
+        if not tiers:
+            raise ValueError("tiers가 비어 있습니다")
+
+        self.tiers = tiers
+        self.escalate_confidence = frozenset(escalate_confidence)
+        self.escalate_inconclusive = escalate_inconclusive
+        self.stats = {
+            name: {"services": 0, "accepted": 0, "seconds": 0.0, "reasons": Counter()}
+            for name, _ in tiers
+        }
+
+    def escalation_reason(self, parsed, original_text):
+        """다음 단계로 넘길 이유 (없으면 None)"""
+        benefits = (parsed or {}).get('benefits') or []
+        if not benefits:
+            return "benefits 없음"
+
+        for benefit in benefits:
+            verification = step3_local_verify(original_text, benefit)
+            if not verification['is_correct']:
+                return "로컬 검증 실패"
+            if self.escalate_inconclusive and verification['inconclusive']:
+                return "로컬 검증 판단 불가"
+
+        confidence = parsed.get('overall_confidence')
+        if confidence is None:
+            confidence = ((parsed.get('summary') or {}).get('overall_confidence'))
+        if confidence in self.escalate_confidence:
+            return f"신뢰도 {confidence}"
+
+        return None
+
+    def parse_service(self, service_name, target_text, criteria_text, support_text, service_id=None, region=None):
+        """단계별로 파싱 → (결과, 마지막으로 사용한 단계 이름)
+
+        단계마다 그 파서의 사용량 장부 정보(서비스/지역/프롬프트 버전)를 설정하고,
+        파서에 compactor가 있으면 압축한 텍스트로 요청 (로컬 검증은 원문 기준)
+        """
+        original_text = f"{target_text}\n{criteria_text}\n{support_text}"
+        parsed = {"benefits": []}
+
+        for idx, (name, parser) in enumerate(self.tiers):
+            stats = self.stats[name]
+            stats["services"] += 1
+            if parser.backend.ledger is not None:
+                parser.backend.ledger.set_context(service_id=service_id, region=region,
+                                                  prompt_version=parser.PROMPT_VERSION)
+            if parser.compactor:
+                prompt_texts = parser.compactor.compact_service(target_text, criteria_text, support_text)
+            else:
+                prompt_texts = (target_text, criteria_text, support_text)
+            start = time.time()
+            try:
+                parsed = parser.parse_service(service_name, *prompt_texts, service_id=service_id)
+            except Exception as e:
+                print(f"    ❌ {name} 오류: {str(e)[:50]}")
+                parsed = {"benefits": []}
+            stats["seconds"] += time.time() - start
+
+            for benefit in parsed.get('benefits') or []:
+                parser.fix_parsed_data(benefit)
+
+            reason = self.escalation_reason(parsed, original_text)
+            if reason is None:
+                stats["accepted"] += 1
+                return parsed, name
+
+            stats["reasons"][reason] += 1
+            if idx < len(self.tiers) - 1:
+                print(f"    ⬆️ {name} → {self.tiers[idx + 1][0]} ({reason})")
+
+        # 마지막 단계도 통과 못 하면 마지막 결과 사용
+        return parsed, self.tiers[-1][0]
+
+    def batch_parse_xml(self, xml_path, limit=None):
+        """XML 파일 배치 파싱 (batch_parse_xml과 같은 저장 형식 + parse_tier)"""
+        print(f"📂 XML 파일 읽기 (스트리밍): {xml_path}")
+        region = os.path.basename(xml_path).replace('복지목록', '').replace('.xml', '')
+        start_time = time.time()
+        services = []
+
+        for idx, service in enumerate(iter_services(xml_path, limit), 1):
+            print(f"[{idx}] {service['service_name'][:50]}")
+            parsed, tier = self.parse_service(
+                service['service_name'], service['target_text'], service['criteria_text'], service['support_text'],
+                service_id=service['service_id'], region=region
+            )
+            services.append({
+                "service_id": service['service_id'],
+                "service_name": service['service_name'],
+                "detail_url": service['detail_url'],
+                "sido": service['sido'],
+                "sigungu": service['sigungu'] if service['sigungu'] else None,
+                "source": service['sido'],
+                "original_data": {
+                    "target_text": service['target_text'],
+                    "criteria_text": service['criteria_text'],
+                    "support_text": service['support_text']
+                },
+                "parsed_data": parsed,
+                "parse_tier": tier
+            })
+
+        self.print_stats(len(services), time.time() - start_time)
+        return services
+
+    def print_stats(self, total, elapsed):
+        print(f"\n{'='*80}")
+        print(f"🪜 캐스케이드 통계 (서비스 {total}개, {elapsed:.1f}초)")
+        print(f"{'='*80}")
+        for name, _ in self.tiers:
+            stats = self.stats[name]
+            if not stats["services"]:
+                print(f"  {name}: 0개")
+                continue
+            reasons = ", ".join(f"{reason} {count}" for reason, count in stats["reasons"].most_common())
+            print(f"  {name}: {stats['services']}개 처리, {stats['accepted']}개 통과 "
+                  f"({stats['accepted'] / stats['services'] * 100:.1f}%), "
+                  f"평균 {stats['seconds'] / stats['services']:.1f}초"
+                  + (f" | 넘김: {reasons}" if reasons else ""))
+        for _, parser in self.tiers:
+            parser.backend.print_stream_stats()
+            parser.backend.print_stats()
+
+    def save_results(self, results, output_path):
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"\n✅ 완료! {len(results)}개 서비스 저장: {output_path}")
+
+
+# 사용 예시
+if __name__ == '__main__':
+    from dotenv import load_dotenv
+    from llm_backends import create_backend
+
+    load_dotenv()
+
+    backend_name = (os.getenv('LLM_BACKEND') or "openai").lower()
+    if backend_name not in CASCADE_MODELS:
+        print(f"❌ 알 수 없는 백엔드: {backend_name} ({' | '.join(CASCADE_MODELS)})")
+        exit(1)
+    fast_model = os.getenv('CASCADE_FAST_MODEL') or CASCADE_MODELS[backend_name][0]
+    strong_model = os.getenv('CASCADE_STRONG_MODEL') or CASCADE_MODELS[backend_name][1]
+
+    try:
+        fast_backend = create_backend(backend_name, model=fast_model)
+        strong_backend = create_backend(backend_name, model=strong_model)
+    except ValueError as e:
+        print(f"❌ {e}")
+        exit(1)
+
+    # 텍스트 압축 (python 툴/text_compaction.py 로 학습한 상투 문구 파일이 있으면 사용)
+    from text_compaction import TextCompactor
+    compactor = TextCompactor.load('text_compaction_boilerplate.json') if os.path.exists('text_compaction_boilerplate.json') else TextCompactor()
+
+    escalate_to = "model"  # "model": 강한 모델 단일 호출 | "4step": 4단계 파서
+    if escalate_to == "model":
+        strong = (strong_model, SingleCallParser(backend=strong_backend, compactor=compactor))
+    else:
+        strong = ("4step", FourStepParser(backend=fast_backend, max_workers=8, compactor=compactor))
+
+    cascade = CascadeParser(
+        tiers=[(fast_model, ConfidenceParser(backend=fast_backend, compactor=compactor)), strong],
+        escalate_confidence=("낮음",)
+    )
+
+    results = cascade.batch_parse_xml('wantedDtl포함된xml목록/복지목록울산.xml')
+
+    timestamp = datetime.now().strftime("%m%d_%H%M")
+    cascade.save_results(results, f"정형화데이터_울산_cascade_{timestamp}.json")
@@ -0,0 +1,377 @@
+"""
+복지 데이터 필드 추가 마이그레이션 (전체 재파싱 없이 새 필드만 채우기)
+- ⭐ 기존 정형화데이터_*.json + 새 필드 목록 입력
+- ⭐ 서비스당 1회, 새 필드만 묻는 짧은 프롬프트 (전체 스키마 X)
+- ⭐ 응답을 기존 and_conditions / or_conditions에 병합 (다른 필드는 그대로)
+- ⭐ 이미 필드가 있거나 마이그레이션한 서비스는 건너뜀 (parsed_data.migrated_fields에 기록)
+- ⭐ save_every개 서비스마다 결과 파일(*_migrated.json)에 중간 저장
+  → 중단 후 다시 실행하면 결과 파일에서 이어서 진행 (이미 받은 응답은 다시 요청하지 않음)
+- ⭐ 응답 값은 파서와 같은 규칙으로 검사 후 병합 (플래그 true만, 숫자, YYYY-MM-DD, AND 문자열 / OR 배열)
+
+예: v4.4 income_min_percent, v4.5 requires_parent_disability, v5 limit_birth_date
+"""
+import json
+import os
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from llm_backends import OpenAIBackend
+from welfare_schema import BOOLEAN_FIELDS, CATEGORY_FIELDS, DATE_FIELDS, DATE_PATTERN, NUMERIC_FIELDS, is_number
+
+# 필드별 타입 + 규칙 (파서 프롬프트와 같은 표현)
+FIELD_SPECS = {
+    "income_min_percent": (
+        '<숫자|null>',
+        '"기준중위소득 초과" 조건의 하한. 예: "기준중위소득 100% 초과 150% 이하" → 100'
+    ),
+    "income_max_percent": (
+        '<숫자|null>',
+        '소득 상한 (%). 예: "기준중위소득 150% 이하" → 150'
+    ),
+    "requires_parent_disability": (
+        '<true|null>',
+        '부모가 장애인이어야 하는 경우만 true. false 금지!'
+    ),
+    "parent_disability_level": (
+        '<["경증", "중증"]|null>',
+        '부모 장애 등급. or_conditions에만 배열로 사용'
+    ),
+    "child_disability_level": (
+        '<"경증"|"중증"|null>',
+        '아동 장애 등급 (or_conditions에서는 배열)'
+    ),
+    "limit_birth_date": (
+        '<"YYYY-MM-DD"|null>',
+        '"특정 일자 이전 태생" 조건. 예: "2024년 12월 31일 이전 태생" → "2024-12-31"'
+    ),
+    "birth_order_min": (
+        '<숫자|null>',
+        '최소 출생순서. 예: "셋째 이상" → 3'
+    ),
+    "birth_order_max": (
+        '<숫자|null>',
+        '최대 출생순서. 예: "둘째까지" → 2'
+    ),
+    "birth_within_months": (
+        '<숫자|null>',
+        '출산 후 신청 기한 (개월). 예: "출생 후 12개월 이내 신청" → 12'
+    ),
+}
+
+
+def clean_value(field, value, group):
+    """응답 값 1개 검사 → 저장할 값 (규칙에 안 맞으면 None)
+
+    group: "and" | "or" (카테고리형은 AND 문자열, OR 배열)
+    """
+    if value is None or value is False or value == []:
+        return None
+    if field in BOOLEAN_FIELDS:
+        return True if value is True else None
+    if field in NUMERIC_FIELDS:
+        return value if is_number(value) else None
+    if field in DATE_FIELDS:
+        return value if isinstance(value, str) and DATE_PATTERN.match(value) else None
+    if field in CATEGORY_FIELDS:
+        values = value if isinstance(value, list) else [value]
+        if not values or not all(isinstance(item, str) and item for item in values):
+            return None
+        if group == "or":
+            return values
+        return values[0] if len(values) == 1 else None
+    # 규칙이 없는 필드: 단일 값만 (dict / 배열 X)
+    return value if isinstance(value, (str, int, float)) else None
+
+
+class WelfareFieldMigrator:
+    def __init__(self, api_key=None, backend=None, max_workers=8, save_every=20):
+        """LLM 백엔드 초기화 (backend가 없으면 OpenAI 사용)
+
+        save_every: 이 개수만큼 서비스를 처리할 때마다 결과 파일에 중간 저장
+        """
+        self.backend = backend or OpenAIBackend(api_key=api_key)
+        self.max_workers = max_workers
+        self.save_every = save_every
+        self.rejected = Counter()  # 규칙에 안 맞아서 버린 값 (필드별)
+
+    def build_prompt(self, service, benefits, fields):
+        """새 필드만 묻는 짧은 프롬프트"""
+        original = service.get('original_data', {})
+
+        benefit_lines = []
+        for idx, benefit in enumerate(benefits):
+            amount = benefit.get('amount')
+            amount_text = f"{amount}{benefit.get('amount_unit') or ''}/{benefit.get('amount_type') or '-'}" if amount else "금액 없음"
+            benefit_lines.append(f"[{idx}] {benefit.get('description') or ''} ({amount_text})")
+
+        field_lines = []
+        for field in fields:
+            type_text, rule = FIELD_SPECS.get(field, ('<값|null>', ''))
+            field_lines.append(f'- {field}: {type_text} {rule}'.rstrip())
+
+        example_fields = ", ".join(f'"{field}": null' for field in fields)
+
+        return f"""
+서비스명: {service.get('service_name')}
+대상자: {original.get('target_text') or ''}
+선정기준: {original.get('criteria_text') or ''}
+지원내용: {original.get('support_text') or ''}
+
+이미 파싱된 혜택 목록:
+{chr(10).join(benefit_lines)}
+
+---
+
+각 혜택에 대해 아래 필드만 추출하세요. 다른 필드는 절대 만들지 마세요.
+
+{chr(10).join(field_lines)}
+
+규칙:
+1. 원문에 근거가 없으면 null
+2. Boolean은 true 또는 null만! false 금지!
+3. "또는" 조건이면 or_conditions에, 아니면 and_conditions에
+
+JSON 형식:
+{{
+  "benefits": [
+    {{"index": 0, "and_conditions": {{{example_fields}}}, "or_conditions": {{{example_fields}}}}}
+  ]
+}}
+
+JSON만 반환하세요. 설명 없이!
+"""
+
+    def pending_fields(self, parsed_data, fields, overwrite=False):
+        """아직 채워지지 않은 필드만 (이미 있거나 마이그레이션한 적 있으면 건너뜀)"""
+        if overwrite:
+            return list(fields)
+        migrated = set(parsed_data.get('migrated_fields', []))
+        benefits = parsed_data.get('benefits', [])
+        return [
+            field for field in fields
+            if field not in migrated
+            and any(field not in (benefit.get('and_conditions') or {}) for benefit in benefits)
+        ]
+
+    @staticmethod
+    def answer_index(item):
+        """응답 항목의 혜택 번호 (\"0\" 같은 문자열도 허용, 없거나 숫자가 아니면 None)"""
+        try:
+            return int(item.get('index'))
+        except (TypeError, ValueError):
+            return None
+
+    def merge(self, benefits, answer, fields):
+        """응답을 기존 조건에 병합 (요청한 필드만) → 응답이 없는 혜택 번호 목록"""
+        items = answer.get('benefits')
+        answers = {}
+        for item in items if isinstance(items, list) else []:
+            if isinstance(item, dict) and self.answer_index(item) is not None:
+                answers[self.answer_index(item)] = item
+        missing = [idx for idx in range(len(benefits)) if idx not in answers]
+
+        for idx, benefit in enumerate(benefits):
+            if idx not in answers:
+                continue
+            item = answers[idx]
+            and_cond = benefit.setdefault('and_conditions', {})
+            or_cond = benefit.setdefault('or_conditions', {})
+            # null을 명시적으로 저장하는 파일인지 (파서 출력) / 값만 저장하는 파일인지 (수작업 검증본)
+            keeps_nulls = any(value is None for value in and_cond.values())
+
+            for group, target, source in (("and", and_cond, item.get('and_conditions')),
+                                          ("or", or_cond, item.get('or_conditions'))):
+                if not isinstance(source, dict):
+                    source = {}
+                for field in fields:
+                    raw = source.get(field)
+                    value = clean_value(field, raw, group)
+                    if value is None and raw not in (None, False, []):
+                        self.rejected[field] += 1
+                    if value is not None:
+                        target[field] = value
+                    elif target is and_cond and keeps_nulls:
+                        target.setdefault(field, None)
+        return missing
+
+    def request_fields(self, service, fields, overwrite=False):
+        """서비스 1개의 새 필드 요청 (작업 스레드, 서비스는 수정하지 않음)
+
+        → (요청한 필드, 응답, 프롬프트 길이), 요청할 게 없으면 None
+        """
+        parsed_data = service.get('parsed_data') or {}
+        benefits = parsed_data.get('benefits', [])
+        if not benefits:
+            return None
+
+        pending = self.pending_fields(parsed_data, fields, overwrite)
+        if not pending:
+            return None
+
+        prompt = self.build_prompt(service, benefits, pending)
+        answer = self.backend.call_json(
+            "You are a welfare data parser. Extract ONLY the requested fields. Return only valid JSON.",
+            prompt,
+            step="migrate"
+        )
+        if not isinstance(answer, dict):
+            raise ValueError(f"응답이 객체가 아님: {type(answer).__name__}")
+        return pending, answer, len(prompt)
+
+    def apply(self, service, pending, answer):
+        """응답을 서비스에 병합 (메인 스레드) → 응답이 없는 혜택 번호 목록
+
+        모든 혜택에 응답이 있을 때만 마이그레이션한 필드로 기록 (빠진 혜택이 있으면 다음 실행에서 다시 요청)
+        """
+        parsed_data = service['parsed_data']
+        missing = self.merge(parsed_data['benefits'], answer, pending)
+        if not missing:
+            parsed_data['migrated_fields'] = sorted(set(parsed_data.get('migrated_fields', [])) | set(pending))
+        return missing
+
+    def migrate_service(self, service, fields, overwrite=False):
+        """서비스 1개 마이그레이션 → (호출 여부, 프롬프트 길이)
+
+        응답에 빠진 혜택이 있으면 ValueError (받은 혜택 값은 병합, migrated_fields는 기록하지 않음)
+        """
+        result = self.request_fields(service, fields, overwrite)
+        if result is None:
+            return False, 0
+        pending, answer, chars = result
+        missing = self.apply(service, pending, answer)
+        if missing:
+            raise ValueError(f"응답에 없는 혜택 index: {missing}")
+        return True, chars
+
+    @staticmethod
+    def save(services, output_path):
+        """결과 저장 (임시 파일 → 교체, 저장 중에 끊겨도 이전 결과 파일은 그대로)"""
+        tmp_path = f"{output_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(services, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, output_path)
+
+    def migrate_file(self, json_path, fields, output_path=None, overwrite=False):
+        """정형화데이터 JSON에 새 필드 추가
+
+        output_path에 save_every개마다 중간 저장, 이미 있으면 그 파일에서 이어서 진행
+        (overwrite=True는 이어서 하지 않고 원본부터 다시)
+        """
+        unknown = [field for field in fields if field not in FIELD_SPECS]
+        if unknown:
+            print(f"⚠️ 규칙 설명이 없는 필드 (이름만으로 추출): {unknown}")
+
+        if output_path is None:
+            output_path = json_path
+
+        source_path = json_path
+        if output_path != json_path and os.path.exists(output_path) and not overwrite:
+            source_path = output_path
+            print(f"↩️ 이전 실행 결과에서 이어서 진행: {output_path}")
+
+        print(f"📂 JSON 파일 읽기: {source_path}")
+        with open(source_path, 'r', encoding='utf-8') as f:
+            services = json.load(f)
+
+        print(f"📊 서비스 {len(services)}개, 추가 필드: {', '.join(fields)}")
+
+        start_time = time.time()
+        called = 0
+        skipped = 0
+        failed = []
+        prompt_chars = 0
+
+        unsaved = 0
+        # 작업 스레드는 LLM 호출만, 병합/저장은 여기서 (저장 중에 서비스가 바뀌지 않도록)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                executor.submit(self.request_fields, service, fields, overwrite): service
+                for service in services
+            }
+            try:
+                for idx, future in enumerate(as_completed(futures), 1):
+                    service = futures[future]
+                    name = (service.get('service_name') or '')[:40]
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        print(f"[{idx}/{len(services)}] {name} ❌ ({str(e)[:30]})")
+                        failed.append(service.get('service_name'))
+                        continue
+
+                    if result is None:
+                        skipped += 1
+                        continue
+
+                    pending, answer, chars = result
+                    missing = self.apply(service, pending, answer)
+                    called += 1
+                    prompt_chars += chars
+                    unsaved += 1
+                    if missing:
+                        # 받은 값은 저장하되 migrated_fields에 안 남김 → 다음 실행에서 다시 요청
+                        print(f"[{idx}/{len(services)}] {name} ❌ (응답에 없는 혜택 index: {missing})")
+                        failed.append(service.get('service_name'))
+                    else:
+                        print(f"[{idx}/{len(services)}] {name} ✅")
+
+                    if unsaved >= self.save_every:
+                        self.save(services, output_path)
+                        unsaved = 0
+            except KeyboardInterrupt:
+                # 이미 받은 응답은 저장해 두고 종료 (다시 실행하면 이어서 진행)
+                for future in futures:
+                    future.cancel()
+                self.save(services, output_path)
+                print(f"\n⏸️ 중단: 처리한 서비스까지 저장 → {output_path}")
+                raise
+
+        self.save(services, output_path)
+
+        print(f"\n{'='*80}")
+        print(f"📊 마이그레이션 완료 통계")
+        print(f"{'='*80}")
+        print(f"✅ 호출: {called}개 서비스")
+        print(f"⏭️ 건너뜀: {skipped}개 (혜택 없음 / 이미 필드 있음)")
+        print(f"❌ 실패: {len(failed)}개")
+        if self.rejected:
+            print(f"🚫 규칙에 안 맞아서 버린 값: {dict(self.rejected)}")
+        if called:
+            print(f"📝 평균 프롬프트 길이: {prompt_chars / called:.0f}자")
+        print(f"⏱️ 소요 시간: {time.time() - start_time:.1f}초")
+        self.backend.print_stats()
+        print(f"💾 저장: {output_path}")
+
+        return services
+
+
+# 사용 예시
+if __name__ == '__main__':
+    import sys
+    from dotenv import load_dotenv
+    from llm_backends import create_backend
+
+    load_dotenv()
+
+    # 사용법: python 툴/gpt복지정형화_필드추가_마이그레이션.py <정형화데이터.json> <필드1> [필드2 ...]
+    if len(sys.argv) < 3:
+        print("❌ 사용법: python gpt복지정형화_필드추가_마이그레이션.py <정형화데이터.json> <필드1> [필드2 ...]")
+        print(f"   지원 필드: {', '.join(FIELD_SPECS)}")
+        exit(1)
+
+    json_path = sys.argv[1]
+    fields = sys.argv[2:]
+
+    try:
+        backend = create_backend()  # .env의 LLM_BACKEND (openai | gemini | fake), LLM_CASSETTE (녹화/재생)
+    except ValueError as e:
+        print(f"❌ {e}")
+        exit(1)
+
+    migrator = WelfareFieldMigrator(backend=backend)
+
+    # 결과 파일 이름 고정 → 중단 후 같은 명령으로 다시 실행하면 이어서 진행
+    output_path = json_path.replace('.json', '_migrated.json')
+
+    migrator.migrate_file(json_path, fields, output_path)
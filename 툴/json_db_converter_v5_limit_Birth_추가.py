@@ -3,63 +3,430 @@
 
 """
 복지 JSON → DB 변환 스크립트 v5.0
-- 통합 테이블 (danz_welfare_services)
+- 서비스 테이블 (danz_welfare_service_info): 서비스당 1행 (서비스명, URL, 원문 텍스트 3개)
+- 혜택 테이블 (danz_welfare_benefits): 혜택당 1행 (지역 + 혜택 정보 + AND/OR 조건)
+  → 긴 원문 텍스트를 혜택마다 반복 저장하지 않음
+- 호환 뷰 (danz_welfare_services): 예전 통합 테이블과 같은 컬럼 (기존 검색 쿼리 그대로 사용)
+  예전 통합 테이블에서 옮길 때: migrate_to_split_schema() 한 번 실행
 - fd_benefit_id: PRIMARY KEY (유니크)
-- fd_service_id: 중복 가능
+- fd_service_id: 중복 가능 (혜택 테이블)
 - 44개 OR 조건 지원 (limit_birth_date 추가)
 - DB: 192.168.56.82
+- ⭐ 배치 삽입: 여러 서비스의 혜택 행을 모아서 batch_size개씩 executemany (multi-row VALUES)
+  → 행마다 왕복하지 않음, 행/초 리포트
+- ⭐ 대량 적재 (전체 재적재용): 혜택 행을 TSV로 스트리밍 저장 → LOAD DATA LOCAL INFILE
+  (NULL은 \\N, 탭/줄바꿈/역슬래시 이스케이프, UTF-8)
+  로컬 테스트: docker run -d -p 3306:3306 -e MARIADB_USER=work -e MARIADB_PASSWORD=1111 \\
+              -e MARIADB_DATABASE=work_local -e MARIADB_ROOT_PASSWORD=1111 mariadb:11
+              → WelfareConverter(host='127.0.0.1')
+- ⭐ 멱등 업서트 (upsert_files): 혜택마다 키(service_id#순번) + 내용 해시(service_id + 정규화한 값)
+  → 새 혜택은 INSERT, 바뀐 혜택만 UPDATE, 사라진 혜택은 DELETE, 그대로면 쓰기 없음
+- ⭐ 무중단 재적재 (reload_with_swap): 스테이징 테이블에 적재 → 건수 검증 → RENAME TABLE 한 번으로 교체
+  → 검색은 적재 중에도 이전 세대 전체를 봄, 직전 세대는 _prev로 보관 (rollback_swap으로 즉시 복구)
+- ⭐ JSON 스트리밍 읽기 (welfare_json.py): 서비스를 하나씩 읽어서 배치에 넣음
+  → 파일 크기와 상관없이 메모리 일정, 최대 메모리(peak RSS) 리포트
+- ⭐ 배치마다 SAVEPOINT, commit_every행마다 commit
+  → 배치가 실패하면 반씩 나눠서 다시 넣어 문제 행만 골라냄 (거부 행은 DB 오류와 함께 reject JSONL에 기록)
+- ⭐ OR 조건 자식 테이블 (danz_welfare_benefit_or): 혜택 키 + (필드, 값) 1행씩, (필드, 값) 인덱스
+  → 검색이 FIND_IN_SET 전체 스캔 대신 인덱스로 OR 조건을 찾음 (welfare_search.py)
+  → fd_or_* 쉼표 문자열 컬럼도 호환용으로 계속 채움, 예전 DB는 backfill_or_table()로 채움
+- ⭐ 플래그 비트마스크 (fd_and_mask / fd_or_mask, BIGINT): 플래그 21개를 FLAG_FIELDS 순서대로 1비트씩
+  → 검색은 (fd_and_mask & ~사용자마스크) = 0, (fd_or_mask & 사용자마스크) <> 0 한 식으로 플래그 비교
+  → 예전 DB는 backfill_masks()로 채움
 """
 
 import pymysql
+import hashlib
 import json
 import glob
+import os
+import sys
+import tempfile
+import time
+
+from welfare_json import iter_services
+# 혜택 정보 (8개) / AND 조건 (44개) → fd_{필드}, 플래그 21개 (순서 = 마스크 비트 위치)
+from welfare_schema import AND_FIELDS, BENEFIT_FIELDS, CATEGORY_FIELDS, DATE_FIELDS, FLAG_BITS, FLAG_FIELDS
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+BENEFIT_TABLE = 'danz_welfare_benefits'
+SERVICE_TABLE = 'danz_welfare_service_info'
+OR_TABLE = 'danz_welfare_benefit_or'            # OR 조건 (혜택 키, 필드, 값)
+COMPAT_VIEW = 'danz_welfare_services'           # 예전 통합 테이블 모양의 뷰
+LEGACY_TABLE = 'danz_welfare_services_legacy'   # 분리 전 통합 테이블 (migrate 후 보관)
+
+# 테이블 세대 (세 테이블에 같은 접미사)
+STAGING = '_staging'   # 재적재 중인 새 세대
+PREVIOUS = '_prev'     # 교체 직전 세대 (즉시 롤백용)
+RETIRED = '_old'       # 교체하면서 밀려난 예전 _prev (교체가 끝난 뒤 삭제)
+
+# 서비스 테이블 (서비스당 1행) → fd_{필드}
+SERVICE_INFO_FIELDS = [
+    'service_id', 'service_name', 'detail_url',
+    'target_text', 'criteria_text', 'support_text'
+]
+SERVICE_INFO_COLUMNS = [f'fd_{field}' for field in SERVICE_INFO_FIELDS]
+
+# 혜택 행에 남기는 서비스 정보 (지역은 검색 조건이라 조인 없이 거르도록 유지) → fd_{필드}
+SERVICE_FIELDS = ['service_id', 'sido', 'sigungu', 'source']
+
+# OR 조건 카테고리형 (28개) → (컬럼, or_conditions 필드)
+OR_CATEGORY_COLUMNS = [
+    ('fd_or_income_type', 'income_type'),
+    ('fd_or_household_type', 'household_type'),
+    ('fd_or_childcare_type', 'childcare_type'),
+    ('fd_or_requires_grandparent_care', 'requires_grandparent_care'),
+    ('fd_or_requires_dual_income', 'requires_dual_income'),
+    ('fd_or_requires_disability', 'requires_disability'),
+    ('fd_or_requires_parent_disability', 'requires_parent_disability'),
+    ('fd_or_disability_level', 'child_disability_level'),
+    ('fd_or_parent_disability_level', 'parent_disability_level'),
+    ('fd_or_child_has_serious_disease', 'child_has_serious_disease'),
+    ('fd_or_child_has_rare_disease', 'child_has_rare_disease'),
+    ('fd_or_child_has_chronic_disease', 'child_has_chronic_disease'),
+    ('fd_or_child_has_cancer', 'child_has_cancer'),
+    ('fd_or_parent_has_serious_disease', 'parent_has_serious_disease'),
+    ('fd_or_parent_has_rare_disease', 'parent_has_rare_disease'),
+    ('fd_or_parent_has_chronic_disease', 'parent_has_chronic_disease'),
+    ('fd_or_parent_has_cancer', 'parent_has_cancer'),
+    ('fd_or_parent_has_infertility', 'parent_has_infertility'),
+    ('fd_or_is_violence_victim', 'is_violence_victim'),
+    ('fd_or_is_abuse_victim', 'is_abuse_victim'),
+    ('fd_or_is_defector', 'is_defector'),
+    ('fd_or_is_national_merit', 'is_national_merit'),
+    ('fd_or_is_foster_child', 'is_foster_child'),
+    ('fd_or_is_single_mother', 'is_single_mother'),
+    ('fd_or_is_low_income', 'is_low_income'),
+    ('fd_or_education_level', 'education_level'),
+    ('fd_or_is_enrolled', 'is_enrolled'),
+    ('fd_or_housing_type', 'housing_type')
+]
+
+# ⭐ OR 조건 숫자 범위형 (16개) → fd_or_{필드}
+OR_NUMERIC_FIELDS = [
+    'income_min_percent', 'income_max_percent',
+    'household_members_min', 'household_members_max',
+    'children_min', 'children_max', 'birth_order',
+    'birth_order_min', 'birth_order_max', 'residence_min_months',
+    'pregnancy_weeks_min', 'pregnancy_weeks_max', 'birth_within_months',
+    'age_min_months', 'age_max_months', 'limit_birth_date'
+]
+
+OR_COLUMNS = OR_CATEGORY_COLUMNS + [(f'fd_or_{field}', field) for field in OR_NUMERIC_FIELDS]
+
+# 함께 적재/교체하는 테이블 (서비스 → 혜택 → OR 조건 순서로 씀)
+TABLES = (SERVICE_TABLE, BENEFIT_TABLE, OR_TABLE)
+
+# 혜택 테이블 총 103개 (4+8+44+28+16 + 플래그 마스크 2 + 혜택 키)
+INSERT_COLUMNS = (
+    [f'fd_{field}' for field in SERVICE_FIELDS + BENEFIT_FIELDS + AND_FIELDS]
+    + [column for column, _ in OR_COLUMNS]
+    + ['fd_and_mask', 'fd_or_mask', 'fd_benefit_key']
+)
+
+# 적재/업서트용 컬럼 = 행 값 + 내용 해시 (어떤 방식으로 적재해도 다음 업서트에서 그대로인 행은 건너뜀)
+# 혜택 테이블에 없으면 ensure_upsert_columns()가 추가
+UPSERT_COLUMNS = INSERT_COLUMNS + ['fd_content_hash']
+
+# {benefits} / {services} / {or_table}: 적재 대상 테이블 (재적재 중에는 스테이징 세대)
+INSERT_SQL = (
+    f"INSERT INTO {{benefits}} ({', '.join(UPSERT_COLUMNS)}) "
+    f"VALUES ({', '.join(['%s'] * len(UPSERT_COLUMNS))})"
+)
+
+# 서비스 행 (이미 있으면 새 내용으로 갱신)
+SERVICE_UPSERT_COLUMNS = SERVICE_INFO_COLUMNS + ['fd_content_hash']
+
+SERVICE_UPSERT_SQL = (
+    f"INSERT INTO {{services}} ({', '.join(SERVICE_UPSERT_COLUMNS)}) "
+    f"VALUES ({', '.join(['%s'] * len(SERVICE_UPSERT_COLUMNS))}) "
+    f"ON DUPLICATE KEY UPDATE {', '.join(f'{column} = VALUES({column})' for column in SERVICE_UPSERT_COLUMNS[1:])}"
+)
+
+UPSERT_SQL = (
+    f"INSERT INTO {{benefits}} ({', '.join(UPSERT_COLUMNS)}) "
+    f"VALUES ({', '.join(['%s'] * len(UPSERT_COLUMNS))}) "
+    f"ON DUPLICATE KEY UPDATE {', '.join(f'{column} = VALUES({column})' for column in UPSERT_COLUMNS[1:])}"
+)
+
+LOAD_OPTIONS = (
+    "CHARACTER SET utf8mb4 "
+    "FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' "
+    "LINES TERMINATED BY '\\n' "
+)
+
+LOAD_SQL = (
+    "LOAD DATA LOCAL INFILE %s INTO TABLE {benefits} "
+    + LOAD_OPTIONS
+    + f"({', '.join(UPSERT_COLUMNS)})"
+)
+
+# 서비스는 같은 ID가 이미 있으면 새 행으로 교체
+SERVICE_LOAD_SQL = (
+    "LOAD DATA LOCAL INFILE %s REPLACE INTO TABLE {services} "
+    + LOAD_OPTIONS
+    + f"({', '.join(SERVICE_UPSERT_COLUMNS)})"
+)
+
+# OR 조건 자식 테이블: 목록은 원소마다 1행, 플래그는 'true', 숫자는 fd_number에도 저장 (DECIMAL, 소수 유지)
+OR_TABLE_COLUMNS = ['fd_benefit_key', 'fd_field', 'fd_value', 'fd_number']
+
+OR_INSERT_SQL = (
+    f"INSERT INTO {{or_table}} ({', '.join(OR_TABLE_COLUMNS)}) "
+    f"VALUES ({', '.join(['%s'] * len(OR_TABLE_COLUMNS))})"
+)
+
+OR_LOAD_SQL = (
+    "LOAD DATA LOCAL INFILE %s INTO TABLE {or_table} "
+    + LOAD_OPTIONS
+    + f"({', '.join(OR_TABLE_COLUMNS)})"
+)
+
+
+def column_type(field):
+    """AND 조건 필드 → 컬럼 타입 (새 DB용 테이블 정의, db.sql의 welfare_services / welfare_benefits 타입 기준)"""
+    if field in DATE_FIELDS:
+        return 'DATE'
+    if field in CATEGORY_FIELDS:
+        return 'VARCHAR(100)'
+    if field in FLAG_FIELDS:
+        return 'BOOLEAN'
+    return 'INT'
+
+
+SERVICE_TABLE_DDL = f"""CREATE TABLE IF NOT EXISTS {SERVICE_TABLE} (
+    fd_service_id VARCHAR(50) PRIMARY KEY,
+    fd_service_name VARCHAR(200) NOT NULL,
+    fd_detail_url TEXT,
+    fd_target_text TEXT,
+    fd_criteria_text TEXT,
+    fd_support_text TEXT,
+    fd_content_hash CHAR(40) NULL COMMENT '서비스 내용 SHA1'
+) ENGINE = InnoDB DEFAULT CHARSET = utf8mb4 COLLATE = utf8mb4_unicode_ci COMMENT = '복지 서비스 (서비스당 1행)'"""
+
+BENEFIT_TABLE_DDL = f"""CREATE TABLE IF NOT EXISTS {BENEFIT_TABLE} (
+    fd_benefit_id INT PRIMARY KEY AUTO_INCREMENT,
+    fd_service_id VARCHAR(50) NOT NULL,
+    fd_sido VARCHAR(50),
+    fd_sigungu VARCHAR(50),
+    fd_source VARCHAR(100),
+    fd_amount DECIMAL(15, 2),
+    fd_amount_type VARCHAR(50),
+    fd_amount_unit VARCHAR(20),
+    fd_benefit_type VARCHAR(50),
+    fd_payment_cycle VARCHAR(50),
+    fd_payment_method VARCHAR(100),
+    fd_payment_timing VARCHAR(100),
+    fd_description TEXT,
+    {', '.join(f'fd_{field} {column_type(field)}' for field in AND_FIELDS)},
+    {', '.join(f'{column} VARCHAR(255)' for column, _ in OR_COLUMNS)},
+    fd_and_mask BIGINT NOT NULL DEFAULT 0 COMMENT 'AND 플래그 비트마스크 (FLAG_FIELDS 순서)',
+    fd_or_mask BIGINT NOT NULL DEFAULT 0 COMMENT 'OR 플래그 비트마스크 (FLAG_FIELDS 순서)',
+    fd_benefit_key VARCHAR(80) NULL COMMENT '서비스ID#혜택순번 (업서트 키, OR 테이블 연결)',
+    fd_content_hash CHAR(40) NULL COMMENT '혜택 내용 SHA1',
+    UNIQUE INDEX uk_benefit_key (fd_benefit_key),
+    INDEX idx_service_id (fd_service_id),
+    INDEX idx_sido_sigungu (fd_sido, fd_sigungu),
+    INDEX idx_age (fd_age_min_months, fd_age_max_months)
+) ENGINE = InnoDB DEFAULT CHARSET = utf8mb4 COLLATE = utf8mb4_unicode_ci COMMENT = '복지 혜택 (혜택당 1행 + 조건)'"""
+
+# 검색: (필드, 값) / (필드, 숫자) 인덱스로 조건에 맞는 혜택 키를 바로 찾음
+OR_TABLE_DDL = f"""CREATE TABLE IF NOT EXISTS {OR_TABLE} (
+    fd_benefit_key VARCHAR(80) NOT NULL,
+    fd_field VARCHAR(50) NOT NULL,
+    fd_value VARCHAR(100) NOT NULL,
+    fd_number DECIMAL(12, 2) NULL,
+    PRIMARY KEY (fd_benefit_key, fd_field, fd_value),
+    INDEX idx_field_value (fd_field, fd_value),
+    INDEX idx_field_number (fd_field, fd_number)
+) ENGINE = InnoDB DEFAULT CHARSET = utf8mb4 COLLATE = utf8mb4_unicode_ci COMMENT = '복지 혜택 OR 조건 (조건 값당 1행)'"""
+
+# 연결이 끊긴 오류 (행 문제가 아님 → 나눠서 재시도하지 않음)
+CONNECTION_ERRORS = frozenset([2003, 2006, 2013, 2055])
+
+# 교착 상태: InnoDB가 트랜잭션 전체를 롤백해서 SAVEPOINT도 사라짐 → 나누지 않고 호출한 쪽에서 처음부터 다시
+DEADLOCK_ERRORS = frozenset([1213])
+
+# LOAD DATA 기본 이스케이프 (ESCAPED BY '\\')
+TSV_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r', '\0': '\\0'})
+
+
+def tsv_value(value):
+    """DB 값 → TSV 필드 (None → \\N, True → 1, 문자열은 이스케이프)"""
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, (int, float)):
+        return repr(value)
+    if isinstance(value, list):
+        value = ','.join(str(v) for v in value)
+    return str(value).translate(TSV_ESCAPES)
+
+
+def tsv_line(row):
+    return '\t'.join(tsv_value(value) for value in row) + '\n'
+
+
+def peak_rss_mb():
+    """이 프로세스의 최대 메모리 사용량 (MB, 측정 불가면 None)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux는 KB, macOS는 바이트
+    return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+
+
+def benefit_key(service_id, index):
+    """혜택 고유 키: 서비스 안에서 몇 번째 혜택인지 (내용이 바뀌어도 같은 키 → UPDATE)"""
+    return f"{service_id}#{index}"
+
+
+def number_text(value):
+    """숫자 → 저장용 문자열 (12.0 → '12', 12.5 → '12.5')"""
+    return str(int(value)) if float(value).is_integer() else str(value)
+
+
+def parse_number(text):
+    """숫자 문자열 → float (숫자가 아니면 None, '2024-01-01' 같은 날짜도 None)"""
+    try:
+        number = float(text)
+    except ValueError:
+        return None
+    return number if number == number and abs(number) != float('inf') else None
+
+
+def or_rows(key, or_cond):
+    """OR 조건 → 자식 테이블 행 [(혜택 키, 필드, 값, 숫자)] (빈 값 제외, 같은 값은 한 번만)
+
+    목록과 쉼표 문자열('a,b')은 원소마다 1행, true는 'true', 숫자(또는 숫자 문자열)는 fd_number에도 저장
+    (fd_or_* 컬럼에서 다시 채우는 backfill_or_table()과 같은 행이 나오도록 문자열도 쉼표로 나눔)
+    0은 값으로 취급 (fd_or_* 컬럼에도 '0'으로 저장 → 두 검색 방식이 같은 결과)
+    """
+    rows = {}
+    for _, field in OR_COLUMNS:
+        value = or_cond.get(field)
+        if isinstance(value, str):
+            value = value.split(',')
+        for item in value if isinstance(value, list) else [value]:
+            if item is None or item is False or item == '':
+                continue
+            if item is True:
+                rows[(field, 'true')] = None
+            elif isinstance(item, (int, float)):
+                rows[(field, number_text(item))] = item
+            else:
+                item = str(item).strip()
+                rows[(field, item)] = parse_number(item)
+    return [(key, field, value, number) for (field, value), number in rows.items()]
+
+
+def content_hash(row):
+    """행 내용 해시 (service_id 포함 모든 값, 10.0 → 10 정규화)"""
+    values = [int(v) if isinstance(v, float) and v.is_integer() else v for v in row]
+    raw = json.dumps(values, ensure_ascii=False, separators=(',', ':'), default=str)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
 
 class WelfareConverter:
-    def __init__(self):
+    def __init__(self, batch_size=500, host='192.168.56.82', port=3306,
+                 user='work', password='1111', database='work_local', verbose=True,
+                 commit_every=5000, reject_path='db_rejects.jsonl'):
+        """batch_size: 한 번에 전송할 혜택 행 수 (1이면 행마다 전송)
+        verbose: False면 서비스별 진행 출력 생략 (큰 코퍼스용)
+        commit_every: 이 행 수마다 commit (파일 끝에서도 commit)
+        reject_path: 넣지 못한 행을 기록할 JSONL 파일
+        """
         self.conn = pymysql.connect(
-            host='192.168.56.82',
-            user='work',
-            password='1111',
-            database='work_local',
-            charset='utf8mb4'
+            host=host,
+            port=port,
+            user=user,
+            password=password,
+            database=database,
+            charset='utf8mb4',
+            local_infile=True  # 대량 적재 (LOAD DATA LOCAL INFILE)
         )
         self.cursor = self.conn.cursor()
+        self.suffix = ''  # 적재 대상 세대 ('' 현재, STAGING 재적재 중)
+        self.verbose = verbose
+        self.batch_size = max(1, batch_size)
+        self.pending = []
+        self.pending_services = []
+        self.pending_or = []
+        self.seen_services = set()  # 여러 파일에 같은 서비스 → 처음 것만 적재
+        self.commit_every = commit_every
+        self.reject_path = reject_path
+        self.uncommitted = 0
+        self.load_warnings = {}  # 마지막 bulk_load의 테이블별 LOAD DATA 경고 수 (스테이징 검증에 사용)
+        self.stats = {"rows": 0, "services": 0, "or_rows": 0, "duplicates": 0, "skipped": 0,
+                      "batches": 0, "errors": 0, "commits": 0, "seconds": 0.0}
         print("✅ DB 연결 성공!")
     
+    @property
+    def benefit_table(self):
+        return BENEFIT_TABLE + self.suffix
+    
+    @property
+    def service_table(self):
+        return SERVICE_TABLE + self.suffix
+    
+    @property
+    def or_table(self):
+        return OR_TABLE + self.suffix
+    
+    def sql(self, template):
+        """SQL 템플릿의 {benefits} / {services} / {or_table}을 현재 적재 대상 테이블로 바꿈"""
+        return template.format(benefits=self.benefit_table, services=self.service_table, or_table=self.or_table)
+    
     def to_json(self, value):
-        """값을 쉼표 구분 문자열로 변환"""
-        if not value:
+        """값을 쉼표 구분 문자열로 변환 (None / false / 빈 값 → None, 숫자 0은 '0')"""
+        if value is None or value is False or value == '' or value == []:
             return None
-        if isinstance(value, bool):
-            return 'true' if value else None
+        if value is True:
+            return 'true'
         if isinstance(value, list):
-            if len(value) == 0:
-                return None
             if all(isinstance(x, bool) for x in value):
                 return 'true' if any(value) else None
-            return ','.join(str(v) for v in value)
+            return ','.join(number_text(v) if isinstance(v, (int, float)) and not isinstance(v, bool) else str(v)
+                            for v in value)
+        if isinstance(value, (int, float)):
+            return number_text(value)
         return str(value)
     
-    def insert_unified(self, service):
-        """통합 테이블에 삽입 (서비스 + 혜택)"""
-        
-        service_id = service['service_id']
-        service_name = service['service_name']
-        detail_url = service.get('detail_url')
+    def flag_mask(self, conditions):
+        """조건 → 플래그 비트마스크 (컬럼에 값이 들어가는 플래그만 1)"""
+        mask = 0
+        for field, bit in FLAG_BITS.items():
+            if self.to_json(conditions.get(field)) is not None:
+                mask |= bit
+        return mask
+    
+    def service_row(self, service):
+        """서비스 테이블 행 (SERVICE_UPSERT_COLUMNS 순서, 마지막은 내용 해시)"""
+        original = service.get('original_data', {})
+        row = (
+            service['service_id'], service['service_name'], service.get('detail_url'),
+            original.get('target_text'), original.get('criteria_text'), original.get('support_text')
+        )
+        return row + (content_hash(row),)
+    
+    def service_values(self, service):
+        """혜택 행마다 들어가는 서비스 정보 4개 (ID + 지역)"""
         sido = service.get('sido')
         if sido == '':
             sido = None
-        sigungu = service.get('sigungu')
-        source = service.get('source')
-        
-        original = service.get('original_data', {})
-        target_text = original.get('target_text')
-        criteria_text = original.get('criteria_text')
-        support_text = original.get('support_text')
-        
-        benefits = service.get('parsed_data', {}).get('benefits', [])
+        return (service['service_id'], sido, service.get('sigungu'), service.get('source'))
+    
+    def build_rows(self, service):
+        """서비스 1개 → 혜택별 INSERT 값 튜플 목록 (INSERT_COLUMNS 순서)"""
+        service_values = self.service_values(service)
+        rows = []
         
-        for benefit in benefits:
+        for index, benefit in enumerate(service.get('parsed_data', {}).get('benefits', [])):
             and_cond = benefit.get('and_conditions', {})
             or_cond = benefit.get('or_conditions', {})
             
@@ -68,172 +435,714 @@ class WelfareConverter:
                 if value is False:
                     and_cond[key] = None
             
-            # OR 조건 28개 (카테고리형)
-            or_income = self.to_json(or_cond.get('income_type'))
-            or_household = self.to_json(or_cond.get('household_type'))
-            or_childcare = self.to_json(or_cond.get('childcare_type'))
-            or_req_grandparent = self.to_json(or_cond.get('requires_grandparent_care'))
-            or_req_dual = self.to_json(or_cond.get('requires_dual_income'))
-            or_req_disability = self.to_json(or_cond.get('requires_disability'))
-            or_req_parent_disability = self.to_json(or_cond.get('requires_parent_disability'))
-            or_disability_level = self.to_json(or_cond.get('child_disability_level'))
-            or_parent_disability_level = self.to_json(or_cond.get('parent_disability_level'))
-            or_child_serious = self.to_json(or_cond.get('child_has_serious_disease'))
-            or_child_rare = self.to_json(or_cond.get('child_has_rare_disease'))
-            or_child_chronic = self.to_json(or_cond.get('child_has_chronic_disease'))
-            or_child_cancer = self.to_json(or_cond.get('child_has_cancer'))
-            or_parent_serious = self.to_json(or_cond.get('parent_has_serious_disease'))
-            or_parent_rare = self.to_json(or_cond.get('parent_has_rare_disease'))
-            or_parent_chronic = self.to_json(or_cond.get('parent_has_chronic_disease'))
-            or_parent_cancer = self.to_json(or_cond.get('parent_has_cancer'))
-            or_parent_infertility = self.to_json(or_cond.get('parent_has_infertility'))
-            or_violence = self.to_json(or_cond.get('is_violence_victim'))
-            or_abuse = self.to_json(or_cond.get('is_abuse_victim'))
-            or_defector = self.to_json(or_cond.get('is_defector'))
-            or_merit = self.to_json(or_cond.get('is_national_merit'))
-            or_foster = self.to_json(or_cond.get('is_foster_child'))
-            or_single = self.to_json(or_cond.get('is_single_mother'))
-            or_low_income = self.to_json(or_cond.get('is_low_income'))
-            or_education = self.to_json(or_cond.get('education_level'))
-            or_enrolled = self.to_json(or_cond.get('is_enrolled'))
-            or_housing = self.to_json(or_cond.get('housing_type'))
-            
-            # ⭐ 숫자 범위형 OR 조건 16개
-            or_income_min_percent = self.to_json(or_cond.get('income_min_percent'))
-            or_income_max_percent = self.to_json(or_cond.get('income_max_percent'))
-            or_household_members_min = self.to_json(or_cond.get('household_members_min'))
-            or_household_members_max = self.to_json(or_cond.get('household_members_max'))
-            or_children_min = self.to_json(or_cond.get('children_min'))
-            or_children_max = self.to_json(or_cond.get('children_max'))
-            or_birth_order = self.to_json(or_cond.get('birth_order'))
-            or_birth_order_min = self.to_json(or_cond.get('birth_order_min'))
-            or_birth_order_max = self.to_json(or_cond.get('birth_order_max'))
-            or_residence_min_months = self.to_json(or_cond.get('residence_min_months'))
-            or_pregnancy_weeks_min = self.to_json(or_cond.get('pregnancy_weeks_min'))
-            or_pregnancy_weeks_max = self.to_json(or_cond.get('pregnancy_weeks_max'))
-            or_birth_within_months = self.to_json(or_cond.get('birth_within_months'))
-            or_age_min_months = self.to_json(or_cond.get('age_min_months'))
-            or_age_max_months = self.to_json(or_cond.get('age_max_months'))
-            or_limit_birth_date = self.to_json(or_cond.get('limit_birth_date'))
-            
-            sql = """
-            INSERT INTO danz_welfare_services (
-              fd_service_id, fd_service_name, fd_detail_url,
-              fd_sido, fd_sigungu, fd_source,
-              fd_target_text, fd_criteria_text, fd_support_text,
-              fd_amount, fd_amount_type, fd_amount_unit, fd_benefit_type,
-              fd_payment_cycle, fd_payment_method, fd_payment_timing, fd_description,
-              fd_age_min_months, fd_age_max_months,
-              fd_income_type, fd_income_min_percent, fd_income_max_percent,
-              fd_household_type, fd_household_members_min, fd_household_members_max,
-              fd_children_min, fd_children_max,
-              fd_birth_order, fd_birth_order_min, fd_birth_order_max,
-              fd_residence_min_months,
-              fd_childcare_type, fd_requires_grandparent_care, fd_requires_dual_income,
-              fd_requires_disability, fd_requires_parent_disability,
-              fd_child_disability_level, fd_parent_disability_level,
-              fd_child_has_serious_disease, fd_child_has_rare_disease,
-              fd_child_has_chronic_disease, fd_child_has_cancer,
-              fd_parent_has_serious_disease, fd_parent_has_rare_disease,
-              fd_parent_has_chronic_disease, fd_parent_has_cancer, fd_parent_has_infertility,
-              fd_is_violence_victim, fd_is_abuse_victim, fd_is_defector,
-              fd_is_national_merit, fd_is_foster_child, fd_is_single_mother, fd_is_low_income,
-              fd_pregnancy_weeks_min, fd_pregnancy_weeks_max, fd_birth_within_months,
-              fd_limit_birth_date,
-              fd_education_level, fd_is_enrolled, fd_housing_type,
-              fd_or_income_type, fd_or_household_type, fd_or_childcare_type,
-              fd_or_requires_grandparent_care, fd_or_requires_dual_income,
-              fd_or_requires_disability, fd_or_requires_parent_disability, 
-              fd_or_disability_level, fd_or_parent_disability_level,
-              fd_or_child_has_serious_disease, fd_or_child_has_rare_disease,
-              fd_or_child_has_chronic_disease, fd_or_child_has_cancer,
-              fd_or_parent_has_serious_disease, fd_or_parent_has_rare_disease,
-              fd_or_parent_has_chronic_disease, fd_or_parent_has_cancer, fd_or_parent_has_infertility,
-              fd_or_is_violence_victim, fd_or_is_abuse_victim, fd_or_is_defector,
-              fd_or_is_national_merit, fd_or_is_foster_child, fd_or_is_single_mother, fd_or_is_low_income,
-              fd_or_education_level, fd_or_is_enrolled, fd_or_housing_type,
-              fd_or_income_min_percent, fd_or_income_max_percent, 
-              fd_or_household_members_min, fd_or_household_members_max,
-              fd_or_children_min, fd_or_children_max, fd_or_birth_order,
-              fd_or_birth_order_min, fd_or_birth_order_max, fd_or_residence_min_months,
-              fd_or_pregnancy_weeks_min, fd_or_pregnancy_weeks_max, fd_or_birth_within_months,
-              fd_or_age_min_months, fd_or_age_max_months, fd_or_limit_birth_date
-            ) VALUES (
-              %s, %s, %s, %s, %s, %s, %s, %s, %s,
-              %s, %s, %s, %s, %s, %s, %s, %s, %s,
-              %s, %s, %s, %s, %s, %s, %s, %s, %s,
-              %s, %s, %s, %s, %s, %s, %s, %s, %s,
-              %s, %s, %s, %s, %s, %s, %s, %s, %s,
-              %s, %s, %s, %s, %s, %s, %s, %s, %s,
-              %s, %s, %s, %s, %s, %s,
-              %s, %s, %s, %s, %s, %s, %s, %s, %s,
-              %s, %s, %s, %s, %s, %s, %s, %s, %s,
-              %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
-              %s, %s, %s, %s, %s, %s, %s, %s, %s,
-              %s, %s, %s, %s, %s, %s, %s, %s
+            rows.append(
+                service_values
+                + tuple(benefit.get(field) for field in BENEFIT_FIELDS)
+                + tuple(and_cond.get(field) for field in AND_FIELDS)
+                + tuple(self.to_json(or_cond.get(field)) for _, field in OR_COLUMNS)
+                + (self.flag_mask(and_cond), self.flag_mask(or_cond), benefit_key(service['service_id'], index))
             )
-            """
+        
+        return rows
+    
+    def hashed_rows(self, service):
+        """build_rows + 내용 해시 (UPSERT_COLUMNS 순서, [-2] 혜택 키, [-1] 해시)"""
+        return [row + (content_hash(row),) for row in self.build_rows(service)]
+    
+    def build_or_rows(self, service):
+        """서비스 1개 → OR 자식 테이블 행 목록 (OR_TABLE_COLUMNS 순서)"""
+        rows = []
+        for index, benefit in enumerate(service.get('parsed_data', {}).get('benefits', [])):
+            rows.extend(or_rows(benefit_key(service['service_id'], index), benefit.get('or_conditions') or {}))
+        return rows
+    
+    def insert_unified(self, service):
+        """서비스 1행 + 혜택 행 + OR 조건 행 삽입 - batch_size개가 모이면 한 번에 전송"""
+        if service['service_id'] in self.seen_services:
+            self.stats['duplicates'] += 1
+            return
+        self.seen_services.add(service['service_id'])
+        
+        self.pending_services.append(self.service_row(service))
+        self.pending.extend(self.hashed_rows(service))
+        self.pending_or.extend(self.build_or_rows(service))
+        if max(len(self.pending), len(self.pending_services), len(self.pending_or)) >= self.batch_size:
+            self.flush()
+    
+    def flush(self):
+        """모아 둔 행을 executemany로 전송 (pymysql이 multi-row VALUES로 묶음)
+        
+        서비스 행을 먼저 넣어서 호환 뷰에서 혜택만 보이는 순간이 없게 함
+        서비스 행이 거부되면 그 서비스의 혜택 / OR 조건 행도 넣지 않음, 거부된 혜택 행의 OR 조건 행도 넣지 않음
+        """
+        if not self.pending and not self.pending_services and not self.pending_or:
+            return
+        services, self.pending_services = self.pending_services, []
+        rows, self.pending = self.pending, []
+        conditions, self.pending_or = self.pending_or, []
+        start = time.time()
+        
+        if services:
+            rejected = []
+            self.stats['services'] += self.insert_rows(services, SERVICE_UPSERT_SQL, SERVICE_UPSERT_COLUMNS, rejected)
+            rows, conditions = self.skip_rejected_services(rejected, rows, conditions)
+        if rows:
+            rejected = []
+            self.stats['rows'] += self.insert_rows(rows, rejected=rejected)
+            conditions = self.skip_rejected_benefits(rejected, conditions)
+        if conditions:
+            self.stats['or_rows'] += self.insert_rows(conditions, OR_INSERT_SQL, OR_TABLE_COLUMNS)
+        self.stats['batches'] += 1
+        self.uncommitted += len(rows)
+        if self.uncommitted >= self.commit_every:
+            self.commit()
+        
+        self.stats['seconds'] += time.time() - start
+    
+    def commit(self):
+        self.conn.commit()
+        self.uncommitted = 0
+        self.stats['commits'] += 1
+    
+    def rollback(self):
+        """마지막 commit 이후 작업 취소 (보내지 않은 행도 버림, 교착 상태 후 다시 실행할 때)"""
+        self.conn.rollback()
+        self.pending, self.pending_services, self.pending_or = [], [], []
+        self.uncommitted = 0
+    
+    def insert_rows(self, rows, template=INSERT_SQL, columns=UPSERT_COLUMNS, rejected=None):
+        """SAVEPOINT 안에서 executemany → 넣은 행 수
+        
+        실패하면 되돌리고 반씩 나눠서 다시 시도, 끝까지 실패한 행(1개)만 reject 파일에 기록
+        연결 끊김 / 교착 상태는 그대로 raise (교착 상태면 rollback() 후 마지막 commit 이후 작업을 다시 실행)
+        rejected: 리스트를 넘기면 거부된 행을 추가
+        """
+        self.cursor.execute("SAVEPOINT batch")
+        try:
+            self.cursor.executemany(self.sql(template), rows)
+        except pymysql.MySQLError as e:
+            if e.args and (e.args[0] in CONNECTION_ERRORS or e.args[0] in DEADLOCK_ERRORS):
+                raise
+            self.cursor.execute("ROLLBACK TO SAVEPOINT batch")
+            if len(rows) == 1:
+                self.reject(rows[0], template, columns, e)
+                if rejected is not None:
+                    rejected.append(rows[0])
+                return 0
+            middle = len(rows) // 2
+            return (self.insert_rows(rows[:middle], template, columns, rejected)
+                    + self.insert_rows(rows[middle:], template, columns, rejected))
+        self.cursor.execute("RELEASE SAVEPOINT batch")
+        return len(rows)
+    
+    def skip_rejected_services(self, rejected, rows, conditions):
+        """거부된 서비스 행 → 그 서비스의 혜택 / OR 조건 행을 뺀 (혜택 행, OR 조건 행)
+        
+        호환 뷰에 서비스명이 빈 혜택이 생기지 않게 함 (rows는 UPSERT_COLUMNS 순서, [-2] 혜택 키)
+        """
+        service_ids = {row[0] for row in rejected}
+        skipped = {row[-2] for row in rows if row[0] in service_ids}
+        if not skipped:
+            return rows, conditions
+        self.stats['skipped'] += len(skipped)
+        print(f"⚠️ 서비스 행 거부 {len(service_ids)}개 → 혜택 {len(skipped)}행 건너뜀")
+        return ([row for row in rows if row[-2] not in skipped],
+                [row for row in conditions if row[0] not in skipped])
+    
+    def skip_rejected_benefits(self, rejected, conditions):
+        """거부된 혜택 행 → 그 혜택의 OR 조건 행을 뺀 목록 (OR 테이블에 부모 없는 행이 생기지 않게)"""
+        keys = {row[-2] for row in rejected}
+        if not keys:
+            return conditions
+        return [row for row in conditions if row[0] not in keys]
+    
+    def reject(self, row, template, columns, error):
+        """넣지 못한 행 1개를 reject JSONL에 기록 (한 줄 = 한 번의 write)
+        
+        OR 조건 행에는 서비스 ID가 없음 → 혜택 키(서비스ID#순번)에서 꺼냄
+        """
+        self.stats['errors'] += 1
+        values = dict(zip(columns, row))
+        key = values.get('fd_benefit_key')
+        entry = {
+            "table": self.sql(template).split()[2],  # INSERT INTO {테이블}
+            "service_id": values.get('fd_service_id') or (key.rsplit('#', 1)[0] if key else None),
+            "benefit_key": key,
+            "error_code": error.args[0] if error.args else None,
+            "error": str(error.args[1] if len(error.args) > 1 else error),
+            "row": values
+        }
+        with open(self.reject_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False, default=str) + "\n")
+        if self.stats['errors'] <= 5:
+            print(f"⚠️ 거부: {key or entry['service_id']} ({entry['error_code']} {entry['error'][:80]}) → {self.reject_path}")
+    
+    def print_stats(self):
+        stats = self.stats
+        rate = stats['rows'] / stats['seconds'] if stats['seconds'] else 0
+        print(f"📊 삽입 혜택 {stats['rows']:,}행 + 서비스 {stats['services']:,}행 + OR 조건 {stats['or_rows']:,}행 "
+              f"/ 배치 {stats['batches']}회 "
+              f"(batch_size={self.batch_size}), commit {stats['commits']}회, "
+              f"DB 시간 {stats['seconds']:.2f}초 → {rate:,.0f}행/초")
+        if stats['duplicates']:
+            print(f"ℹ️ 중복 서비스 {stats['duplicates']}개 건너뜀 (처음 것만 적재)")
+        if stats['errors']:
+            print(f"⚠️ 거부 {stats['errors']:,}행 → {self.reject_path}")
+        if stats['skipped']:
+            print(f"⚠️ 서비스 행이 거부되어 건너뛴 혜택 {stats['skipped']:,}행")
+        peak = peak_rss_mb()
+        if peak is not None:
+            print(f"💾 최대 메모리 (peak RSS): {peak:.0f}MB")
+    
+    def write_tsv(self, json_paths, tsv_path, service_tsv_path, or_tsv_path):
+        """JSON 파일들을 TSV 3개로 저장 (혜택 / 서비스 / OR 조건) → (혜택 행 수, 서비스 행 수, OR 조건 행 수)
+        
+        여러 파일에 같은 서비스가 있으면 처음 것만 씀 (혜택 키가 겹치지 않게)
+        """
+        count = or_count = 0
+        seen_services = set()
+        with open(tsv_path, 'w', encoding='utf-8', newline='\n') as f, \
+                open(service_tsv_path, 'w', encoding='utf-8', newline='\n') as sf, \
+                open(or_tsv_path, 'w', encoding='utf-8', newline='\n') as of:
+            for json_path in json_paths:
+                for service in iter_services(json_path):
+                    if service['service_id'] in seen_services:
+                        continue
+                    seen_services.add(service['service_id'])
+                    sf.write(tsv_line(self.service_row(service)))
+                    for row in self.hashed_rows(service):
+                        f.write(tsv_line(row))
+                        count += 1
+                    for row in self.build_or_rows(service):
+                        of.write(tsv_line(row))
+                        or_count += 1
+        return count, len(seen_services), or_count
+    
+    def bulk_load(self, json_paths, tsv_path=None, truncate=False):
+        """대량 적재: TSV 생성 → LOAD DATA LOCAL INFILE (전체 재적재용) → 적재한 혜택 행 수
+        
+        tsv_path: 혜택 TSV 저장 경로 (서비스/OR 조건 TSV는 같은 이름 + .services / .or, None이면 임시 파일, 끝나면 삭제)
+        truncate: True면 적재 전에 세 테이블 비움 (전체 재적재)
+        """
+        print(f"\n{'='*80}")
+        print(f"🚚 대량 적재: 파일 {len(json_paths)}개 → {self.service_table} / {self.benefit_table} / {self.or_table}")
+        print(f"{'='*80}")
+        
+        keep_tsv = tsv_path is not None
+        if tsv_path is None:
+            fd, tsv_path = tempfile.mkstemp(prefix='danz_welfare_', suffix='.tsv')
+            os.close(fd)
+        service_tsv_path = tsv_path + '.services'
+        or_tsv_path = tsv_path + '.or'
+        tsv_paths = (tsv_path, service_tsv_path, or_tsv_path)
+        
+        try:
+            start = time.time()
+            count, service_count, or_count = self.write_tsv(json_paths, tsv_path, service_tsv_path, or_tsv_path)
+            write_seconds = time.time() - start
+            size_mb = sum(os.path.getsize(path) for path in tsv_paths) / 1024 / 1024
+            print(f"📝 TSV 혜택 {count:,}행 + 서비스 {service_count:,}행 + OR 조건 {or_count:,}행 "
+                  f"({size_mb:.1f}MB, {write_seconds:.2f}초): {tsv_path}")
             
-            try:
-                self.cursor.execute(sql, (
-                    # 서비스 정보 (9개)
-                    service_id, service_name, detail_url,
-                    sido, sigungu, source,
-                    target_text, criteria_text, support_text,
-                    # 혜택 정보 (8개)
-                    benefit.get('amount'), benefit.get('amount_type'),
-                    benefit.get('amount_unit'), benefit.get('benefit_type'),
-                    benefit.get('payment_cycle'), benefit.get('payment_method'),
-                    benefit.get('payment_timing'), benefit.get('description'),
-                    # AND 조건 (43개)
-                    and_cond.get('age_min_months'), and_cond.get('age_max_months'),
-                    and_cond.get('income_type'), and_cond.get('income_min_percent'), and_cond.get('income_max_percent'),
-                    and_cond.get('household_type'),
-                    and_cond.get('household_members_min'), and_cond.get('household_members_max'),
-                    and_cond.get('children_min'), and_cond.get('children_max'),
-                    and_cond.get('birth_order'), and_cond.get('birth_order_min'),
-                    and_cond.get('birth_order_max'), and_cond.get('residence_min_months'),
-                    and_cond.get('childcare_type'),
-                    and_cond.get('requires_grandparent_care'), and_cond.get('requires_dual_income'),
-                    and_cond.get('requires_disability'), and_cond.get('requires_parent_disability'),
-                    and_cond.get('child_disability_level'), and_cond.get('parent_disability_level'),
-                    and_cond.get('child_has_serious_disease'), and_cond.get('child_has_rare_disease'),
-                    and_cond.get('child_has_chronic_disease'), and_cond.get('child_has_cancer'),
-                    and_cond.get('parent_has_serious_disease'), and_cond.get('parent_has_rare_disease'),
-                    and_cond.get('parent_has_chronic_disease'), and_cond.get('parent_has_cancer'),
-                    and_cond.get('parent_has_infertility'),
-                    and_cond.get('is_violence_victim'), and_cond.get('is_abuse_victim'),
-                    and_cond.get('is_defector'), and_cond.get('is_national_merit'),
-                    and_cond.get('is_foster_child'), and_cond.get('is_single_mother'),
-                    and_cond.get('is_low_income'),
-                    and_cond.get('pregnancy_weeks_min'), and_cond.get('pregnancy_weeks_max'),
-                    and_cond.get('birth_within_months'),
-                    and_cond.get('limit_birth_date'),
-                    and_cond.get('education_level'), and_cond.get('is_enrolled'),
-                    and_cond.get('housing_type'),
-                    # OR 조건 카테고리형 (28개)
-                    or_income, or_household, or_childcare,
-                    or_req_grandparent, or_req_dual,
-                    or_req_disability, or_req_parent_disability, 
-                    or_disability_level, or_parent_disability_level,
-                    or_child_serious, or_child_rare, or_child_chronic, or_child_cancer,
-                    or_parent_serious, or_parent_rare, or_parent_chronic, or_parent_cancer,
-                    or_parent_infertility,
-                    or_violence, or_abuse, or_defector, or_merit, or_foster, or_single,
-                    or_low_income, or_education, or_enrolled, or_housing,
-                    # OR 조건 숫자형 (16개)
-                    or_income_min_percent, or_income_max_percent, 
-                    or_household_members_min, or_household_members_max,
-                    or_children_min, or_children_max, or_birth_order,
-                    or_birth_order_min, or_birth_order_max, or_residence_min_months,
-                    or_pregnancy_weeks_min, or_pregnancy_weeks_max, or_birth_within_months,
-                    or_age_min_months, or_age_max_months, or_limit_birth_date
-                ))  # 총 105개 (9+8+44+28+16)
-            except Exception as e:
-                print(f"❌ 삽입 오류: {e}")
-                print(f"   Service ID: {service_id}")
-                import traceback
-                traceback.print_exc()
+            start = time.time()
+            self.ensure_upsert_columns()
+            if truncate:
+                for table in (self.benefit_table, self.service_table, self.or_table):
+                    self.cursor.execute(f"TRUNCATE TABLE {table}")
+            # 경고(잘림/변환)는 다음 문장이 실행되면 사라짐 → LOAD마다 읽음
+            self.load_warnings = {}
+            warnings = []
+            for table, template, path in ((self.service_table, SERVICE_LOAD_SQL, service_tsv_path),
+                                          (self.benefit_table, LOAD_SQL, tsv_path),
+                                          (self.or_table, OR_LOAD_SQL, or_tsv_path)):
+                affected = self.cursor.execute(self.sql(template), (path,))
+                if table == self.benefit_table:
+                    loaded = affected
+                self.load_warnings[table], sample = self.fetch_warnings()
+                warnings.extend((table, warning) for warning in sample)
+            self.conn.commit()
+            load_seconds = time.time() - start
+        finally:
+            if not keep_tsv:
+                for path in tsv_paths:
+                    if os.path.exists(path):
+                        os.remove(path)
+        
+        total = write_seconds + load_seconds
+        print(f"✅ 적재 {loaded:,}행 (LOAD {load_seconds:.2f}초, 전체 {total:.2f}초 → {count / total if total else 0:,.0f}행/초)")
+        if loaded != count:
+            print(f"⚠️ TSV {count:,}행 중 {loaded:,}행만 적재됨")
+        for table, warning_count in self.load_warnings.items():
+            if warning_count:
+                print(f"⚠️ {table} LOAD 경고 {warning_count:,}건")
+        for table, warning in warnings:
+            print(f"   ⚠️ {table}: {warning}")
+        peak = peak_rss_mb()
+        if peak is not None:
+            print(f"💾 최대 메모리 (peak RSS): {peak:.0f}MB")
+        return loaded
+    
+    def ensure_or_number_column(self):
+        """예전 OR 조건 테이블의 fd_number가 INT면 DECIMAL로 변경 (12.5가 12로 잘리지 않게)"""
+        self.cursor.execute(
+            "SELECT DATA_TYPE FROM information_schema.COLUMNS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = 'fd_number'",
+            (self.or_table,)
+        )
+        found = self.cursor.fetchone()
+        if found and found[0].lower() != 'decimal':
+            self.cursor.execute(f"ALTER TABLE {self.or_table} MODIFY fd_number DECIMAL(12, 2) NULL")
+    
+    def fetch_warnings(self, limit=10):
+        """직전 문장의 경고 → (전체 경고 수, 앞의 limit개)"""
+        self.cursor.execute("SHOW COUNT(*) WARNINGS")
+        count = self.cursor.fetchone()[0]
+        if not count:
+            return 0, []
+        self.cursor.execute(f"SHOW WARNINGS LIMIT {limit}")
+        return count, list(self.cursor.fetchall())
+    
+    def ensure_upsert_columns(self):
+        """fd_benefit_key (UNIQUE) / fd_content_hash / 플래그 마스크 컬럼이 없으면 추가 (MariaDB IF NOT EXISTS)"""
+        self.cursor.execute(
+            f"ALTER TABLE {self.benefit_table} "
+            "ADD COLUMN IF NOT EXISTS fd_benefit_key VARCHAR(80) NULL COMMENT '서비스ID#혜택순번 (업서트 키)', "
+            "ADD COLUMN IF NOT EXISTS fd_content_hash CHAR(40) NULL COMMENT '혜택 내용 SHA1', "
+            "ADD COLUMN IF NOT EXISTS fd_and_mask BIGINT NOT NULL DEFAULT 0 COMMENT 'AND 플래그 비트마스크', "
+            "ADD COLUMN IF NOT EXISTS fd_or_mask BIGINT NOT NULL DEFAULT 0 COMMENT 'OR 플래그 비트마스크', "
+            "ADD UNIQUE INDEX IF NOT EXISTS uk_benefit_key (fd_benefit_key)"
+        )
+    
+    def upsert_files(self, json_paths, prune_services=False):
+        """멱등 업서트: 바뀐 행만 쓰기 → {"inserted", "updated", "unchanged", "deleted", "duplicate", "rejected", "services_written"}
+        
+        삭제 대상: 이번 파일에 있는 서비스의 혜택 중 더 이상 없는 것 (키 없는 예전 행 포함)
+        prune_services: True면 파일에 아예 없는 서비스(서비스 행 + 혜택)도 삭제 (전체 코퍼스 재적재일 때)
+        서비스 행도 내용 해시가 같으면 쓰지 않음, OR 조건 행은 바뀐 혜택만 지우고 다시 씀
+        """
+        print(f"\n{'='*80}")
+        print(f"🔁 업서트: 파일 {len(json_paths)}개 → {self.service_table} / {self.benefit_table} / {self.or_table}")
+        print(f"{'='*80}")
+        start = time.time()
+        self.ensure_upsert_columns()
+        
+        # 현재 상태 (키 → (PK, 해시), 서비스 → [PK], PK → 키, 서비스 → 해시)
+        self.cursor.execute(
+            f"SELECT fd_benefit_id, fd_service_id, fd_benefit_key, fd_content_hash FROM {self.benefit_table}"
+        )
+        existing = {}
+        service_rows = {}
+        keys_by_id = {}
+        for benefit_id, service_id, key, digest in self.cursor.fetchall():
+            service_rows.setdefault(service_id, []).append(benefit_id)
+            if key is not None:
+                existing[key] = (benefit_id, digest)
+                keys_by_id[benefit_id] = key
+        self.cursor.execute(f"SELECT fd_service_id, fd_content_hash FROM {self.service_table}")
+        service_hashes = dict(self.cursor.fetchall())
+        
+        counts = {"inserted": 0, "updated": 0, "unchanged": 0, "deleted": 0, "duplicate": 0, "services_written": 0}
+        errors_before = self.stats['errors']
+        kept = set()
+        seen_services = set()
+        changed = []
+        changed_services = []
+        changed_or = []
+        
+        for json_path in json_paths:
+            for service in iter_services(json_path):
+                if service['service_id'] in seen_services:
+                    # 여러 파일에 같은 서비스 → 처음 것만 사용
+                    counts["duplicate"] += 1
+                    continue
+                seen_services.add(service['service_id'])
+                
+                service_row = self.service_row(service)
+                if service_hashes.get(service_row[0]) != service_row[-1]:
+                    changed_services.append(service_row)
+                
+                conditions = {}
+                for row in self.build_or_rows(service):
+                    conditions.setdefault(row[0], []).append(row)
+                
+                for row in self.hashed_rows(service):
+                    key, digest = row[-2], row[-1]
+                    old = existing.get(key)
+                    if old is None:
+                        counts["inserted"] += 1
+                    else:
+                        kept.add(old[0])
+                        if old[1] == digest:
+                            counts["unchanged"] += 1
+                            continue
+                        counts["updated"] += 1
+                    
+                    changed.append(row)
+                    changed_or.extend(conditions.get(key, []))
+                
+                if max(len(changed), len(changed_services), len(changed_or)) >= self.batch_size:
+                    counts["services_written"] += self.write_upserts(changed_services, changed, changed_or)
+                    changed, changed_services, changed_or = [], [], []
+        
+        counts["services_written"] += self.write_upserts(changed_services, changed, changed_or)
+        
+        stale = [
+            benefit_id
+            for service_id, benefit_ids in service_rows.items()
+            if prune_services or service_id in seen_services
+            for benefit_id in benefit_ids
+            if benefit_id not in kept
+        ]
+        self.delete_in_chunks(self.or_table, 'fd_benefit_key',
+                              [keys_by_id[benefit_id] for benefit_id in stale if benefit_id in keys_by_id])
+        self.delete_in_chunks(self.benefit_table, 'fd_benefit_id', stale)
+        counts["deleted"] = len(stale)
+        if prune_services:
+            self.delete_in_chunks(self.service_table, 'fd_service_id',
+                                  [service_id for service_id in service_hashes if service_id not in seen_services])
+        counts["rejected"] = self.stats['errors'] - errors_before
+        
+        self.conn.commit()
+        
+        print(f"✅ 추가 {counts['inserted']:,} / 수정 {counts['updated']:,} / "
+              f"그대로 {counts['unchanged']:,} / 삭제 {counts['deleted']:,} (서비스 행 쓰기 {counts['services_written']:,})"
+              + (f" (중복 서비스 {counts['duplicate']}개 건너뜀)" if counts['duplicate'] else "")
+              + (f", 거부 {counts['rejected']} → {self.reject_path}" if counts['rejected'] else "")
+              + f" | {time.time() - start:.2f}초")
+        return counts
+    
+    def write_upserts(self, service_rows, benefit_rows, or_rows):
+        """업서트 묶음 전송 (서비스 → 혜택 → OR 조건) → 쓴 서비스 행 수
+        
+        바뀐 혜택의 OR 조건 행은 지우고 새로 넣음 (조건 값이 줄어든 경우 포함)
+        서비스 행이 거부되면 그 서비스의 혜택 / OR 조건 행도 쓰지 않음, 거부된 혜택 행의 OR 조건 행도 쓰지 않음
+        """
+        written = 0
+        if service_rows:
+            rejected = []
+            written = self.insert_rows(service_rows, SERVICE_UPSERT_SQL, SERVICE_UPSERT_COLUMNS, rejected)
+            benefit_rows, or_rows = self.skip_rejected_services(rejected, benefit_rows, or_rows)
+        if benefit_rows:
+            rejected = []
+            self.insert_rows(benefit_rows, UPSERT_SQL, UPSERT_COLUMNS, rejected)
+            # 거부된 혜택은 예전 행이 그대로 남음 → 예전 OR 조건 행도 유지
+            rejected_keys = {row[-2] for row in rejected}
+            self.delete_in_chunks(self.or_table, 'fd_benefit_key',
+                                  [row[-2] for row in benefit_rows if row[-2] not in rejected_keys])
+            or_rows = self.skip_rejected_benefits(rejected, or_rows)
+        if or_rows:
+            self.insert_rows(or_rows, OR_INSERT_SQL, OR_TABLE_COLUMNS)
+        return written
+    
+    def delete_in_chunks(self, table, key_column, keys):
+        for i in range(0, len(keys), self.batch_size):
+            chunk = keys[i:i + self.batch_size]
+            self.cursor.execute(
+                f"DELETE FROM {table} WHERE {key_column} IN ({', '.join(['%s'] * len(chunk))})",
+                chunk
+            )
+    
+    def reload_with_swap(self, json_paths, bulk=True, min_ratio=0.5):
+        """무중단 전체 재적재 → 검증 결과 딕셔너리 (swapped: 교체 여부)
+        
+        bulk: True면 TSV + LOAD DATA, False면 배치 INSERT로 스테이징 적재
+        min_ratio: 스테이징 행 수가 현재 테이블의 이 비율보다 적으면 교체하지 않음 (파싱 누락 방지)
+        적재/검증에 실패하면 현재 테이블은 그대로 두고 스테이징 테이블은 확인용으로 남깁니다.
+        서비스/혜택/OR 조건 테이블을 RENAME TABLE 한 문장으로 같이 교체 → 호환 뷰도 바로 새 세대를 봄
+        """
+        print(f"\n{'='*80}")
+        print(f"🔀 무중단 재적재: *{STAGING} → {' / '.join(TABLES)}")
+        print(f"{'='*80}")
+        
+        self.create_staging()
+        self.suffix = STAGING
+        self.seen_services = set()
+        self.load_warnings = {}  # 배치 INSERT로 적재하면 LOAD 경고 없음
+        try:
+            if bulk:
+                loaded = self.bulk_load(json_paths)
+            else:
+                before = self.stats['rows']
+                for json_path in json_paths:
+                    self.convert_json_to_db(json_path)
+                loaded = self.stats['rows'] - before
+        finally:
+            self.suffix = ''
+        
+        return self.swap_staging(loaded, min_ratio)
+    
+    def create_staging(self):
+        """현재 테이블과 같은 구조의 빈 *_staging 테이블 생성 (남아 있던 스테이징은 삭제)"""
+        for table in TABLES:
+            self.cursor.execute(f"DROP TABLE IF EXISTS {table}{STAGING}")
+            self.cursor.execute(f"CREATE TABLE {table}{STAGING} LIKE {table}")
+    
+    def swap_staging(self, loaded, min_ratio=0.5):
+        """스테이징 검증 → 통과하면 RENAME TABLE 한 문장으로 교체 → 검증 결과 딕셔너리 (swapped: 교체 여부)
+        
+        loaded: 스테이징에 넣었다고 보고된 혜택 행 수 (병렬 적재에서도 사용)
+        """
+        report = self.validate_staging(loaded, min_ratio)
+        print(f"🔎 검증: 스테이징 혜택 {report['staging_rows']:,}행 / 서비스 {report['staging_services']:,}개 "
+              f"(현재 {report['live_rows']:,}행)")
+        if report['problems']:
+            for problem in report['problems']:
+                print(f"   ❌ {problem}")
+            print(f"⚠️ 교체하지 않음 (현재 테이블 그대로, *{STAGING} 확인용으로 남김)")
+            return report
+        
+        # 예전 _prev는 같은 RENAME 안에서 _old로 밀어내고 교체가 끝난 뒤 삭제
+        # (DDL은 문장마다 commit → RENAME이 실패해도 롤백용 _prev는 남음)
+        self.cursor.execute(
+            "SELECT TABLE_NAME FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() "
+            f"AND TABLE_NAME IN ({', '.join(['%s'] * len(TABLES))})",
+            [table + PREVIOUS for table in TABLES]
+        )
+        previous = {row[0] for row in self.cursor.fetchall()}
+        renames = []
+        for table in TABLES:
+            self.cursor.execute(f"DROP TABLE IF EXISTS {table}{RETIRED}")  # 지난 실행에서 남은 것
+            if table + PREVIOUS in previous:
+                renames.append(f"{table}{PREVIOUS} TO {table}{RETIRED}")
+            renames.append(f"{table} TO {table}{PREVIOUS}, {table}{STAGING} TO {table}")
+        self.cursor.execute("RENAME TABLE " + ", ".join(renames))
+        for table in TABLES:
+            self.cursor.execute(f"DROP TABLE IF EXISTS {table}{RETIRED}")
+        report['swapped'] = True
+        print(f"✅ 교체 완료 (직전 세대: *{PREVIOUS}, 되돌리기: rollback_swap())")
+        return report
+    
+    def validate_staging(self, loaded, min_ratio):
+        """스테이징 테이블 건수 검증 → {staging_rows, staging_services, live_rows, load_warnings, problems, swapped}
+
+        load_warnings: 스테이징에 bulk_load했으면 테이블별 LOAD DATA 경고 수 (잘리거나 변환된 값이 있으면 교체하지 않음)
+        """
+        benefits, services = BENEFIT_TABLE + STAGING, SERVICE_TABLE + STAGING
+        self.cursor.execute(
+            f"SELECT COUNT(*), COALESCE(SUM(fd_service_id IS NULL), 0) FROM {benefits}"
+        )
+        rows, missing_ids = self.cursor.fetchone()
+        self.cursor.execute(f"SELECT COUNT(*) FROM {services}")
+        service_count = self.cursor.fetchone()[0]
+        # 서비스 행이 없는 혜택 (호환 뷰에서 서비스명/원문이 비게 됨)
+        self.cursor.execute(
+            f"SELECT COUNT(*) FROM {benefits} b LEFT JOIN {services} s ON s.fd_service_id = b.fd_service_id "
+            f"WHERE s.fd_service_id IS NULL"
+        )
+        orphans = self.cursor.fetchone()[0]
+        self.cursor.execute(f"SELECT COUNT(*) FROM {BENEFIT_TABLE}")
+        live_rows = self.cursor.fetchone()[0]
+        
+        problems = []
+        if rows == 0:
+            problems.append("스테이징 테이블이 비어 있음")
+        if rows != loaded:
+            problems.append(f"적재 {loaded:,}행인데 스테이징 {rows:,}행")
+        if missing_ids:
+            problems.append(f"fd_service_id 없는 행 {missing_ids:,}개")
+        if orphans:
+            problems.append(f"서비스 행이 없는 혜택 {orphans:,}개")
+        if live_rows and rows < live_rows * min_ratio:
+            problems.append(f"현재 테이블 대비 {rows / live_rows:.0%} (기준 {min_ratio:.0%} 이상)")
+        load_warnings = {table: count for table, count in self.load_warnings.items() if table.endswith(STAGING)}
+        for table, count in load_warnings.items():
+            if count:
+                problems.append(f"{table} LOAD DATA 경고 {count:,}건 (잘림/변환)")
+        
+        return {
+            "staging_rows": rows,
+            "staging_services": service_count,
+            "live_rows": live_rows,
+            "load_warnings": load_warnings,
+            "problems": problems,
+            "swapped": False
+        }
+    
+    def rollback_swap(self):
+        """직전 세대로 즉시 되돌림 (지금 세대는 _prev로 보관 → 한 번 더 실행하면 원래대로)"""
+        self.cursor.execute(
+            "RENAME TABLE "
+            + ", ".join(f"{table} TO {table}_swap, {table}{PREVIOUS} TO {table}, {table}_swap TO {table}{PREVIOUS}"
+                        for table in TABLES)
+        )
+        print(f"↩️ *{PREVIOUS} ↔ 현재 세대 교체 완료")
+    
+    def compat_view_type(self):
+        """danz_welfare_services의 TABLE_TYPE ('VIEW' / 'BASE TABLE', 없으면 None)"""
+        self.cursor.execute(
+            "SELECT TABLE_TYPE FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+            (COMPAT_VIEW,)
+        )
+        found = self.cursor.fetchone()
+        return found[0] if found else None
+    
+    def create_schema(self):
+        """서비스/혜택/OR 조건 테이블 + 호환 뷰가 없으면 생성 (새 DB, 로컬 컨테이너용)
+        
+        danz_welfare_services가 아직 예전 통합 테이블이면 뷰로 덮어쓸 수 없음 → 먼저 migrate 실행
+        """
+        if self.compat_view_type() == 'BASE TABLE':
+            raise RuntimeError(
+                f"{COMPAT_VIEW}가 아직 예전 통합 테이블입니다 → mode = \"migrate\"로 "
+                "migrate_to_split_schema()를 먼저 한 번 실행하세요"
+            )
+        self.cursor.execute(SERVICE_TABLE_DDL)
+        self.cursor.execute(BENEFIT_TABLE_DDL)
+        self.cursor.execute(OR_TABLE_DDL)
+        self.ensure_upsert_columns()
+        self.ensure_or_number_column()
+        self.create_compat_view()
+        self.conn.commit()
+        print(f"✅ 스키마 준비: {', '.join(TABLES)}, 뷰 {COMPAT_VIEW}")
+    
+    def create_compat_view(self):
+        """예전 통합 테이블과 같은 컬럼의 뷰 (혜택 테이블 컬럼 + 서비스명/URL/원문)"""
+        self.cursor.execute(
+            "SELECT COLUMN_NAME FROM information_schema.COLUMNS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s ORDER BY ORDINAL_POSITION",
+            (BENEFIT_TABLE,)
+        )
+        benefit_columns = [row[0] for row in self.cursor.fetchall()]
+        select = [f"b.{column}" for column in benefit_columns] + [f"s.{column}" for column in SERVICE_INFO_COLUMNS[1:]]
+        self.cursor.execute(
+            f"CREATE OR REPLACE VIEW {COMPAT_VIEW} AS SELECT {', '.join(select)} "
+            f"FROM {BENEFIT_TABLE} b LEFT JOIN {SERVICE_TABLE} s ON s.fd_service_id = b.fd_service_id"
+        )
+    
+    def migrate_to_split_schema(self):
+        """예전 통합 테이블(danz_welfare_services) → 서비스/혜택 테이블 + 호환 뷰 (한 번만 실행)
+        
+        통합 테이블은 danz_welfare_services_legacy로 이름을 바꿔서 보관합니다.
+        """
+        if self.compat_view_type() != 'BASE TABLE':
+            print(f"ℹ️ 통합 테이블 {COMPAT_VIEW}가 없거나 이미 뷰입니다 → create_schema()만 실행")
+            self.create_schema()
+            return
+        
+        print(f"🧱 {COMPAT_VIEW} → {SERVICE_TABLE} + {BENEFIT_TABLE} 분리")
+        self.cursor.execute(SERVICE_TABLE_DDL)
+        # 혜택 테이블은 통합 테이블 구조(타입/인덱스) 그대로에서 서비스 텍스트만 제거
+        self.cursor.execute(f"CREATE TABLE IF NOT EXISTS {BENEFIT_TABLE} LIKE {COMPAT_VIEW}")
+        self.cursor.execute(
+            f"ALTER TABLE {BENEFIT_TABLE} "
+            + ", ".join(f"DROP COLUMN IF EXISTS {column}" for column in SERVICE_INFO_COLUMNS[1:])
+            + ", ADD INDEX IF NOT EXISTS idx_service_id (fd_service_id)"
+        )
+        
+        # 서비스 행: 서비스마다 첫 혜택 행의 텍스트 사용
+        self.cursor.execute(
+            f"INSERT IGNORE INTO {SERVICE_TABLE} ({', '.join(SERVICE_INFO_COLUMNS)}) "
+            f"SELECT {', '.join(SERVICE_INFO_COLUMNS)} FROM {COMPAT_VIEW} ORDER BY fd_benefit_id"
+        )
+        services = self.cursor.rowcount
+        
+        self.cursor.execute(
+            "SELECT COLUMN_NAME FROM information_schema.COLUMNS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s ORDER BY ORDINAL_POSITION",
+            (BENEFIT_TABLE,)
+        )
+        columns = ', '.join(row[0] for row in self.cursor.fetchall())
+        self.cursor.execute(f"INSERT INTO {BENEFIT_TABLE} ({columns}) SELECT {columns} FROM {COMPAT_VIEW}")
+        benefits = self.cursor.rowcount
+        
+        self.cursor.execute(f"RENAME TABLE {COMPAT_VIEW} TO {LEGACY_TABLE}")
+        self.ensure_upsert_columns()
+        self.create_compat_view()
+        self.conn.commit()
+        print(f"✅ 서비스 {services:,}행 / 혜택 {benefits:,}행 이동, 통합 테이블은 {LEGACY_TABLE}로 보관")
+        self.backfill_or_table()
+        self.backfill_masks()
+        self.storage_report()
+    
+    def backfill_or_table(self):
+        """fd_or_* 쉼표 문자열 → OR 조건 테이블 다시 채움 (예전 방식으로 적재된 DB용) → 넣은 행 수
+        
+        혜택 키가 없는 행은 서비스 안 순서(fd_benefit_id)대로 비어 있는 순번을 붙임
+        """
+        self.ensure_upsert_columns()
+        self.cursor.execute(OR_TABLE_DDL)
+        self.ensure_or_number_column()
+        self.cursor.execute(
+            f"SELECT fd_benefit_id, fd_service_id, fd_benefit_key, {', '.join(column for column, _ in OR_COLUMNS)} "
+            f"FROM {self.benefit_table} ORDER BY fd_service_id, fd_benefit_id"
+        )
+        rows = self.cursor.fetchall()
+        
+        used_keys = {row[2] for row in rows if row[2] is not None}
+        next_index = {}
+        new_keys = []
+        conditions = []
+        for benefit_id, service_id, key, *values in rows:
+            if key is None:
+                index = next_index.get(service_id, 0)
+                while benefit_key(service_id, index) in used_keys:
+                    index += 1
+                key = benefit_key(service_id, index)
+                next_index[service_id] = index + 1
+                used_keys.add(key)
+                new_keys.append((key, benefit_id))
+            or_cond = {
+                field: str(value)
+                for (_, field), value in zip(OR_COLUMNS, values)
+                if value is not None
+            }
+            conditions.extend(or_rows(key, or_cond))
+        
+        if new_keys:
+            self.cursor.executemany(
+                f"UPDATE {self.benefit_table} SET fd_benefit_key = %s WHERE fd_benefit_id = %s", new_keys
+            )
+        self.cursor.execute(f"DELETE FROM {self.or_table}")
+        inserted = 0
+        for i in range(0, len(conditions), self.batch_size):
+            inserted += self.insert_rows(conditions[i:i + self.batch_size], OR_INSERT_SQL, OR_TABLE_COLUMNS)
+        self.conn.commit()
+        print(f"✅ OR 조건 {inserted:,}행 채움 (혜택 {len(rows):,}개, 새 혜택 키 {len(new_keys):,}개)")
+        return inserted
+    
+    def backfill_masks(self):
+        """플래그 컬럼 → fd_and_mask / fd_or_mask (UPDATE 한 번, 예전 방식으로 적재된 DB용) → 바뀐 행 수"""
+        self.ensure_upsert_columns()
+        or_columns = {field: column for column, field in OR_CATEGORY_COLUMNS}
+        and_mask = ' | '.join(
+            f"((fd_{field} IS NOT NULL) << {bit})" for bit, field in enumerate(FLAG_FIELDS)
+        )
+        or_mask = ' | '.join(
+            f"(({or_columns[field]} IS NOT NULL) << {bit})" for bit, field in enumerate(FLAG_FIELDS)
+        )
+        updated = self.cursor.execute(
+            f"UPDATE {self.benefit_table} SET fd_and_mask = {and_mask}, fd_or_mask = {or_mask}"
+        )
+        self.conn.commit()
+        print(f"✅ 플래그 마스크 {updated:,}행 갱신")
+        return updated
+    
+    def storage_report(self, repeat=5):
+        """통합 테이블(legacy) vs 분리 테이블 크기 + 혜택 전체 스캔 시간"""
+        self.cursor.execute(
+            "SELECT TABLE_NAME, TABLE_ROWS, DATA_LENGTH, INDEX_LENGTH FROM information_schema.TABLES "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME IN (%s, %s, %s)",
+            (LEGACY_TABLE, SERVICE_TABLE, BENEFIT_TABLE)
+        )
+        sizes = {name: (rows, data + index) for name, rows, data, index in self.cursor.fetchall()}
+        print(f"\n💽 테이블 크기 (데이터 + 인덱스, 버퍼 풀에 올라가는 양)")
+        for name, (rows, size) in sizes.items():
+            print(f"  {name}: 약 {rows:,}행, {size / 1024 / 1024:.1f}MB")
+        if LEGACY_TABLE in sizes:
+            split = sum(size for name, (_, size) in sizes.items() if name != LEGACY_TABLE)
+            print(f"  → 분리 후 {split / 1024 / 1024:.1f}MB (통합 대비 {split / max(sizes[LEGACY_TABLE][1], 1):.0%})")
+        
+        # 검색처럼 혜택 행 전체를 훑는 쿼리
+        scan = "SELECT COUNT(*) FROM {table} WHERE fd_age_max_months IS NULL OR fd_age_max_months >= 12"
+        print(f"\n⏱️ 혜택 전체 스캔 ({repeat}회 평균)")
+        for table in (LEGACY_TABLE, BENEFIT_TABLE):
+            if table not in sizes:
+                continue
+            start = time.time()
+            for _ in range(repeat):
+                self.cursor.execute(scan.format(table=table))
+                self.cursor.fetchall()
+            print(f"  {table}: {(time.time() - start) / repeat * 1000:.1f}ms")
     
     def convert_json_to_db(self, json_path):
         """JSON → DB 변환"""
@@ -241,21 +1150,23 @@ class WelfareConverter:
         print(f"📥 처리 중: {json_path}")
         print(f"{'='*80}\n")
         
-        with open(json_path, 'r', encoding='utf-8') as f:
-            services = json.load(f)
-        
-        print(f"서비스 개수: {len(services)}\n")
-        
-        for idx, service in enumerate(services, 1):
-            print(f"[{idx}/{len(services)}] {service['service_name']}")
-            benefits = service.get('parsed_data', {}).get('benefits', [])
-            print(f"  💰 혜택 {len(benefits)}개")
+        # 서비스를 하나씩 읽음 (파일 전체를 메모리에 올리지 않음)
+        count = 0
+        for idx, service in enumerate(iter_services(json_path), 1):
+            if self.verbose:
+                print(f"[{idx}] {service['service_name']}")
+                benefits = service.get('parsed_data', {}).get('benefits', [])
+                print(f"  💰 혜택 {len(benefits)}개")
             
             self.insert_unified(service)
+            count = idx
         
-        self.conn.commit()
+        self.flush()
+        self.commit()
+        peak = peak_rss_mb()
         print(f"\n{'='*80}")
-        print(f"✅ 변환 완료!")
+        print(f"✅ 변환 완료! 서비스 {count}개"
+              + (f" (최대 메모리 {peak:.0f}MB)" if peak is not None else ""))
         print(f"{'='*80}")
     
     def close(self):
@@ -264,7 +1175,24 @@ class WelfareConverter:
         print("✅ DB 연결 종료")
 
 if __name__ == "__main__":
-    converter = WelfareConverter()
+    # "batch": 배치 INSERT | "bulk": TSV + LOAD DATA (테이블 비우고 전체 재적재)
+    # "upsert": 바뀐 혜택만 반영 (다시 실행해도 중복 없음)
+    # "swap": 스테이징 테이블에 전체 적재 → 검증 → RENAME TABLE로 교체 (무중단)
+    # "migrate": 예전 통합 테이블 → 서비스/혜택 테이블 + 호환 뷰 (한 번만), 크기 비교 리포트
+    mode = "upsert"
+    
+    converter = WelfareConverter(batch_size=500)  # 로컬 컨테이너: host='127.0.0.1'
+    
+    if mode == "migrate":
+        converter.migrate_to_split_schema()
+        converter.close()
+        exit(0)
+    try:
+        converter.create_schema()
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        converter.close()
+        exit(1)
     
     json_files = glob.glob('./정형화데이터/정형화데이터_*.json')
     
@@ -274,9 +1202,19 @@ if __name__ == "__main__":
     
     print(f"📂 발견된 파일: {len(json_files)}개")
     
-    for json_file in json_files:
-        converter.convert_json_to_db(json_file)
+    start_time = time.time()
+    if mode == "bulk":
+        converter.bulk_load(json_files, truncate=True)
+    elif mode == "upsert":
+        converter.upsert_files(json_files, prune_services=True)
+    elif mode == "swap":
+        converter.reload_with_swap(json_files, bulk=True)
+    else:
+        for json_file in json_files:
+            converter.convert_json_to_db(json_file)
+        converter.print_stats()
     
+    print(f"⏱️ 전체 {time.time() - start_time:.1f}초")
     converter.close()
     
     print("\n" + "="*80)
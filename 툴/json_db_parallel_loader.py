@@ -0,0 +1,273 @@
+"""
+정형화데이터 JSON → danz_welfare_service_info / danz_welfare_benefits / danz_welfare_benefit_or 병렬 적재
+- ⭐ 서비스 묶음(chunk)을 여러 프로세스에 나눠서 적재 (파일 수보다 프로세스가 많아도 분산됨)
+- ⭐ 프로세스마다 pymysql 연결 1개 + 배치 INSERT (WelfareConverter.insert_unified / flush)
+- ⭐ 묶음 단위 commit (한 프로세스가 실패해도 다른 묶음은 보존), 넣지 못한 행은 reject JSONL
+- ⭐ 교착 상태(1213)면 그 묶음을 롤백하고 처음부터 다시 적재 (DEADLOCK_RETRIES번까지)
+- ⭐ 실제 테이블은 *_staging에 병렬 적재 → 검증 → RENAME TABLE로 교체 (reload_with_swap과 같은 절차, 무중단)
+- ⭐ 중복 서비스는 부모 프로세스에서 걸러서 넘김 (다른 프로세스에 들어가서 혜택 키가 겹치지 않게)
+- ⭐ 벤치마크: 프로세스 1~N개 × 원본 4개 파일 / 100배 복제 코퍼스 → 시간, 행/초, 배속
+
+사용법:
+  python 툴/json_db_parallel_loader.py                 → 정형화데이터/ 전체를 병렬 적재 (스테이징 → 교체)
+  python 툴/json_db_parallel_loader.py --benchmark     → 벤치마크 (*_bench 테이블 사용)
+"""
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import pymysql
+
+from json_db_converter_v5_limit_Birth_추가 import DEADLOCK_ERRORS, STAGING, TABLES, WelfareConverter
+from welfare_json import iter_services
+
+BENCH = '_bench'  # 벤치마크 테이블 접미사
+DEADLOCK_RETRIES = 3  # 교착 상태일 때 묶음 재시도 횟수
+
+# 작업 프로세스의 변환기 (프로세스마다 DB 연결 1개)
+_converter = None
+# 종료 작업을 프로세스마다 하나씩 나눠 받게 하는 barrier (프로세스 없이 실행하면 None)
+_close_barrier = None
+
+
+def _init_worker(batch_size, suffix, db, close_barrier=None):
+    global _converter, _close_barrier
+    # 묶음 = commit 단위 (묶음 중간에 commit하지 않아야 교착 상태 때 묶음 전체를 다시 넣을 수 있음)
+    _converter = WelfareConverter(batch_size=batch_size, verbose=False, commit_every=sys.maxsize, **db)
+    _converter.suffix = suffix
+    _close_barrier = close_barrier
+
+
+def _close_worker():
+    """작업 프로세스의 DB 연결 종료 (run()이 프로세스마다 1번 보냄)
+
+    작업 프로세스는 os._exit로 끝나서 atexit가 실행되지 않음 → 직접 닫지 않으면 aborted client로 남음
+    """
+    global _converter
+    if _close_barrier is not None:
+        # 모든 프로세스가 종료 작업을 하나씩 받을 때까지 대기 (한 프로세스가 두 개 받지 않게)
+        try:
+            _close_barrier.wait(timeout=60)
+        except multiprocessing.BrokenBarrierError:
+            pass
+    if _converter is not None:
+        _converter.close()
+        _converter = None
+
+
+def _load_chunk(services):
+    """서비스 묶음 1개 적재 + commit → (서비스 수, 행 수, 오류 행 수)
+
+    교착 상태면 롤백하고 묶음 전체를 다시 적재 (DEADLOCK_RETRIES번 실패하면 raise)
+    """
+    stats = _converter.stats
+    for attempt in range(1, DEADLOCK_RETRIES + 1):
+        before = dict(stats)
+        try:
+            for service in services:
+                _converter.insert_unified(service)
+            _converter.flush()
+            _converter.commit()
+        except pymysql.MySQLError as e:
+            if not (e.args and e.args[0] in DEADLOCK_ERRORS) or attempt == DEADLOCK_RETRIES:
+                raise
+            _converter.rollback()
+            stats.update(before)
+            _converter.seen_services.difference_update(service['service_id'] for service in services)
+            print(f"🔁 교착 상태 → 묶음 다시 적재 ({attempt}/{DEADLOCK_RETRIES - 1})")
+            time.sleep(0.1 * attempt)
+            continue
+        return len(services), stats['rows'] - before['rows'], stats['errors'] - before['errors']
+
+
+def iter_chunks(json_paths, chunk_size, duplicates=None):
+    """파일들의 서비스를 chunk_size개씩 묶어서 반환 (스트리밍)
+
+    같은 파일이 여러 번 나오면 (벤치마크 복제) 두 번째부터 service_id에 ~복제번호를 붙임
+    → 혜택 키가 겹치지 않아서 복제본도 전부 적재됨
+    그 밖에 같은 service_id가 다시 나오면 처음 것만 사용 (duplicates: 건너뛴 ID를 모을 리스트)
+    """
+    replicas = Counter()
+    seen_services = set()
+    chunk = []
+    for path in json_paths:
+        replica = replicas[path]
+        replicas[path] += 1
+        for service in iter_services(path):
+            if replica:
+                service['service_id'] = f"{service['service_id']}~{replica}"
+            if service['service_id'] in seen_services:
+                if duplicates is not None:
+                    duplicates.append(service['service_id'])
+                continue
+            seen_services.add(service['service_id'])
+            chunk.append(service)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+
+class ParallelLoader:
+    def __init__(self, workers=None, batch_size=500, chunk_size=200, suffix=STAGING, db=None):
+        """
+        workers: 작업 프로세스 수 (None이면 CPU 수, 1이면 프로세스 없이 실행)
+        batch_size: executemany 한 번에 보내는 행 수
+        chunk_size: 프로세스에 한 번에 넘기는 서비스 수 (= commit 단위)
+        suffix: run()이 적재할 테이블 접미사 (STAGING 스테이징, BENCH 벤치마크)
+                실제 테이블에 바로 넣으면 적재 중에 일부만 보이므로 reload() 사용
+        db: WelfareConverter 연결 설정 (host, port, user, password, database)
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.chunk_size = chunk_size
+        self.suffix = suffix
+        self.db = db or {}
+
+    def run(self, json_paths):
+        """파일 목록 적재 → 리포트 딕셔너리"""
+        start_time = time.time()
+        totals = {"services": 0, "rows": 0, "errors": 0}
+        duplicates = []
+
+        def consume(result):
+            services, rows, errors = result
+            totals["services"] += services
+            totals["rows"] += rows
+            totals["errors"] += errors
+
+        chunks = iter_chunks(json_paths, self.chunk_size, duplicates)
+        if self.workers == 1:
+            _init_worker(self.batch_size, self.suffix, self.db)
+            try:
+                for chunk in chunks:
+                    consume(_load_chunk(chunk))
+            finally:
+                _close_worker()
+        else:
+            close_barrier = multiprocessing.Barrier(self.workers)
+            with ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(self.batch_size, self.suffix, self.db, close_barrier)
+            ) as executor:
+                try:
+                    # 한 번에 workers*2 묶음만 메모리에 올림
+                    pending = []
+                    for chunk in chunks:
+                        pending.append(executor.submit(_load_chunk, chunk))
+                        if len(pending) >= self.workers * 2:
+                            consume(pending.pop(0).result())
+                    for future in pending:
+                        consume(future.result())
+                finally:
+                    # 프로세스마다 DB 연결을 닫고 종료
+                    for future in [executor.submit(_close_worker) for _ in range(self.workers)]:
+                        future.result()
+
+        seconds = time.time() - start_time
+        return {
+            "files": len(json_paths),
+            "workers": self.workers,
+            **totals,
+            "duplicates": len(duplicates),
+            "seconds": round(seconds, 2),
+            "rows_per_second": round(totals["rows"] / seconds) if seconds else 0
+        }
+
+    def reload(self, json_paths, min_ratio=0.5):
+        """무중단 전체 재적재: *_staging에 병렬 적재 → 검증 → RENAME TABLE로 교체 → 리포트 (+ swap 검증 결과)
+
+        검증에 실패하면 현재 테이블은 그대로 두고 스테이징 테이블은 확인용으로 남깁니다.
+        """
+        admin = WelfareConverter(**self.db)
+        try:
+            admin.create_staging()
+            self.suffix = STAGING
+            report = self.run(json_paths)
+            print_report(report)
+            report["swap"] = admin.swap_staging(report["rows"], min_ratio)
+        finally:
+            admin.close()
+        return report
+
+
+def print_report(report):
+    print(f"📊 파일 {report['files']}개, 서비스 {report['services']:,}개 → {report['rows']:,}행 "
+          f"(프로세스 {report['workers']}개, {report['seconds']}초, {report['rows_per_second']:,}행/초)"
+          + (f", 오류 {report['errors']}행" if report['errors'] else "")
+          + (f", 중복 서비스 {report['duplicates']}개 건너뜀" if report['duplicates'] else ""))
+
+
+def benchmark(json_paths, max_workers=None, replicas=(1, 100), db=None, batch_size=500, chunk_size=200):
+    """프로세스 1~max_workers개 × 복제 배수별 적재 시간 → 결과 목록
+
+    서비스/혜택/OR 조건 테이블 구조를 복사한 *_bench 테이블 사용 (실제 테이블은 건드리지 않음)
+    복제는 같은 파일을 여러 번 읽어서 적재 (파일 복사 없음)
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    admin = WelfareConverter(**(db or {}))
+    tables = [table + BENCH for table in TABLES]
+    for table in TABLES:
+        admin.cursor.execute(f"DROP TABLE IF EXISTS {table}{BENCH}")
+        admin.cursor.execute(f"CREATE TABLE {table}{BENCH} LIKE {table}")
+
+    results = []
+    try:
+        for replica in replicas:
+            paths = list(json_paths) * replica
+            baseline = None
+            print(f"\n{'='*80}")
+            print(f"🏁 벤치마크: 파일 {len(json_paths)}개 × {replica}")
+            print(f"{'='*80}")
+            for workers in range(1, max_workers + 1):
+                for table in tables:
+                    admin.cursor.execute(f"TRUNCATE TABLE {table}")
+                loader = ParallelLoader(workers=workers, batch_size=batch_size, chunk_size=chunk_size,
+                                        suffix=BENCH, db=db)
+                report = loader.run(paths)
+                report["replica"] = replica
+                baseline = baseline or report["seconds"]
+                report["speedup"] = round(baseline / report["seconds"], 2) if report["seconds"] else 0
+                results.append(report)
+                print_report(report)
+                print(f"   → 프로세스 1개 대비 {report['speedup']}배")
+    finally:
+        for table in tables:
+            admin.cursor.execute(f"DROP TABLE IF EXISTS {table}")
+        admin.close()
+
+    print(f"\n{'='*80}")
+    print(f"📈 요약 (프로세스 수 → 초 / 배속)")
+    print(f"{'='*80}")
+    for replica in replicas:
+        rows = [r for r in results if r["replica"] == replica]
+        print(f"  ×{replica}: " + ", ".join(f"{r['workers']}개 {r['seconds']}초/{r['speedup']}배" for r in rows))
+    return results
+
+
+# 사용 예시
+if __name__ == '__main__':
+    import glob
+
+    json_files = sorted(glob.glob('./정형화데이터/정형화데이터_*.json'))
+    if not json_files:
+        print("❌ 정형화데이터 폴더에 JSON 파일이 없습니다!")
+        exit(1)
+
+    db = {}  # 로컬 컨테이너: {"host": "127.0.0.1"}
+
+    if '--benchmark' in sys.argv:
+        results = benchmark(json_files, max_workers=8, replicas=(1, 100), db=db)
+        report_path = f"db_load_benchmark_{time.strftime('%m%d_%H%M')}.json"
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"📄 리포트: {report_path}")
+    else:
+        loader = ParallelLoader(workers=4, batch_size=500, chunk_size=200, db=db)
+        loader.reload(json_files)
@@ -0,0 +1,182 @@
+"""
+LLM 응답 JSON 복구
+- ⭐ 가벼운 형식 오류 복구: ```json 코드블록, JSON 앞뒤 설명문, 끝에 남은 쉼표
+- ⭐ 잘린 응답에서 끝까지 받은 배열 원소(benefits)만 건져냄
+  → 파서는 나머지 혜택만 다시 요청 (전체 재시도 X)
+- ⭐ 스트리밍 응답을 받는 중에 금지된 키 감시 (JSONKeyWatcher) → 틀린 응답은 끝까지 기다리지 않음
+"""
+import json
+
+_decoder = json.JSONDecoder()
+
+
+def _strip_wrapping(text):
+    """코드블록 / JSON 앞뒤 설명문 제거"""
+    text = text.strip()
+    if text.startswith('```'):
+        text = text.split('\n', 1)[1] if '\n' in text else ''
+        if text.rstrip().endswith('```'):
+            text = text.rstrip()[:-3]
+    start = text.find('{')
+    return text[start:] if start > 0 else text
+
+
+def _remove_trailing_commas(text):
+    """문자열 밖의 ", }" / ", ]" 에서 쉼표 제거"""
+    result = []
+    in_string = False
+    escaped = False
+    pending_comma = None
+
+    for ch in text:
+        if in_string:
+            result.append(ch)
+            if escaped:
+                escaped = False
+            elif ch == '\\':
+                escaped = True
+            elif ch == '"':
+                in_string = False
+            continue
+
+        if pending_comma is not None:
+            if ch in ' \t\r\n':
+                pending_comma.append(ch)
+                continue
+            if ch not in '}]':
+                result.extend(pending_comma)
+            else:
+                result.extend(pending_comma[1:])
+            pending_comma = None
+
+        if ch == ',':
+            pending_comma = [ch]
+        else:
+            result.append(ch)
+            if ch == '"':
+                in_string = True
+
+    if pending_comma is not None:
+        result.extend(pending_comma)
+    return ''.join(result)
+
+
+def loads_lenient(text):
+    """json.loads + 가벼운 형식 오류 복구 → (결과, 복구 여부)
+
+    복구할 수 없으면 원래 json.JSONDecodeError를 올립니다.
+    """
+    try:
+        return json.loads(text), False
+    except json.JSONDecodeError as error:
+        original_error = error
+
+    cleaned = _remove_trailing_commas(_strip_wrapping(text))
+    try:
+        result, end = _decoder.raw_decode(cleaned)
+    except json.JSONDecodeError:
+        raise original_error
+    return result, True
+
+
+def salvage_array_items(text, key="benefits"):
+    """잘린 응답에서 key 배열의 완성된 원소만 꺼냄 → [원소] (못 찾으면 [])
+
+    예: '{"benefits": [{...}, {...}, {"amount": 10' → 앞의 원소 2개
+    """
+    text = _strip_wrapping(text)
+    marker = text.find(f'"{key}"')
+    if marker < 0:
+        return []
+
+    pos = text.find('[', marker)
+    if pos < 0 or text[marker + len(key) + 2:pos].strip() != ':':
+        return []
+    pos += 1
+
+    items = []
+    while True:
+        while pos < len(text) and text[pos] in ' \t\r\n,':
+            pos += 1
+        if pos >= len(text) or text[pos] == ']':
+            return items
+        try:
+            item, pos = _decoder.raw_decode(text, pos)
+        except json.JSONDecodeError:
+            return items
+        if isinstance(item, dict):
+            items.append(item)
+
+
+class PartialJSON(ValueError):
+    """JSON이 잘렸지만 완성된 배열 원소 일부는 건짐"""
+
+    def __init__(self, items, error):
+        super().__init__(f"잘린 응답에서 {len(items)}개 복구 ({error})")
+        self.items = items
+        self.error = error
+
+
+class SchemaViolation(ValueError):
+    """스트리밍 중 스키마 위반 발견 → 응답을 끝까지 받지 않고 중단"""
+
+
+class JSONKeyWatcher:
+    """스트리밍 응답을 조각 단위로 읽으면서 금지된 키가 나오면 바로 알려줌
+
+    forbidden_top_level: 최상위 객체에 있으면 안 되는 키 (예: benefits 밖의 and_conditions)
+    forbidden_anywhere: 어디에도 있으면 안 되는 키 (예: age_min_years)
+    feed(chunk) → 위반 설명 (없으면 None)
+    """
+
+    def __init__(self, forbidden_top_level=(), forbidden_anywhere=()):
+        self.forbidden_top_level = frozenset(forbidden_top_level)
+        self.forbidden_anywhere = frozenset(forbidden_anywhere)
+        self.stack = []          # 열린 컨테이너: '{' 또는 '['
+        self.expect_key = False  # 객체 안에서 다음 문자열이 키인지
+        self.in_string = False
+        self.escaped = False
+        self.string = []
+
+    def feed(self, chunk):
+        for ch in chunk:
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif ch == '\\':
+                    self.escaped = True
+                elif ch == '"':
+                    self.in_string = False
+                    if self.expect_key:
+                        self.expect_key = False
+                        violation = self.check_key(''.join(self.string))
+                        if violation:
+                            return violation
+                    continue
+                if self.expect_key:
+                    self.string.append(ch)
+                continue
+
+            if ch == '"':
+                self.in_string = True
+                self.string = []
+            elif ch == '{':
+                self.stack.append('{')
+                self.expect_key = True
+            elif ch == '[':
+                self.stack.append('[')
+                self.expect_key = False
+            elif ch in '}]':
+                if self.stack:
+                    self.stack.pop()
+                self.expect_key = False
+            elif ch == ',':
+                self.expect_key = bool(self.stack) and self.stack[-1] == '{'
+        return None
+
+    def check_key(self, key):
+        if key in self.forbidden_anywhere:
+            return f"금지된 필드 {key}"
+        if len(self.stack) == 1 and key in self.forbidden_top_level:
+            return f"최상위에 {key} (benefits 안에 있어야 함)"
+        return None
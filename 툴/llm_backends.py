@@ -0,0 +1,734 @@
+"""
+LLM 백엔드 레이어 (GPT / Gemini / 오프라인 Fake 공통)
+- ⭐ 파서는 backend.call_json(system, prompt, step) 하나만 사용
+- ⭐ 재시도 / Rate limit 대기는 여기서 한 번만 구현
+- ⭐ FakeBackend: 네트워크 없이 미리 준비한 응답 재생 (지연시간 설정 가능)
+- ⭐ CassetteBackend: 실제 요청/응답을 카세트 파일에 녹화 → 네트워크 없이 재생
+- ⭐ HedgedBackend: 응답이 p95보다 늦으면 중복 요청 (먼저 온 응답 사용)
+- ⭐ 모든 호출에 timeout 적용 (기본 60초)
+- ⭐ 사용량 장부 (backend.ledger, llm_ledger.py): 호출마다 토큰/지연시간/시도/결과 기록
+- ⭐ JSON 복구 (json_repair.py): 가벼운 형식 오류는 그 자리에서 고치고,
+  잘린 응답은 완성된 배열 원소만 건져서 PartialJSON으로 전달 (JSON 오류는 대기 없이 바로 재시도)
+- ⭐ 스트리밍 (call_json(..., watcher=...)): 응답 조각을 받으면서 스키마 감시,
+  위반이 보이면 바로 끊고 재시도 (끝까지 기다렸을 시간 = 절약 시간 추정)
+
+step 이름:
+  "parse"  → 단일 호출 파서 (gpt복지정형화_강제필드_*)
+  "parse_rest" → 잘린 응답 이후 나머지 혜택만 요청 (단일 호출 파서)
+  "step1"~"step4" → 4단계 파서 (gpt복지정형화_v4_6_4step)
+  "migrate" → 필드 추가 마이그레이션 (gpt복지정형화_필드추가_마이그레이션)
+"""
+import atexit
+import gzip
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from json_repair import PartialJSON, SchemaViolation, loads_lenient, salvage_array_items
+
+# 백엔드별 기본 모델 (카세트 재생 키 / 스크립트 기본값)
+DEFAULT_MODELS = {"openai": "gpt-4o-mini", "gemini": "gemini-2.5-flash", "fake": "fake"}
+
+# 마지막 호출의 토큰 사용량 (스레드별, 실제 API 백엔드가 기록)
+_usage = threading.local()
+
+
+def set_usage(usage):
+    _usage.value = usage
+
+
+def take_usage():
+    """이 스레드의 마지막 사용량을 꺼냄 (없으면 None)"""
+    usage = getattr(_usage, 'value', None)
+    _usage.value = None
+    return usage
+
+
+class LLMBackend:
+    """백엔드 공통 인터페이스
+
+    하위 클래스는 complete()만 구현하면 됩니다.
+    stream()을 구현하면 응답을 조각 단위로 받을 수 있습니다 (기본: complete() 결과를 한 번에).
+    """
+    name = "base"
+
+    def __init__(self, model, max_retries=3, temperature=0.1, timeout=60):
+        self.model = model
+        self.max_retries = max_retries
+        self.temperature = temperature
+        self.timeout = timeout
+        self.ledger = None  # UsageLedger (llm_ledger.py), 있으면 호출마다 기록
+        self.stream_lock = threading.Lock()
+        self.stream_stats = {"streamed": 0, "aborted": 0, "saved_seconds": 0.0}
+        self.full_latency = {}  # step → (끝까지 받은 스트리밍 호출 시간 합계, 개수)
+
+    def complete(self, system, prompt, step=None):
+        """LLM 호출 → 응답 텍스트 (JSON 문자열) 반환"""
+        raise NotImplementedError
+
+    def stream(self, system, prompt, step=None):
+        """LLM 호출 → 응답 텍스트 조각을 차례로 반환 (기본: 스트리밍 없이 한 조각)"""
+        yield self.complete(system, prompt, step=step)
+
+    def print_stats(self):
+        """실행 통계 출력 (래퍼 백엔드에서 구현)"""
+        pass
+
+    def print_stream_stats(self):
+        stats = self.stream_stats
+        if not stats["streamed"]:
+            return
+        print(f"✋ 스트리밍 조기 중단: {stats['streamed']}개 호출 중 {stats['aborted']}개 "
+              f"({stats['aborted'] / stats['streamed'] * 100:.1f}%), 절약 추정 {stats['saved_seconds']:.1f}초")
+
+    def is_rate_limit(self, error):
+        """Rate limit 오류 여부"""
+        error_msg = str(error).lower()
+        return "rate_limit" in error_msg or "429" in error_msg
+
+    def classify_error(self, error):
+        """장부용 결과 이름"""
+        if isinstance(error, CassetteMiss):
+            return "cassette_miss"
+        if isinstance(error, SchemaViolation):
+            return "aborted"
+        if self.is_rate_limit(error):
+            return "rate_limit"
+        if isinstance(error, json.JSONDecodeError):
+            return "json_error"
+        if isinstance(error, TimeoutError) or "timeout" in type(error).__name__.lower():
+            return "timeout"
+        return "error"
+
+    def log_call(self, step, start, attempt, outcome, error=None):
+        """장부에 호출 1회 기록"""
+        usage = take_usage()
+        if self.ledger is not None:
+            self.ledger.record(step, self.model, self.name, usage, time.time() - start, attempt, outcome, error)
+
+    def receive(self, system, prompt, step=None, watcher=None):
+        """응답 텍스트 받기 (watcher가 있으면 스트리밍하면서 감시, 위반 시 SchemaViolation)"""
+        if watcher is None:
+            return self.complete(system, prompt, step=step)
+
+        chunks = []
+        stream = self.stream(system, prompt, step=step)
+        try:
+            for chunk in stream:
+                chunks.append(chunk)
+                violation = watcher.feed(chunk)
+                if violation:
+                    raise SchemaViolation(violation)
+        finally:
+            stream.close()  # 중단하면 연결도 바로 닫음
+        return ''.join(chunks)
+
+    def record_stream(self, step, elapsed, aborted):
+        """스트리밍 통계: 중단했으면 평균 전체 응답시간 - 중단 시점 = 절약 시간 추정"""
+        with self.stream_lock:
+            self.stream_stats["streamed"] += 1
+            total, count = self.full_latency.get(step, (0.0, 0))
+            if not aborted:
+                self.full_latency[step] = (total + elapsed, count + 1)
+                return
+            self.stream_stats["aborted"] += 1
+            if count:
+                self.stream_stats["saved_seconds"] += max(0.0, total / count - elapsed)
+
+    def call_json(self, system, prompt, step=None, max_retries=None, partial_key=None, watcher=None):
+        """LLM 호출 + JSON 변환 (재시도 로직 포함)
+
+        partial_key: 응답이 잘렸을 때 이 배열(예: "benefits")의 완성된 원소를 건질 수 있으면
+                     재시도하지 않고 PartialJSON(items)을 올림 → 호출한 쪽에서 나머지만 요청
+        watcher: 호출마다 새 감시자를 만드는 함수 (예: JSONKeyWatcher) → 스트리밍으로 받으면서
+                 위반이 보이면 응답을 끊고 바로 재시도
+        모든 재시도가 실패하면 마지막 예외를 그대로 올립니다.
+        """
+        if max_retries is None:
+            max_retries = self.max_retries
+        # 0 = 재시도 없이 한 번만 호출
+        max_retries = max(max_retries, 1)
+
+        for attempt in range(max_retries):
+            start = time.time()
+            take_usage()
+            try:
+                text = self.receive(system, prompt, step, watcher() if watcher else None)
+                try:
+                    result, repaired = loads_lenient(text)
+                except json.JSONDecodeError as e:
+                    items = salvage_array_items(text, partial_key) if partial_key else []
+                    if items:
+                        raise PartialJSON(items, e)
+                    raise
+
+            except CassetteMiss as e:
+                self.log_call(step, start, attempt + 1, "cassette_miss", e)
+                raise
+
+            except PartialJSON as e:
+                self.log_call(step, start, attempt + 1, "partial", e)
+                if watcher:
+                    self.record_stream(step, time.time() - start, aborted=False)
+                raise
+
+            except Exception as e:
+                self.log_call(step, start, attempt + 1, self.classify_error(e), e)
+                if isinstance(e, SchemaViolation):
+                    self.record_stream(step, time.time() - start, aborted=True)
+                if attempt >= max_retries - 1:
+                    raise
+
+                if self.is_rate_limit(e):
+                    wait_time = (attempt + 1) * 10
+                    print(f"⏳ (Rate limit, {wait_time}초 대기 후 재시도 {attempt + 1}/{max_retries})", end=' ')
+                elif isinstance(e, SchemaViolation):
+                    wait_time = 0
+                    print(f"✋ ({e} → 중단, 바로 재시도 {attempt + 1}/{max_retries})", end=' ')
+                elif isinstance(e, json.JSONDecodeError):
+                    # 서버 문제가 아니라 응답 형식 문제 → 기다릴 필요 없음
+                    wait_time = 0
+                    print(f"⏳ (JSON 오류, 바로 재시도 {attempt + 1}/{max_retries})", end=' ')
+                else:
+                    wait_time = 3
+                    print(f"⏳ (오류, {wait_time}초 대기 후 재시도 {attempt + 1}/{max_retries})", end=' ')
+                if wait_time:
+                    time.sleep(wait_time)
+
+            else:
+                self.log_call(step, start, attempt + 1, "repaired" if repaired else "ok")
+                if watcher:
+                    self.record_stream(step, time.time() - start, aborted=False)
+                return result
+
+
+class OpenAIBackend(LLMBackend):
+    """OpenAI (gpt-4o-mini)"""
+    name = "openai"
+
+    def __init__(self, api_key, model=DEFAULT_MODELS["openai"], **kwargs):
+        from openai import OpenAI
+
+        super().__init__(model, **kwargs)
+        # SDK 자체 재시도 끔 (기본 2회) → timeout이 호출 1회의 실제 상한, 재시도는 call_json이 시도 번호와 함께 기록
+        self.client = OpenAI(api_key=api_key, timeout=self.timeout, max_retries=0)
+
+    def request(self, system, prompt, **kwargs):
+        return self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": system},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=self.temperature,
+            response_format={"type": "json_object"},
+            **kwargs
+        )
+
+    @staticmethod
+    def record_usage(usage):
+        if usage is not None:
+            details = getattr(usage, 'prompt_tokens_details', None)
+            set_usage({
+                "input_tokens": usage.prompt_tokens,
+                "output_tokens": usage.completion_tokens,
+                "cached_tokens": (getattr(details, 'cached_tokens', 0) or 0) if details else 0
+            })
+
+    def complete(self, system, prompt, step=None):
+        response = self.request(system, prompt)
+        self.record_usage(response.usage)
+        return response.choices[0].message.content
+
+    def stream(self, system, prompt, step=None):
+        # 사용량은 마지막 조각에만 옴 (중간에 끊으면 기록 없음)
+        response = self.request(system, prompt, stream=True, stream_options={"include_usage": True})
+        try:
+            for chunk in response:
+                if getattr(chunk, 'usage', None) is not None:
+                    self.record_usage(chunk.usage)
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            response.close()
+
+
+class GeminiBackend(LLMBackend):
+    """Google Gemini (gemini-2.5-flash)"""
+    name = "gemini"
+
+    def __init__(self, api_key, model=DEFAULT_MODELS["gemini"], **kwargs):
+        from google import genai
+        from google.genai import types
+
+        super().__init__(model, **kwargs)
+        http_options = types.HttpOptions(timeout=int(self.timeout * 1000)) if self.timeout else None
+        self.client = genai.Client(api_key=api_key, http_options=http_options)
+        self.types = types
+
+    def is_rate_limit(self, error):
+        return super().is_rate_limit(error) or "resource_exhausted" in str(error).lower()
+
+    def request_args(self, system, prompt):
+        config = self.types.GenerateContentConfig(
+            system_instruction=system,
+            temperature=self.temperature,
+            response_mime_type="application/json"
+        )
+        return dict(
+            model=self.model,
+            contents=[self.types.Content(role="user", parts=[self.types.Part(text=prompt)])],
+            config=config
+        )
+
+    @staticmethod
+    def record_usage(usage):
+        if usage is not None:
+            set_usage({
+                "input_tokens": usage.prompt_token_count or 0,
+                # 2.5 모델은 thinking 토큰도 출력 가격으로 과금
+                "output_tokens": (usage.candidates_token_count or 0) + (getattr(usage, 'thoughts_token_count', 0) or 0),
+                "cached_tokens": usage.cached_content_token_count or 0
+            })
+
+    def complete(self, system, prompt, step=None):
+        response = self.client.models.generate_content(**self.request_args(system, prompt))
+        self.record_usage(response.usage_metadata)
+        return response.text
+
+    def stream(self, system, prompt, step=None):
+        for chunk in self.client.models.generate_content_stream(**self.request_args(system, prompt)):
+            # 사용량은 조각마다 누적값으로 옴 → 마지막 값이 남음
+            self.record_usage(chunk.usage_metadata)
+            if chunk.text:
+                yield chunk.text
+
+
+# FakeBackend 기본 응답 (step별 최소 구조)
+DEFAULT_FAKE_RESPONSES = {
+    "parse": {"benefits": [{"amount": None, "description": "fake", "and_conditions": {}, "or_conditions": {}}]},
+    "step1": {"benefit_count": 1, "benefit_descriptions": ["전체 대상 - 지원내용"], "reasoning": "fake"},
+    "step2": {"amount": None, "description": "fake", "and_conditions": {}, "or_conditions": {}},
+    "step3": {"is_correct": True, "missing_conditions": [], "wrong_conditions": [], "type_errors": [], "suggestions": ""},
+    "step4": {"and_filled_reasoning": {}, "or_filled_reasoning": {}, "and_empty_reasoning": {},
+              "summary": {"core_conditions": "fake", "overall_confidence": "높음"}},
+    "parse_rest": {"benefits": []},
+    "migrate": {"benefits": []}
+}
+
+
+class FakeBackend(LLMBackend):
+    """오프라인 테스트용 백엔드 (네트워크 없음, 결정적)
+
+    responses: {step: 응답} 딕셔너리
+      - 응답이 dict/str이면 매번 같은 응답
+      - 응답이 list면 호출 순서대로 재생 (끝나면 마지막 응답 반복)
+      - 응답이 callable이면 fn(prompt) 결과 사용
+      - 응답이 Exception이면 그 예외를 발생 (재시도 테스트용)
+    latency: 호출당 지연시간 (초) 또는 (최소, 최대) 범위 - seed로 재현 가능
+             timeout보다 길면 timeout만큼 기다린 뒤 TimeoutError
+    stream_chunk_chars: stream()이 한 번에 보내는 글자 수 (지연시간은 조각마다 나눠서 대기)
+    """
+    name = "fake"
+
+    def __init__(self, responses=None, latency=0.0, model="fake", seed=0, stream_chunk_chars=40, **kwargs):
+        super().__init__(model, **kwargs)
+        self.stream_chunk_chars = stream_chunk_chars
+        self.responses = dict(DEFAULT_FAKE_RESPONSES)
+        self.responses.update(responses or {})
+        self.latency = latency
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.call_counts = {}
+        self.calls = []
+
+    def next_call(self, step, prompt):
+        """호출 기록 → (순번, 지연시간)"""
+        with self.lock:
+            index = self.call_counts.get(step, 0)
+            self.call_counts[step] = index + 1
+            self.calls.append((step, prompt))
+            if isinstance(self.latency, (tuple, list)):
+                delay = self.random.uniform(*self.latency)
+            else:
+                delay = self.latency
+
+        if self.timeout and delay > self.timeout:
+            time.sleep(self.timeout)
+            raise TimeoutError(f"fake timeout ({self.timeout}초)")
+        return index, delay
+
+    def complete(self, system, prompt, step=None):
+        index, delay = self.next_call(step, prompt)
+        if delay:
+            time.sleep(delay)
+        return self.response_text(step, prompt, index)
+
+    def stream(self, system, prompt, step=None):
+        index, delay = self.next_call(step, prompt)
+        text = self.response_text(step, prompt, index)
+        size = self.stream_chunk_chars
+        pieces = [text[i:i + size] for i in range(0, len(text), size)] or [text]
+        for piece in pieces:
+            if delay:
+                time.sleep(delay / len(pieces))
+            yield piece
+
+    def response_text(self, step, prompt, index):
+        response = self.responses.get(step, {})
+        if isinstance(response, list):
+            response = response[min(index, len(response) - 1)]
+        if callable(response):
+            response = response(prompt)
+        if isinstance(response, Exception):
+            raise response
+        if isinstance(response, str):
+            return response
+        return json.dumps(response, ensure_ascii=False)
+
+
+class CassetteMiss(LookupError):
+    """재생 모드에서 카세트에 없는 요청"""
+
+
+class CassetteBackend(LLMBackend):
+    """요청/응답 녹화·재생 백엔드 (다른 백엔드를 감쌈)
+
+    mode:
+      "record" → 항상 실제 호출 + 녹화 (기존 응답 덮어씀)
+      "replay" → 카세트에서만 응답 (없으면 CassetteMiss, 네트워크 사용 안 함)
+      "auto"   → 카세트에 있으면 재생, 없으면 실제 호출 + 녹화
+
+    카세트 파일: gzip JSON Lines, 한 줄에 {key, step, model, temperature, response}
+    key = sha256(model + temperature + step + system + prompt)
+      → 프롬프트/모델/temperature가 바뀌면 자동으로 새로 녹화 (다른 모델 응답을 재생하지 않음)
+    재생 모드(inner 없음)는 model/temperature를 직접 받아서 같은 키를 만듭니다.
+
+    녹화한 응답은 메모리에 모았다가 save_every개마다 + 프로그램 종료 시 파일 전체를 한 번에 다시 씀
+    (레코드마다 gzip을 'at'로 열면 gzip 멤버가 레코드 수만큼 생겨서 거의 압축되지 않음)
+    """
+    name = "cassette"
+
+    def __init__(self, path, inner=None, mode="auto", model=None, save_every=200, **kwargs):
+        if mode not in ("record", "replay", "auto"):
+            raise ValueError(f"알 수 없는 카세트 모드: {mode} (record | replay | auto)")
+        if inner is None and mode != "replay":
+            raise ValueError("record/auto 모드는 실제 호출할 백엔드(inner)가 필요합니다")
+
+        if inner is not None:
+            model = inner.model
+            kwargs.setdefault('temperature', inner.temperature)
+        super().__init__(model or "cassette", **kwargs)
+        self.path = path
+        self.inner = inner
+        self.mode = mode
+        self.save_every = save_every
+        self.lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "recorded": 0}
+        self.entries = self.load(path)
+        self.unsaved = 0
+        atexit.register(self.save)
+
+    @staticmethod
+    def load(path):
+        """카세트 파일 읽기 → {key: entry}"""
+        entries = {}
+        if not os.path.exists(path):
+            return entries
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    entries[entry['key']] = entry
+        return entries
+
+    def make_key(self, system, prompt, step=None):
+        raw = f"{self.model}\n{self.temperature}\n{step}\n{system}\n{prompt}".encode('utf-8')
+        return hashlib.sha256(raw).hexdigest()[:32]
+
+    def lookup(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+        return entry['response'] if entry else None
+
+    def complete(self, system, prompt, step=None):
+        key = self.make_key(system, prompt, step)
+
+        if self.mode != "record":
+            response = self.lookup(key)
+            if response is not None:
+                with self.lock:
+                    self.stats["hits"] += 1
+                return response
+            if self.mode == "replay":
+                with self.lock:
+                    self.stats["misses"] += 1
+                raise CassetteMiss(f"카세트에 없는 요청 (step={step}, key={key})")
+
+        response = self.inner.complete(system, prompt, step=step)
+        self.record(key, step, response)
+        return response
+
+    def stream(self, system, prompt, step=None):
+        key = self.make_key(system, prompt, step)
+        if self.mode != "record":
+            response = self.lookup(key)
+            if response is not None or self.mode == "replay":
+                yield self.complete(system, prompt, step=step)
+                return
+
+        # 끝까지 받은 응답만 녹화 (중간에 끊은 응답은 버림)
+        chunks = []
+        stream = self.inner.stream(system, prompt, step=step)
+        try:
+            for chunk in stream:
+                chunks.append(chunk)
+                yield chunk
+        finally:
+            stream.close()
+        self.record(key, step, ''.join(chunks))
+
+    def record(self, key, step, response):
+        """응답 1개를 카세트에 추가 (save_every개 모이면 파일에 저장)"""
+        entry = {"key": key, "step": step, "model": self.model,
+                 "temperature": self.temperature, "response": response}
+        with self.lock:
+            self.entries[key] = entry
+            self.stats["recorded"] += 1
+            self.unsaved += 1
+            due = self.unsaved >= self.save_every
+        if due:
+            self.save()
+
+    def save(self):
+        """카세트 전체를 gzip 멤버 하나로 다시 씀 (임시 파일 → 교체, 쓰다 끊겨도 기존 파일 보존)"""
+        with self.lock:
+            if not self.unsaved:
+                return
+            tmp_path = f"{self.path}.tmp"
+            with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+                for entry in self.entries.values():
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            os.replace(tmp_path, self.path)
+            self.unsaved = 0
+
+    def print_stats(self):
+        print(f"📼 카세트 ({self.mode}): 재생 {self.stats['hits']}개, "
+              f"녹화 {self.stats['recorded']}개, 없음 {self.stats['misses']}개 → {self.path}")
+        if self.inner:
+            self.inner.print_stats()
+
+
+class HedgedBackend(LLMBackend):
+    """Hedged request 백엔드 (느린 응답의 꼬리 지연 제거)
+
+    primary 응답이 최근 응답시간의 p95를 넘으면 같은 요청을 한 번 더 보냅니다.
+    (secondary가 있으면 secondary로, 없으면 primary로)
+    먼저 성공한 응답을 쓰고, 나머지 응답은 버립니다.
+    버린 응답도 비용은 나가므로 끝나는 대로 장부에 outcome "hedge_lost"로 기록합니다.
+    primary가 p95 전에 실패해서 바로 다시 보낸 경우는 hedge가 아니라 failover로 따로 셉니다.
+
+    min_samples: 이 개수만큼 응답시간이 쌓이기 전에는 hedge_after(초)를 기준으로 사용
+                 (hedge_after=None이면 그 전까지는 hedge 안 함)
+    """
+    name = "hedged"
+
+    def __init__(self, primary, secondary=None, percentile=0.95, min_samples=20,
+                 hedge_after=None, window=200, max_workers=32, **kwargs):
+        kwargs.setdefault('temperature', primary.temperature)
+        super().__init__(primary.model, **kwargs)
+        self.primary = primary
+        self.secondary = secondary
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.hedge_after = hedge_after
+        self.latencies = deque(maxlen=window)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.lock = threading.Lock()
+        self.stats = {"calls": 0, "hedged": 0, "failover": 0, "hedge_wins": 0, "saved_seconds": 0.0,
+                      "lost_input_tokens": 0, "lost_output_tokens": 0}
+
+    def hedge_delay(self):
+        """지금 기준 hedge 대기시간 (running p95)"""
+        with self.lock:
+            if len(self.latencies) < self.min_samples:
+                return self.hedge_after
+            ordered = sorted(self.latencies)
+        return ordered[min(int(len(ordered) * self.percentile), len(ordered) - 1)]
+
+    def timed_call(self, backend, system, prompt, step):
+        """(응답, 걸린 시간, 사용량) - 사용량은 작업 스레드에 기록되므로 같이 반환"""
+        start = time.time()
+        take_usage()
+        response = backend.complete(system, prompt, step=step)
+        return response, time.time() - start, take_usage()
+
+    def complete(self, system, prompt, step=None):
+        with self.lock:
+            self.stats["calls"] += 1
+
+        start = time.time()
+        # 진 요청은 다른 서비스를 처리하는 중에 끝날 수 있음 → 요청한 서비스 정보를 지금 받아 둠
+        context = self.ledger.current_context() if self.ledger is not None else None
+        first = self.executor.submit(self.timed_call, self.primary, system, prompt, step)
+        delay = self.hedge_delay()
+
+        if delay is not None:
+            done, _ = wait([first], timeout=delay)
+        else:
+            done = {first}
+            first.exception()  # 끝날 때까지 대기
+
+        if done and first.exception() is None:
+            response, elapsed, usage = first.result()
+            self.record_latency(elapsed)
+            set_usage(usage)
+            return response
+
+        # primary가 p95를 넘음 → 중복 요청 / primary가 그 전에 실패 → failover
+        with self.lock:
+            self.stats["failover" if done else "hedged"] += 1
+        hedge_start = time.time()
+        hedge_backend = self.secondary or self.primary
+        second = self.executor.submit(self.timed_call, hedge_backend, system, prompt, step)
+        done_before_hedge = bool(done)
+        pending = {second} if done else {first, second}
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    continue
+                response, _, usage = future.result()
+                winner_elapsed = time.time() - start
+                self.record_latency(winner_elapsed)
+                set_usage(usage)
+                if future is second and not done_before_hedge:
+                    self.record_hedge_win(first, hedge_start, winner_elapsed, start)
+                if pending:
+                    loser, loser_backend = (first, self.primary) if future is second else (second, hedge_backend)
+                    self.record_loser(loser, loser_backend, step, context)
+                return response
+
+        # 둘 다 실패 → primary 오류를 올림 (call_json에서 재시도)
+        raise first.exception() or second.exception()
+
+    def record_latency(self, elapsed):
+        with self.lock:
+            self.latencies.append(elapsed)
+
+    def record_hedge_win(self, first, hedge_start, winner_elapsed, start):
+        """hedge가 이긴 경우 절약 시간 기록 (primary가 끝난 시점 기준)"""
+        with self.lock:
+            self.stats["hedge_wins"] += 1
+
+        def on_primary_done(future):
+            primary_elapsed = time.time() - start
+            if future.exception() is not None and self.primary.timeout:
+                primary_elapsed = max(primary_elapsed, self.primary.timeout)
+            with self.lock:
+                self.stats["saved_seconds"] += max(0.0, primary_elapsed - winner_elapsed)
+
+        first.add_done_callback(on_primary_done)
+
+    def record_loser(self, future, backend, step, context=None):
+        """진 요청도 끝나면 사용량 기록 (버린 응답도 비용은 나감, context: 요청한 서비스 정보)"""
+        def on_loser_done(future):
+            if future.exception() is not None:
+                return
+            _, elapsed, usage = future.result()
+            usage = usage or {}
+            with self.lock:
+                self.stats["lost_input_tokens"] += usage.get('input_tokens', 0)
+                self.stats["lost_output_tokens"] += usage.get('output_tokens', 0)
+            if self.ledger is not None:
+                self.ledger.record(step, backend.model, backend.name, usage, elapsed, 1, "hedge_lost", context=context)
+
+        future.add_done_callback(on_loser_done)
+
+    def print_stats(self):
+        calls = self.stats["calls"] or 1
+        print(f"🏁 Hedge: 호출 {self.stats['calls']}개 중 {self.stats['hedged']}개 중복 요청 "
+              f"({self.stats['hedged'] / calls * 100:.1f}%), 중복 요청 승리 {self.stats['hedge_wins']}개, "
+              f"절약 {self.stats['saved_seconds']:.1f}초, 실패 후 재요청 {self.stats['failover']}개")
+        print(f"   버린 응답 토큰: 입력 {self.stats['lost_input_tokens']:,} / 출력 {self.stats['lost_output_tokens']:,}")
+        delay = self.hedge_delay()
+        if delay is not None:
+            print(f"   현재 hedge 기준 (p{int(self.percentile * 100)}): {delay:.1f}초")
+        self.primary.print_stats()
+        if self.secondary:
+            self.secondary.print_stats()
+
+
+def create_backend(name=None, cassette=None, cassette_mode=None, hedge=None, hedge_backend=None, ledger=None,
+                   **kwargs):
+    """이름으로 백엔드 생성 (.env의 LLM_BACKEND / API 키 사용)
+
+    name: "openai" | "gemini" | "fake" (None이면 LLM_BACKEND 환경변수, 기본 openai)
+    cassette: 카세트 파일 경로 (None이면 LLM_CASSETTE 환경변수, 없으면 사용 안 함)
+    cassette_mode: "record" | "replay" | "auto" (None이면 LLM_CASSETTE_MODE, 기본 auto)
+    hedge: True면 HedgedBackend 사용 (None이면 LLM_HEDGE=1 여부)
+    hedge_backend: 중복 요청을 보낼 백엔드 이름 (None이면 LLM_HEDGE_BACKEND, 없으면 같은 백엔드)
+    timeout: 호출당 제한시간 (초, LLM_TIMEOUT 환경변수, 기본 60)
+    ledger: 사용량 장부 경로 (None이면 LLM_LEDGER 환경변수, 없으면 기록 안 함)
+    """
+    if ledger is None:
+        ledger = os.getenv('LLM_LEDGER')
+    if ledger:
+        from llm_ledger import UsageLedger
+
+        backend = create_backend(name, cassette, cassette_mode, hedge, hedge_backend, ledger="", **kwargs)
+        backend.ledger = UsageLedger(ledger)
+        # 카세트 안쪽의 HedgedBackend도 버린 응답 사용량을 같은 장부에 기록
+        inner = getattr(backend, 'inner', None)
+        if isinstance(inner, HedgedBackend):
+            inner.ledger = backend.ledger
+        return backend
+
+    if cassette is None:
+        cassette = os.getenv('LLM_CASSETTE')
+    if cassette:
+        cassette_mode = cassette_mode or os.getenv('LLM_CASSETTE_MODE') or "auto"
+        # 재생 전용이면 API 키 없이 동작
+        if cassette_mode == "replay":
+            # 녹화 때와 같은 모델/temperature로 키를 만들어야 재생됨
+            name = (name or os.getenv('LLM_BACKEND') or "openai").lower()
+            model = kwargs.pop('model', None) or DEFAULT_MODELS.get(name, name)
+            return CassetteBackend(cassette, mode=cassette_mode, model=model, **kwargs)
+        inner = create_backend(name, cassette="", hedge=hedge, hedge_backend=hedge_backend, ledger="", **kwargs)
+        return CassetteBackend(cassette, inner=inner, mode=cassette_mode)
+
+    if hedge is None:
+        hedge = os.getenv('LLM_HEDGE') == "1"
+    if hedge:
+        hedge_backend = hedge_backend or os.getenv('LLM_HEDGE_BACKEND')
+        primary = create_backend(name, cassette="", hedge=False, ledger="", **kwargs)
+        secondary = create_backend(hedge_backend, cassette="", hedge=False, ledger="", **kwargs) if hedge_backend else None
+        return HedgedBackend(primary, secondary)
+
+    if 'timeout' not in kwargs and os.getenv('LLM_TIMEOUT'):
+        kwargs['timeout'] = float(os.getenv('LLM_TIMEOUT'))
+
+    name = (name or os.getenv('LLM_BACKEND') or "openai").lower()
+
+    if name == "openai":
+        api_key = os.getenv('OPENAI_API_KEY')
+        if not api_key:
+            raise ValueError("OPENAI_API_KEY를 .env 파일에 설정하세요!")
+        return OpenAIBackend(api_key=api_key, **kwargs)
+
+    if name == "gemini":
+        api_key = os.getenv('GEMINI_API_KEY')
+        if not api_key:
+            raise ValueError("GEMINI_API_KEY를 .env 파일에 설정하세요! (google-genai 라이브러리 필요)")
+        return GeminiBackend(api_key=api_key, **kwargs)
+
+    if name == "fake":
+        return FakeBackend(**kwargs)
+
+    raise ValueError(f"알 수 없는 백엔드: {name} (openai | gemini | fake)")
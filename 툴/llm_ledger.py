@@ -0,0 +1,155 @@
+"""
+LLM 사용량 장부 (호출 1회 = JSONL 1줄)
+- ⭐ 모든 call_json 호출 기록: service_id, 지역, 프롬프트 버전, step, 모델,
+  입력/출력/캐시 토큰, 지연시간, 시도 번호,
+  결과 (ok | repaired | partial | rate_limit | timeout | json_error | error | cassette_miss)
+- ⭐ Hedge로 보낸 중복 요청 중 진 쪽도 비용은 나감 → outcome "hedge_lost"로 따로 기록
+- ⭐ 지역별 / step별 / 프롬프트 버전별 비용·시간 요약 리포트
+- ⭐ 서비스당 비용 (비싼 서비스 상위 목록)
+
+사용법:
+  .env에 LLM_LEDGER=llm_ledger.jsonl → create_backend()가 자동으로 연결
+  python 툴/llm_ledger.py llm_ledger.jsonl → 요약 리포트
+"""
+import json
+import threading
+import time
+from collections import defaultdict
+
+# 응답을 그대로 쓴 호출 (repaired: 가벼운 JSON 형식 오류를 고쳐서 사용,
+# hedge_lost: 정상 응답이지만 다른 요청이 먼저 와서 버림 → 실패는 아님)
+SUCCESS_OUTCOMES = frozenset(["ok", "repaired", "hedge_lost"])
+
+
+class UsageLedger:
+    def __init__(self, path=None):
+        """path가 None이면 파일 대신 메모리(self.entries)에만 기록 (벤치마크용)"""
+        self.path = path
+        self.entries = []
+        self.lock = threading.Lock()
+        # batch_parse_xml은 서비스를 순서대로 처리 → 현재 서비스 정보를 여기에 둠
+        self.context = {}
+
+    def set_context(self, **context):
+        """현재 처리 중인 서비스 정보 (service_id, region, prompt_version)"""
+        with self.lock:
+            self.context = context
+
+    def current_context(self):
+        """지금 서비스 정보 복사본 (나중에 끝나는 호출을 요청한 서비스로 기록할 때)"""
+        with self.lock:
+            return dict(self.context)
+
+    def record(self, step, model, backend, usage, latency, attempt, outcome, error=None, context=None):
+        """context: 요청할 때 current_context()로 받아 둔 서비스 정보 (None이면 지금 서비스)"""
+        usage = usage or {}
+        with self.lock:
+            if context is None:
+                context = self.context
+            entry = {
+                "ts": round(time.time(), 3),
+                "service_id": context.get('service_id'),
+                "region": context.get('region'),
+                "prompt_version": context.get('prompt_version'),
+                "step": step,
+                "model": model,
+                "backend": backend,
+                "input_tokens": usage.get('input_tokens', 0),
+                "output_tokens": usage.get('output_tokens', 0),
+                "cached_tokens": usage.get('cached_tokens', 0),
+                "latency": round(latency, 3),
+                "attempt": attempt,
+                "outcome": outcome
+            }
+            if error is not None:
+                entry["error"] = str(error)[:200]
+            if self.path is None:
+                self.entries.append(entry)
+                return
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+def load_entries(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def entry_cost(entry, prices):
+    """호출 1회 비용 (USD, 캐시 토큰은 모델별 캐시 입력 가격)"""
+    input_price, cached_price, output_price = prices.get(entry['model'], (0.0, 0.0, 0.0))
+    cached = entry.get('cached_tokens', 0)
+    return ((entry['input_tokens'] - cached) * input_price + cached * cached_price
+            + entry['output_tokens'] * output_price) / 1_000_000
+
+
+def summarize(entries, key, prices):
+    """key(지역 / step / 프롬프트 버전)별 합계"""
+    groups = defaultdict(lambda: {"calls": 0, "failed": 0, "services": set(), "input_tokens": 0,
+                                  "output_tokens": 0, "cached_tokens": 0, "cost": 0.0, "latency": 0.0})
+    for entry in entries:
+        row = groups[entry.get(key) or '-']
+        row["calls"] += 1
+        row["failed"] += entry['outcome'] not in SUCCESS_OUTCOMES
+        row["services"].add(entry.get('service_id'))
+        row["input_tokens"] += entry['input_tokens']
+        row["output_tokens"] += entry['output_tokens']
+        row["cached_tokens"] += entry.get('cached_tokens', 0)
+        row["cost"] += entry_cost(entry, prices)
+        row["latency"] += entry['latency']
+    return groups
+
+
+def print_report(path, top=10):
+    from gpt복지정형화_비용예측 import MODEL_PRICES
+
+    entries = load_entries(path)
+    if not entries:
+        print("❌ 기록이 없습니다!")
+        return None
+
+    total_cost = sum(entry_cost(entry, MODEL_PRICES) for entry in entries)
+    services = {entry.get('service_id') for entry in entries}
+
+    print(f"\n{'='*80}")
+    print(f"📒 LLM 사용량 리포트: {path}")
+    print(f"{'='*80}")
+    print(f"📊 호출: {len(entries)}회 (서비스 {len(services)}개), "
+          f"실패 {sum(entry['outcome'] not in SUCCESS_OUTCOMES for entry in entries)}회")
+    print(f"📥 입력 {sum(entry['input_tokens'] for entry in entries):,} 토큰 "
+          f"(캐시 {sum(entry.get('cached_tokens', 0) for entry in entries):,}) / "
+          f"📤 출력 {sum(entry['output_tokens'] for entry in entries):,} 토큰")
+    print(f"💵 비용: ${total_cost:.4f} (서비스당 ${total_cost / len(services):.5f})")
+    print(f"⏱️ 호출 시간 합계: {sum(entry['latency'] for entry in entries):.1f}초")
+
+    for key, title in (("region", "지역별"), ("step", "step별"), ("prompt_version", "프롬프트 버전별")):
+        print(f"\n[{title}]")
+        for name, row in sorted(summarize(entries, key, MODEL_PRICES).items()):
+            print(f"  {name}: 호출 {row['calls']}회 (실패 {row['failed']}), 서비스 {len(row['services'])}개, "
+                  f"토큰 {row['input_tokens']:,}/{row['output_tokens']:,}, ${row['cost']:.4f}, "
+                  f"{row['latency']:.1f}초 (평균 {row['latency'] / row['calls']:.2f}초)")
+
+    retries = defaultdict(int)
+    for entry in entries:
+        retries[entry['outcome']] += 1
+    print(f"\n[결과별] " + ", ".join(f"{outcome} {count}회" for outcome, count in sorted(retries.items())))
+
+    per_service = defaultdict(float)
+    for entry in entries:
+        per_service[entry.get('service_id')] += entry_cost(entry, MODEL_PRICES)
+    print(f"\n[비싼 서비스 상위 {top}개]")
+    for service_id, cost in sorted(per_service.items(), key=lambda item: item[1], reverse=True)[:top]:
+        print(f"  {service_id}: ${cost:.5f}")
+
+    return {
+        "calls": len(entries),
+        "services": len(services),
+        "cost_usd": total_cost
+    }
+
+
+# 사용 예시
+if __name__ == '__main__':
+    import sys
+
+    print_report(sys.argv[1] if len(sys.argv) > 1 else 'llm_ledger.jsonl')
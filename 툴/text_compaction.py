@@ -0,0 +1,295 @@
+"""
+서비스 텍스트 압축 (XML 추출 → parse_service 사이 정규화 단계)
+- ⭐ 공백/빈 줄 정리, 줄머리 기호(○●■※▶ 등)를 "- "로 통일
+- ⭐ 여러 서비스에 반복되는 상투 문구를 코퍼스 빈도로 학습해서 제거
+  (조건 표현(숫자+단위)이나 조건 키워드가 있는 줄은 절대 제거하지 않음)
+- ⭐ 연락처 문구 제거 (문의/전화/☎ 라벨 + 전화번호만, 같은 줄의 조건은 남김)
+- ⭐ 비정상적으로 긴 섹션은 상한에서 자름
+- ⭐ 지역별 토큰 절감 리포트
+- ⭐ 수작업 검증본(정형화데이터/)으로 조건 표현이 빠지지 않았는지 확인
+  (백엔드를 주면 압축 전/후 파싱 결과도 비교)
+
+원본 텍스트는 그대로 original_data에 저장하고, LLM 프롬프트에만 압축본 사용
+"""
+import glob
+import json
+import os
+import re
+from collections import Counter
+
+from welfare_schema import KEYWORD_FIELDS
+from welfare_xml import iter_services
+
+TEXT_FIELDS = ('target_text', 'criteria_text', 'support_text')
+
+# 줄머리 기호 → "- " (단어 안의 'ㆍ'는 건드리지 않음)
+BULLET_PATTERN = re.compile(r'^[ \t]*[○●■□◦▶▷•◎◇◆❍▪➢➤\-]+[ \t]*')
+SPACES_PATTERN = re.compile(r'[ \t 　]+')
+BLANK_LINES_PATTERN = re.compile(r'\n{2,}')
+
+# 조건 표현 (압축 후에도 반드시 남아 있어야 함)
+CONDITION_PATTERN = re.compile(
+    r'\d[\d,.]*\s*(?:세|개월|주|%|만\s*원|원|명|인|자녀|째|년|일)'
+)
+# 연락처 문구: 문의/전화/☎ 라벨 ~ 전화번호 (바로 뒤의 닫는 괄호까지만, 그 뒤 내용은 남김)
+PHONE_PATTERN = r'(?:\d{2,4}-\d{3,4}-\d{4}|1\d{3}-\d{4})'
+CONTACT_PATTERN = re.compile(
+    r'(?:※\s*)?(?:문의(?:처)?|연락처|대표\s*전화|전화(?:번호)?|☎|☏)[^※\n\d]*?' + PHONE_PATTERN + r'(?:\s*\))?'
+)
+PROTECTED_WORDS = tuple(KEYWORD_FIELDS) + (
+    '이상', '이하', '미만', '초과', '이내', '또는', '및', '제외', '단,', '다만',
+    '출생', '출산', '임신', '거주', '소득', '가구', '자녀', '아동', '부모'
+)
+
+# 학습 없이도 제거하는 문구 (줄 전체가 이 문장일 때만)
+DEFAULT_BOILERPLATE = (
+    '지원대상의 내용을 참고해주시기 바랍니다.',
+    '지원대상의 내용을 참고해 주시기 바랍니다.',
+    '해당없음',
+)
+
+
+def normalize_line(line):
+    """비교용 줄 정규화 (공백 제거, 줄머리 기호 제거)"""
+    return SPACES_PATTERN.sub(' ', BULLET_PATTERN.sub('', line)).strip()
+
+
+def is_protected_text(text):
+    """조건 표현(숫자+단위)이나 조건 키워드가 있으면 True (압축에서 지우면 안 되는 내용)"""
+    return bool(CONDITION_PATTERN.search(text)) or any(word in text for word in PROTECTED_WORDS)
+
+
+def strip_contacts(line):
+    """줄에서 연락처(라벨 + 전화번호)만 제거, 같은 줄의 조건은 남김
+
+    >>> strip_contacts('문의: 052-123-4567 (기준중위소득 150% 이하 가구만 해당)')
+    ' (기준중위소득 150% 이하 가구만 해당)'
+    >>> strip_contacts('☎ 1588-1234 평일 09~18시, 만 5세 이하 아동 대상')
+    ' 평일 09~18시, 만 5세 이하 아동 대상'
+    >>> strip_contacts('문의처: 울산시 여성가족과(052-229-3812)')
+    ''
+    >>> strip_contacts('구매※ 문의 : 사회서비스 콜센터 1566-3232')
+    '구매'
+    """
+    return CONTACT_PATTERN.sub(lambda match: '' if not is_protected_text(match.group()) else match.group(), line)
+
+
+def condition_tokens(text):
+    """원문의 조건 표현 집합 (숫자+단위, 조건 키워드)"""
+    compact = SPACES_PATTERN.sub('', text or '')
+    tokens = {re.sub(r'\s+', '', match) for match in CONDITION_PATTERN.findall(text or '')}
+    tokens.update(word for word in KEYWORD_FIELDS if word in compact)
+    return tokens
+
+
+class TextCompactor:
+    def __init__(self, boilerplate=DEFAULT_BOILERPLATE, max_section_chars=4000, min_services=3):
+        """
+        boilerplate: 제거할 줄 (normalize_line 기준으로 비교)
+        max_section_chars: 섹션(대상/기준/내용) 1개 최대 글자 수 (None이면 자르지 않음)
+        min_services: 학습 시 이 개수 이상의 서비스에 나온 줄만 상투 문구로 봄
+        """
+        self.boilerplate = {normalize_line(line) for line in boilerplate}
+        self.max_section_chars = max_section_chars
+        self.min_services = min_services
+
+    def is_protected(self, line):
+        """조건 표현(숫자+단위)이나 조건 키워드가 있는 줄은 상투 문구로 보지 않음 (전화번호 같은 숫자만 있으면 제거 가능)"""
+        return is_protected_text(line)
+
+    def learn(self, services):
+        """서비스 목록에서 반복되는 줄 학습 → 새로 추가된 문구 목록"""
+        counts = Counter()
+        for service in services:
+            lines = set()
+            for field in TEXT_FIELDS:
+                for line in (service.get(field) or '').split('\n'):
+                    line = normalize_line(line)
+                    if line:
+                        lines.add(line)
+            counts.update(lines)
+
+        learned = [
+            line for line, count in counts.most_common()
+            if count >= self.min_services and line not in self.boilerplate and not self.is_protected(line)
+        ]
+        self.boilerplate.update(learned)
+        return learned
+
+    def learn_from_xml(self, xml_paths):
+        services = [service for path in xml_paths for service in iter_services(path)]
+        return self.learn(services)
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({
+                "boilerplate": sorted(self.boilerplate),
+                "max_section_chars": self.max_section_chars,
+                "min_services": self.min_services
+            }, f, ensure_ascii=False, indent=2)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(data["boilerplate"], data["max_section_chars"], data["min_services"])
+
+    def compact(self, text):
+        """텍스트 1개 압축"""
+        if not text:
+            return text or ''
+
+        lines = []
+        for line in text.replace('\r\n', '\n').replace('\r', '\n').split('\n'):
+            if normalize_line(line) in self.boilerplate:
+                continue
+            line = SPACES_PATTERN.sub(' ', strip_contacts(line)).strip()
+            if not line:
+                continue
+            line = BULLET_PATTERN.sub('- ', line)
+            lines.append(line)
+
+        compacted = BLANK_LINES_PATTERN.sub('\n', '\n'.join(lines))
+
+        if self.max_section_chars and len(compacted) > self.max_section_chars:
+            cut = compacted.rfind('\n', 0, self.max_section_chars)
+            if cut < self.max_section_chars // 2:
+                cut = self.max_section_chars
+            compacted = compacted[:cut].rstrip() + "\n…(생략)"
+
+        return compacted
+
+    def compact_service(self, target_text, criteria_text, support_text):
+        """(대상, 선정기준, 지원내용) → 압축본 3개"""
+        return self.compact(target_text), self.compact(criteria_text), self.compact(support_text)
+
+    def lost_conditions(self, original, compacted):
+        """압축 과정에서 빠진 조건 표현"""
+        return condition_tokens(original) - condition_tokens(compacted)
+
+
+def token_report(compactor, xml_paths, count_tokens):
+    """지역별 토큰 절감 리포트 → {지역: {services, before, after, truncated}}"""
+    report = {}
+    for path in xml_paths:
+        region = os.path.basename(path).replace('복지목록', '').replace('.xml', '')
+        row = {"services": 0, "before": 0, "after": 0, "truncated": 0}
+        for service in iter_services(path):
+            row["services"] += 1
+            for field in TEXT_FIELDS:
+                original = service[field] or ''
+                compacted = compactor.compact(original)
+                row["before"] += count_tokens(original)
+                row["after"] += count_tokens(compacted)
+                row["truncated"] += compacted.endswith("…(생략)")
+        report[region] = row
+    return report
+
+
+def _conditions_key(parsed):
+    """파싱 결과 비교용 (혜택별 값 있는 조건만)"""
+    key = []
+    for benefit in (parsed or {}).get('benefits', []):
+        conditions = {}
+        for group in ('and_conditions', 'or_conditions'):
+            for field, value in (benefit.get(group) or {}).items():
+                if value not in (None, False, [], ''):
+                    conditions[f"{group}.{field}"] = json.dumps(value, ensure_ascii=False, sort_keys=True)
+        key.append(tuple(sorted(conditions.items())))
+    return sorted(key)
+
+
+def check_verified(compactor, json_paths, sample=None, parser=None):
+    """수작업 검증본으로 압축 안전성 확인
+
+    1) 모든 서비스: 원문 조건 표현이 압축본에 남아 있는지
+    2) parser가 있으면 sample개 서비스를 압축 전/후로 파싱해서 결과 비교
+    """
+    checked = 0
+    lost = []
+    services = []
+    for path in json_paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            for service in json.load(f):
+                original = service.get('original_data') or {}
+                checked += 1
+                services.append(service)
+                for field in TEXT_FIELDS:
+                    missing = compactor.lost_conditions(original.get(field), compactor.compact(original.get(field)))
+                    if missing:
+                        lost.append((service.get('service_id'), field, sorted(missing)))
+
+    result = {"checked": checked, "lost": lost, "compared": 0, "changed": []}
+    if parser is None:
+        return result
+
+    for service in services[:sample]:
+        original = service.get('original_data') or {}
+        texts = [original.get(field) or '' for field in TEXT_FIELDS]
+        service_id = service.get('service_id')
+        before = parser.parse_service(service['service_name'], *texts, service_id=service_id)
+        after = parser.parse_service(service['service_name'], *compactor.compact_service(*texts), service_id=service_id)
+        result["compared"] += 1
+        if _conditions_key(before) != _conditions_key(after):
+            result["changed"].append(service.get('service_id'))
+    return result
+
+
+# 사용 예시
+if __name__ == '__main__':
+    import sys
+    from gpt복지정형화_비용예측 import make_token_counter
+
+    xml_paths = sorted(glob.glob('wantedDtl포함된xml목록/복지목록*.xml'))
+    verified_paths = sorted(glob.glob('정형화데이터/정형화데이터_*.json'))
+
+    compactor = TextCompactor(max_section_chars=4000, min_services=3)
+    learned = compactor.learn_from_xml(xml_paths)
+    print(f"📚 학습한 상투 문구: {len(learned)}개 (전체 {len(compactor.boilerplate)}개)")
+    if not learned:
+        print(f"⚠️ 새로 학습한 문구 없음 ({compactor.min_services}개 이상 서비스에 반복되는 줄 없음) "
+              f"→ 공백/기호/연락처 정리와 기본 문구 제거만 적용")
+    for line in learned[:10]:
+        print(f"  - {line[:60]}")
+
+    count_tokens, tokenizer_name = make_token_counter("gpt-4o-mini")
+    report = token_report(compactor, xml_paths, count_tokens)
+
+    print(f"\n{'='*80}")
+    print(f"✂️ 지역별 토큰 절감 ({tokenizer_name})")
+    print(f"{'='*80}")
+    for region, row in report.items():
+        saved = row["before"] - row["after"]
+        rate = saved / row["before"] * 100 if row["before"] else 0
+        print(f"  {region}: {row['services']}개 서비스, {row['before']:,} → {row['after']:,} 토큰 "
+              f"(-{saved:,}, {rate:.1f}%), 잘린 섹션 {row['truncated']}개")
+
+    # 압축 전/후 파싱 비교: python 툴/text_compaction.py --parse 10 (LLM 호출 발생)
+    parser = None
+    sample = None
+    if '--parse' in sys.argv:
+        from dotenv import load_dotenv
+        from llm_backends import create_backend
+        from gpt복지정형화_강제필드_4_5_limitBirth_추가 import WelfareParserV4_5
+
+        load_dotenv()
+        sample = int(sys.argv[sys.argv.index('--parse') + 1])
+        parser = WelfareParserV4_5(backend=create_backend())
+
+    result = check_verified(compactor, verified_paths, sample=sample, parser=parser)
+
+    print(f"\n🔍 수작업 검증본 확인: {result['checked']}개 서비스")
+    if result["lost"]:
+        print(f"❌ 조건 표현 손실: {len(result['lost'])}건")
+        for service_id, field, missing in result["lost"][:10]:
+            print(f"  - {service_id} {field}: {missing}")
+    else:
+        print("✅ 조건 표현 손실 없음")
+
+    if parser is not None:
+        print(f"🔁 압축 전/후 파싱 비교: {result['compared']}개 중 {len(result['changed'])}개 결과 다름")
+        for service_id in result["changed"]:
+            print(f"  - {service_id}")
+
+    compactor.save('text_compaction_boilerplate.json')
+    print("💾 저장: text_compaction_boilerplate.json")
@@ -0,0 +1,61 @@
+"""
+정형화데이터 JSON 읽기 (최상위 배열 [서비스, 서비스, ...])
+- ⭐ 서비스를 하나씩 반환 (파일 전체를 json.load 하지 않음 → 메모리 일정)
+- ⭐ 표준 라이브러리만 사용 (json.JSONDecoder.raw_decode)
+"""
+import json
+
+CHUNK_SIZE = 1 << 20  # 1MB씩 읽음
+
+
+def iter_json_array(path, chunk_size=CHUNK_SIZE):
+    """최상위 JSON 배열의 원소를 하나씩 반환 (스트리밍)"""
+    decoder = json.JSONDecoder()
+    separators = ' \t\r\n,'
+
+    with open(path, 'r', encoding='utf-8') as f:
+        buffer = f.read(chunk_size).lstrip('\ufeff').lstrip()
+        if not buffer.startswith('['):
+            raise ValueError(f"최상위가 JSON 배열이 아닙니다: {path}")
+        pos = 1
+        eof = False
+
+        while True:
+            # 원소 사이 공백/쉼표 건너뜀
+            while pos < len(buffer) and buffer[pos] in separators:
+                pos += 1
+
+            if pos >= len(buffer):
+                if eof:
+                    raise ValueError(f"JSON 배열이 닫히지 않았습니다: {path}")
+                chunk = f.read(chunk_size)
+                eof = not chunk
+                buffer = buffer[pos:] + chunk
+                pos = 0
+                continue
+
+            if buffer[pos] == ']':
+                return
+
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # 원소가 청크 경계에 걸림 → 더 읽고 다시 시도
+                if eof:
+                    raise
+                chunk = f.read(chunk_size)
+                eof = not chunk
+                buffer = buffer[pos:] + chunk
+                pos = 0
+                continue
+
+            yield item
+            pos = end
+
+
+def iter_services(json_path, limit=None):
+    """정형화데이터 JSON에서 서비스를 하나씩 반환"""
+    for count, service in enumerate(iter_json_array(json_path), 1):
+        yield service
+        if limit and count >= limit:
+            break
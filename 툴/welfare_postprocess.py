@@ -0,0 +1,282 @@
+"""
+정형화데이터 후처리 + 검증 (코퍼스 전체, 멀티프로세스)
+- ⭐ 정형화데이터_*.json을 서비스 단위로 스트리밍 (welfare_json.py)
+- ⭐ 혜택마다 정규화 (years → months, 예전 필드 이름 변경, false → null, OR 카테고리 → 배열, 알 수 없는 AND/OR 필드 제거)
+- ⭐ set 기반 필드 검증 (허용 필드 / 타입 / 범위 / 날짜 형식)
+- ⭐ 위반은 한 줄씩 출력하지 않고 규칙·필드별로 모아서 리포트 (예시 service_id 포함)
+- ⭐ 서비스 묶음을 여러 프로세스에 나눠서 처리 (큰 코퍼스용)
+
+사용법:
+  python 툴/welfare_postprocess.py                        → 정형화데이터/ 전체 검증 (리포트만)
+  python 툴/welfare_postprocess.py a.json b.json --write  → 정규화 결과를 입력 폴더의 정규화/에 저장
+  (정형화데이터_*.json을 읽는 다른 도구에 정규화 결과가 다시 섞이지 않도록 하위 폴더에 씀)
+"""
+import json
+import os
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+from welfare_json import iter_services
+from welfare_schema import (
+    AND_FIELDS, BENEFIT_FIELDS, BOOLEAN_FIELDS, CATEGORY_FIELDS, DATE_FIELDS, DATE_PATTERN, NUMERIC_FIELDS, OR_FIELDS,
+    RANGE_FIELDS, RENAMED_FIELDS, is_number, years_to_months
+)
+
+BENEFIT_KEYS = frozenset(BENEFIT_FIELDS + ['and_conditions', 'or_conditions'])
+AMOUNT_TYPES = frozenset(['일시금', '월', '년', '회'])
+
+# 위반 규칙별 예시 service_id 최대 개수
+MAX_EXAMPLES = 5
+
+# --write 결과 폴더 (입력 파일 옆), 예전 버전이 입력 옆에 저장한 결과 파일 접미사
+OUTPUT_DIR = '정규화'
+OUTPUT_SUFFIX = '_정규화.json'
+
+
+def normalize_benefit(benefit, fixes):
+    """혜택 1개 정규화 (제자리 수정), 고친 내용은 fixes[(규칙, 필드)] += 1"""
+    and_cond = benefit.get('and_conditions')
+    if not isinstance(and_cond, dict):
+        and_cond = benefit['and_conditions'] = {}
+    or_cond = benefit.get('or_conditions')
+    if not isinstance(or_cond, dict):
+        or_cond = benefit['or_conditions'] = {}
+
+    for cond in (and_cond, or_cond):
+        for field, _, _ in years_to_months(cond):
+            fixes[('years_to_months', field)] += 1
+        # 예전 이름 (disability_level → child_disability_level), 새 이름에 값이 있으면 그 값 유지
+        for old, new in RENAMED_FIELDS.items():
+            if old in cond:
+                value = cond.pop(old)
+                if cond.get(new) is None:
+                    cond[new] = value
+                fixes[('rename_field', old)] += 1
+
+    for key, value in list(and_cond.items()):
+        if key not in AND_FIELDS:
+            and_cond.pop(key)
+            fixes[('drop_unknown_and', key)] += 1
+        elif value is False:
+            and_cond[key] = None
+            fixes[('false_to_null', key)] += 1
+
+    for key, value in list(or_cond.items()):
+        if key not in OR_FIELDS:
+            or_cond.pop(key)
+            fixes[('drop_unknown_or', key)] += 1
+        elif value is False or value == []:
+            or_cond.pop(key)
+            fixes[('false_to_null', key)] += 1
+        elif key in CATEGORY_FIELDS and isinstance(value, str):
+            or_cond[key] = [value]
+            fixes[('or_category_to_list', key)] += 1
+
+    return benefit
+
+
+def validate_benefit(benefit):
+    """혜택 1개 검증 → [(규칙, 필드)]"""
+    violations = []
+    and_cond = benefit.get('and_conditions') or {}
+    or_cond = benefit.get('or_conditions') or {}
+
+    for key in benefit.keys() - BENEFIT_KEYS:
+        violations.append(('unknown_benefit_key', key))
+    if benefit.get('amount') is not None and not is_number(benefit['amount']):
+        violations.append(('not_number', 'amount'))
+    if benefit.get('amount_type') is not None and benefit['amount_type'] not in AMOUNT_TYPES:
+        violations.append(('unknown_amount_type', str(benefit['amount_type'])))
+
+    for key in and_cond.keys() - AND_FIELDS:
+        violations.append(('unknown_and_field', key))
+    for key in or_cond.keys() - OR_FIELDS:
+        violations.append(('unknown_or_field', key))
+
+    for group, cond in (('and', and_cond), ('or', or_cond)):
+        for key, value in cond.items():
+            if value is None:
+                continue
+            if key in BOOLEAN_FIELDS and value is not True:
+                violations.append((f'{group}_not_true', key))
+            elif key in NUMERIC_FIELDS and not is_number(value):
+                violations.append((f'{group}_not_number', key))
+            elif key in DATE_FIELDS and not (isinstance(value, str) and DATE_PATTERN.match(value)):
+                violations.append((f'{group}_bad_date', key))
+
+        for min_field, max_field in RANGE_FIELDS:
+            low, high = cond.get(min_field), cond.get(max_field)
+            if is_number(low) and is_number(high) and low > high:
+                violations.append((f'{group}_min_gt_max', min_field))
+
+    for key in CATEGORY_FIELDS:
+        if isinstance(and_cond.get(key), list):
+            violations.append(('and_category_is_list', key))
+        if or_cond.get(key) is not None and not isinstance(or_cond[key], list):
+            violations.append(('or_category_not_list', key))
+
+    # 최상위에 조건 필드가 있음 (and_conditions 밖)
+    for key in benefit.keys() & AND_FIELDS:
+        violations.append(('condition_outside_group', key))
+
+    return violations
+
+
+def process_chunk(services, keep_services=True):
+    """서비스 묶음 1개 처리 (작업 프로세스) → (서비스, 서비스 수, 혜택 수, fixes, violations, 예시)
+
+    keep_services=False면 정규화한 서비스를 돌려보내지 않음 (검증만 할 때 프로세스 간 전송량 감소)
+    """
+    fixes = Counter()
+    violations = Counter()
+    examples = defaultdict(list)
+    benefits = 0
+
+    for service in services:
+        for benefit in (service.get('parsed_data') or {}).get('benefits') or []:
+            benefits += 1
+            normalize_benefit(benefit, fixes)
+            for violation in validate_benefit(benefit):
+                violations[violation] += 1
+                if len(examples[violation]) < MAX_EXAMPLES and service.get('service_id') not in examples[violation]:
+                    examples[violation].append(service.get('service_id'))
+
+    return (services if keep_services else None), len(services), benefits, fixes, violations, dict(examples)
+
+
+def iter_chunks(json_paths, chunk_size):
+    for path in json_paths:
+        chunk = []
+        for service in iter_services(path):
+            chunk.append(service)
+            if len(chunk) >= chunk_size:
+                yield path, chunk
+                chunk = []
+        if chunk:
+            yield path, chunk
+
+
+class CorpusPostProcessor:
+    def __init__(self, workers=None, chunk_size=200):
+        """
+        workers: 작업 프로세스 수 (None이면 CPU 수, 1이면 프로세스 없이 실행)
+        chunk_size: 프로세스에 한 번에 넘기는 서비스 수
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+
+    def run(self, json_paths, write=False):
+        """파일 목록 처리 → 리포트 딕셔너리 (write=True면 *_정규화.json 저장)"""
+        start_time = time.time()
+        totals = {"files": len(json_paths), "services": 0, "benefits": 0}
+        fixes = Counter()
+        violations = Counter()
+        examples = defaultdict(list)
+        writers = {}
+
+        def consume(path, result):
+            services, count, benefits, chunk_fixes, chunk_violations, chunk_examples = result
+            totals["services"] += count
+            totals["benefits"] += benefits
+            fixes.update(chunk_fixes)
+            violations.update(chunk_violations)
+            for key, ids in chunk_examples.items():
+                examples[key].extend(ids[:MAX_EXAMPLES - len(examples[key])])
+            if write:
+                self.write_services(writers, path, services)
+
+        chunks = iter_chunks(json_paths, self.chunk_size)
+        try:
+            if self.workers == 1:
+                for path, chunk in chunks:
+                    consume(path, process_chunk(chunk, write))
+            else:
+                with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                    # 순서 유지 + 한 번에 workers*2 묶음만 메모리에 올림
+                    pending = []
+                    for path, chunk in chunks:
+                        pending.append((path, executor.submit(process_chunk, chunk, write)))
+                        if len(pending) >= self.workers * 2:
+                            done_path, future = pending.pop(0)
+                            consume(done_path, future.result())
+                    for done_path, future in pending:
+                        consume(done_path, future.result())
+        finally:
+            for f in writers.values():
+                f.write("\n]\n")
+                f.close()
+
+        return {
+            **totals,
+            "seconds": round(time.time() - start_time, 2),
+            "workers": self.workers,
+            "fixes": {f"{rule}:{field}": count for (rule, field), count in fixes.most_common()},
+            "violations": [
+                {"rule": rule, "field": field, "count": count, "examples": examples[(rule, field)]}
+                for (rule, field), count in violations.most_common()
+            ],
+            "outputs": [self.output_path(path) for path in writers]
+        }
+
+    @staticmethod
+    def output_path(json_path):
+        """정형화데이터/정형화데이터_울산.json → 정형화데이터/정규화/정형화데이터_울산.json"""
+        return os.path.join(os.path.dirname(json_path), OUTPUT_DIR, os.path.basename(json_path))
+
+    def write_services(self, writers, path, services):
+        """정규화 결과를 스트리밍으로 저장 (배열 형식 유지)"""
+        f = writers.get(path)
+        for service in services:
+            if f is None:
+                os.makedirs(os.path.dirname(self.output_path(path)), exist_ok=True)
+                f = writers[path] = open(self.output_path(path), 'w', encoding='utf-8')
+                f.write("[\n")
+            else:
+                f.write(",\n")
+            f.write(json.dumps(service, ensure_ascii=False, indent=2))
+
+
+def print_report(report, top=30):
+    print(f"\n{'='*80}")
+    print(f"🧹 후처리 + 검증 리포트")
+    print(f"{'='*80}")
+    print(f"📂 파일 {report['files']}개, 서비스 {report['services']:,}개, 혜택 {report['benefits']:,}개")
+    print(f"⏱️ {report['seconds']}초 (프로세스 {report['workers']}개)")
+
+    fixes = report["fixes"]
+    print(f"\n🔧 자동 수정: {sum(fixes.values()):,}건")
+    for key, count in list(fixes.items())[:top]:
+        print(f"  - {key}: {count:,}")
+
+    violations = report["violations"]
+    print(f"\n⚠️ 위반: {sum(row['count'] for row in violations):,}건 ({len(violations)}종류)")
+    for row in violations[:top]:
+        print(f"  - {row['rule']} / {row['field']}: {row['count']:,} (예: {', '.join(map(str, row['examples']))})")
+    if len(violations) > top:
+        print(f"  ... 외 {len(violations) - top}종류")
+
+    for path in report["outputs"]:
+        print(f"💾 저장: {path}")
+
+
+# 사용 예시
+if __name__ == '__main__':
+    import glob
+    import sys
+
+    write = '--write' in sys.argv
+    json_paths = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    if not json_paths:
+        # 예전 버전의 *_정규화.json 결과는 입력에서 제외 (같은 서비스를 두 번 세지 않게)
+        json_paths = sorted(path for path in glob.glob('정형화데이터/정형화데이터_*.json')
+                            if not path.endswith(OUTPUT_SUFFIX))
+
+    processor = CorpusPostProcessor(workers=None, chunk_size=200)
+    report = processor.run(json_paths, write=write)
+    print_report(report)
+
+    report_path = f"postprocess_report_{time.strftime('%m%d_%H%M')}.json"
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"📄 리포트: {report_path}")
@@ -0,0 +1,137 @@
+"""
+정형화 스키마 규칙 (파서 / 후처리 / 압축 / DB 적재가 같이 쓰는 필드 목록과 형식 규칙)
+- ⭐ AND 조건 44개 (DB 컬럼 순서), OR 조건도 같은 44개 필드
+- ⭐ 플래그 21개: true 또는 null만 허용, 순서 = DB 마스크 비트 위치
+- ⭐ 범위 / 카테고리 / 숫자 / 날짜 필드, 원문 키워드 → 필드
+- ⭐ 표준 라이브러리만 사용 (실행 스크립트를 import하지 않음)
+
+필드를 추가하면 여기만 고치고, 파서 프롬프트 / DB 스키마(db.sql)를 같이 맞춰주세요.
+"""
+import re
+
+# 혜택 정보 (8개)
+BENEFIT_FIELDS = [
+    'amount', 'amount_type', 'amount_unit', 'benefit_type',
+    'payment_cycle', 'payment_method', 'payment_timing', 'description'
+]
+
+# AND 조건 (44개, 순서 = DB 컬럼 순서)
+AND_FIELDS = [
+    'age_min_months', 'age_max_months',
+    'income_type', 'income_min_percent', 'income_max_percent',
+    'household_type', 'household_members_min', 'household_members_max',
+    'children_min', 'children_max',
+    'birth_order', 'birth_order_min', 'birth_order_max',
+    'residence_min_months',
+    'childcare_type', 'requires_grandparent_care', 'requires_dual_income',
+    'requires_disability', 'requires_parent_disability',
+    'child_disability_level', 'parent_disability_level',
+    'child_has_serious_disease', 'child_has_rare_disease',
+    'child_has_chronic_disease', 'child_has_cancer',
+    'parent_has_serious_disease', 'parent_has_rare_disease',
+    'parent_has_chronic_disease', 'parent_has_cancer', 'parent_has_infertility',
+    'is_violence_victim', 'is_abuse_victim', 'is_defector',
+    'is_national_merit', 'is_foster_child', 'is_single_mother', 'is_low_income',
+    'pregnancy_weeks_min', 'pregnancy_weeks_max', 'birth_within_months',
+    'limit_birth_date',
+    'education_level', 'is_enrolled', 'housing_type'
+]
+
+# OR 조건 (AND와 같은 44개 필드)
+OR_FIELDS = AND_FIELDS
+
+# true 또는 null만 허용되는 플래그 (21개)
+# ⭐ 순서 = DB 마스크 비트 위치 → 순서를 바꾸지 말고 새 플래그는 끝에 추가 (BIGINT라 64개까지)
+FLAG_FIELDS = [
+    'requires_grandparent_care', 'requires_dual_income',
+    'requires_disability', 'requires_parent_disability',
+    'child_has_serious_disease', 'child_has_rare_disease',
+    'child_has_chronic_disease', 'child_has_cancer',
+    'parent_has_serious_disease', 'parent_has_rare_disease',
+    'parent_has_chronic_disease', 'parent_has_cancer', 'parent_has_infertility',
+    'is_violence_victim', 'is_abuse_victim', 'is_defector',
+    'is_national_merit', 'is_foster_child', 'is_single_mother', 'is_low_income',
+    'is_enrolled'
+]
+
+BOOLEAN_FIELDS = frozenset(FLAG_FIELDS)
+FLAG_BITS = {field: 1 << bit for bit, field in enumerate(FLAG_FIELDS)}
+
+# (최소, 최대) 범위 필드
+RANGE_FIELDS = (
+    ('age_min_months', 'age_max_months'),
+    ('income_min_percent', 'income_max_percent'),
+    ('household_members_min', 'household_members_max'),
+    ('children_min', 'children_max'),
+    ('birth_order_min', 'birth_order_max'),
+    ('pregnancy_weeks_min', 'pregnancy_weeks_max')
+)
+
+# and_conditions에서는 문자열, or_conditions에서는 배열인 카테고리형 필드
+# (disability_level은 예전 파싱 결과의 이름, DB에는 child_disability_level로 저장)
+# 예전 이름 → 현재 이름 (후처리에서 바꿈)
+RENAMED_FIELDS = {'disability_level': 'child_disability_level'}
+
+CATEGORY_FIELDS = frozenset([
+    'income_type', 'household_type', 'childcare_type', 'education_level', 'housing_type',
+    'disability_level', 'child_disability_level', 'parent_disability_level'
+])
+
+NUMERIC_FIELDS = frozenset(
+    [field for pair in RANGE_FIELDS for field in pair]
+    + ['birth_order', 'residence_min_months', 'birth_within_months']
+)
+
+DATE_FIELDS = frozenset(['limit_birth_date'])
+DATE_PATTERN = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+
+# 나이는 개월 단위만 허용 (년 단위 필드 → fix에서 개월로 변환)
+AGE_YEARS_FIELDS = {'age_min_years': 'age_min_months', 'age_max_years': 'age_max_months'}
+
+BIRTH_ORDER_FIELDS = ('birth_order', 'birth_order_min', 'birth_order_max')
+BIRTH_ORDER_WORDS = ('첫째', '둘째', '셋째', '넷째', '다섯째', '째아', '출생순위', '출산순위')
+
+# 원문에 있으면 해당 필드 중 하나는 채워져 있어야 하는 키워드 (없으면 LLM 검증으로 넘김)
+KEYWORD_FIELDS = {
+    '기준중위소득': ('income_type', 'income_min_percent', 'income_max_percent'),
+    '차상위': ('income_type', 'is_low_income'),
+    '기초생활수급': ('income_type', 'is_low_income'),
+    '한부모': ('household_type', 'is_single_mother'),
+    '조손': ('household_type', 'requires_grandparent_care'),
+    '다문화': ('household_type',),
+    '맞벌이': ('household_type', 'requires_dual_income'),
+    '장애': ('requires_disability', 'requires_parent_disability', 'disability_level',
+           'child_disability_level', 'parent_disability_level'),
+    '희귀': ('child_has_rare_disease', 'parent_has_rare_disease'),
+    '난임': ('parent_has_infertility',),
+    '북한이탈': ('is_defector',),
+    '국가유공자': ('is_national_merit',),
+    '위탁': ('is_foster_child',),
+    '미혼모': ('is_single_mother',),
+    '어린이집': ('childcare_type',),
+    '유치원': ('childcare_type', 'education_level')
+}
+
+AGE_YEARS_PATTERN = re.compile(r'(\d+)\s*세')
+AGE_MONTHS_PATTERN = re.compile(r'(\d+)\s*개월')
+MANWON_PATTERN = re.compile(r'(\d[\d,]*)\s*만\s*원')
+
+
+def is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def years_to_months(cond):
+    """age_*_years → age_*_months (제자리 수정) → 바꾼 [(년 필드, 년, 개월)]
+
+    숫자가 아닌 년 값은 버림 (개월 필드는 그대로)
+    """
+    converted = []
+    for years_field, months_field in AGE_YEARS_FIELDS.items():
+        if years_field not in cond:
+            continue
+        years = cond.pop(years_field)
+        if is_number(years):
+            cond[months_field] = years * 12
+            converted.append((years_field, years, years * 12))
+    return converted
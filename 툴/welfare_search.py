@@ -0,0 +1,310 @@
+"""
+사용자 조건 → 받을 수 있는 복지 혜택 검색 (danz_welfare_benefits + danz_welfare_service_info)
+- ⭐ AND 조건: 범위/카테고리/플래그를 WHERE 절로 (NULL = 조건 없음)
+- ⭐ OR 조건: danz_welfare_benefit_or 자식 테이블의 (필드, 값) / (필드, 숫자) 인덱스로 조회
+  → OR 조건이 없는 혜택 (NOT EXISTS) 또는 사용자와 맞는 OR 값이 하나라도 있는 혜택
+- ⭐ 플래그 21개: 비트마스크 한 식으로 비교 (IS NULL 검사 21개 + OR 플래그 비교 대신)
+  AND: (fd_and_mask & ~사용자마스크) = 0 / OR: (fd_or_mask & 사용자마스크) <> 0
+  → OR 조건에는 카테고리/숫자도 있어서 "OR 조건 없음"은 계속 자식 테이블로 확인
+- ⭐ 비교용 예전 방식: fd_or_* 쉼표 문자열 + FIND_IN_SET (인덱스 못 씀, 전체 스캔), 플래그마다 IS NULL
+- ⭐ 검색 지연 벤치마크: 같은 프로필을 방식별로 검색 → 평균 ms, 결과가 예전 방식과 같은지 확인
+
+사용법:
+  python 툴/welfare_search.py          → 원본 × REPLICA 배 코퍼스를 *_bench 테이블에 적재 후 벤치마크
+"""
+import time
+
+from json_db_converter_v5_limit_Birth_추가 import (
+    BENEFIT_TABLE, OR_CATEGORY_COLUMNS, OR_COLUMNS, OR_NUMERIC_FIELDS, OR_TABLE, SERVICE_TABLE
+)
+from welfare_schema import CATEGORY_FIELDS, DATE_FIELDS, FLAG_BITS, FLAG_FIELDS
+
+OR_MODES = ("table", "columns")  # table: 자식 테이블 | columns: fd_or_* 쉼표 문자열
+FLAG_MODES = ("mask", "columns")  # mask: fd_and_mask / fd_or_mask | columns: 플래그 컬럼마다 비교
+
+# 벤치마크 방식 이름 → (or_mode, flag_mode), 첫 번째가 기준 (예전 방식)
+VARIANTS = {
+    "legacy": ("columns", "columns"),
+    "or_table": ("table", "columns"),
+    "or_table+mask": ("table", "mask")
+}
+
+# 숫자 조건 → (프로필 키, 비교): "조건값 {비교} 사용자값"이면 충족
+NUMERIC_RULES = {
+    'age_min_months': ('age_months', '<='),
+    'age_max_months': ('age_months', '>='),
+    'income_min_percent': ('income_percent', '<='),
+    'income_max_percent': ('income_percent', '>='),
+    'household_members_min': ('household_members', '<='),
+    'household_members_max': ('household_members', '>='),
+    'children_min': ('children', '<='),
+    'children_max': ('children', '>='),
+    'birth_order': ('birth_order', '='),
+    'birth_order_min': ('birth_order', '<='),
+    'birth_order_max': ('birth_order', '>='),
+    'residence_min_months': ('residence_months', '<='),
+    'pregnancy_weeks_min': ('pregnancy_weeks', '<='),
+    'pregnancy_weeks_max': ('pregnancy_weeks', '>='),
+    'birth_within_months': ('age_months', '>='),    # 출생 후 N개월 이내
+    'limit_birth_date': ('birth_date', '>=')        # 이 날짜 이전 태생
+}
+
+# 카테고리 조건 (AND_FIELDS 순서) → OR 컬럼
+CATEGORY_OR_COLUMNS = {field: column for column, field in OR_CATEGORY_COLUMNS if field in CATEGORY_FIELDS}
+
+# 프로필: 숫자는 NUMERIC_RULES의 키, 카테고리는 {필드: [값]}, 플래그는 해당하는 FLAG_FIELDS
+# 값이 없는(None) 숫자 조건은 거르지 않음, 없는 카테고리/플래그는 "해당 없음"
+SAMPLE_PROFILES = [
+    {
+        "name": "울산 울주군 0세 맞벌이",
+        "sido": "울산광역시", "sigungu": "울주군",
+        "age_months": 8, "income_percent": 120, "household_members": 3, "children": 1, "birth_order": 1,
+        "residence_months": 24, "birth_date": "2025-02-01",
+        "categories": {"household_type": ["맞벌이"], "childcare_type": ["가정"]},
+        "flags": {"requires_dual_income"}
+    },
+    {
+        "name": "인천 한부모 기초생활수급",
+        "sido": "인천광역시", "sigungu": "남동구",
+        "age_months": 40, "income_percent": 30, "household_members": 2, "children": 1, "birth_order": 1,
+        "residence_months": 60, "birth_date": "2022-10-01",
+        "categories": {"household_type": ["한부모"], "income_type": ["기초생활수급자", "기준중위소득"],
+                       "childcare_type": ["어린이집"]},
+        "flags": {"is_low_income", "is_single_mother"}
+    },
+    {
+        "name": "경기 다자녀 장애아동",
+        "sido": "경기도", "sigungu": "수원시",
+        "age_months": 100, "income_percent": 90, "household_members": 5, "children": 3, "birth_order": 3,
+        "residence_months": 12, "birth_date": "2018-06-01",
+        "categories": {"household_type": ["다자녀"], "child_disability_level": ["중증"],
+                       "education_level": ["초등"]},
+        "flags": {"requires_disability", "child_has_rare_disease", "is_enrolled"}
+    }
+]
+
+
+def user_mask(profile):
+    """프로필의 플래그 → 비트마스크"""
+    mask = 0
+    for field in profile.get('flags') or ():
+        mask |= FLAG_BITS[field]
+    return mask
+
+
+def and_clauses(profile, flag_mode="mask"):
+    """AND 조건 + 지역 → (WHERE 절 목록, 파라미터)"""
+    clauses, params = [], []
+
+    for field in ('sido', 'sigungu'):
+        if profile.get(field) is not None:
+            clauses.append(f"(b.fd_{field} IS NULL OR b.fd_{field} = %s)")
+            params.append(profile[field])
+
+    for field in OR_NUMERIC_FIELDS:
+        key, op = NUMERIC_RULES[field]
+        if profile.get(key) is None:
+            continue
+        clauses.append(f"(b.fd_{field} IS NULL OR b.fd_{field} {op} %s)")
+        params.append(profile[key])
+
+    categories = profile.get('categories') or {}
+    for field in CATEGORY_OR_COLUMNS:
+        values = categories.get(field) or []
+        if values:
+            clauses.append(f"(b.fd_{field} IS NULL OR b.fd_{field} IN ({', '.join(['%s'] * len(values))}))")
+            params.extend(values)
+        else:
+            clauses.append(f"b.fd_{field} IS NULL")
+
+    if flag_mode == "mask":
+        # 혜택이 요구하는 플래그가 모두 사용자에게 있어야 함
+        clauses.append("(b.fd_and_mask & ~%s) = 0")
+        params.append(user_mask(profile))
+    else:
+        flags = profile.get('flags') or set()
+        for field in FLAG_FIELDS:
+            if field not in flags:
+                clauses.append(f"b.fd_{field} IS NULL")
+
+    return clauses, params
+
+
+def or_clause_table(profile, or_table, flag_mode="mask"):
+    """OR 조건 (자식 테이블) → (WHERE 절, 파라미터)
+
+    맞는 혜택 키는 (fd_field, fd_value) / (fd_field, fd_number) 인덱스로 찾고,
+    OR 조건이 아예 없는 혜택은 PK (fd_benefit_key, ...) 앞부분으로 확인
+    flag_mode="mask"면 플래그는 자식 테이블 대신 fd_or_mask로 비교
+    """
+    parts, params = [], []
+    matches, match_params = [], []
+
+    categories = profile.get('categories') or {}
+    for field in CATEGORY_OR_COLUMNS:
+        values = categories.get(field) or []
+        if values:
+            parts.append(f"(o.fd_field = %s AND o.fd_value IN ({', '.join(['%s'] * len(values))}))")
+            params.extend([field, *values])
+
+    flags = [field for field in FLAG_FIELDS if field in (profile.get('flags') or set())]
+    if flags and flag_mode == "mask":
+        matches.append("(b.fd_or_mask & %s) <> 0")
+        match_params.append(user_mask(profile))
+    elif flags:
+        parts.append(f"(o.fd_field IN ({', '.join(['%s'] * len(flags))}) AND o.fd_value = 'true')")
+        params.extend(flags)
+
+    for field in OR_NUMERIC_FIELDS:
+        key, op = NUMERIC_RULES[field]
+        if profile.get(key) is None:
+            continue
+        column = 'o.fd_value' if field in DATE_FIELDS else 'o.fd_number'
+        parts.append(f"(o.fd_field = %s AND {column} {op} %s)")
+        params.extend([field, profile[key]])
+
+    if parts:
+        matches.append(f"b.fd_benefit_key IN (SELECT o.fd_benefit_key FROM {or_table} o WHERE {' OR '.join(parts)})")
+        match_params.extend(params)
+    no_or = f"NOT EXISTS (SELECT 1 FROM {or_table} o WHERE o.fd_benefit_key = b.fd_benefit_key)"
+    return f"({' OR '.join([*matches, no_or])})", match_params
+
+
+def or_clause_columns(profile, flag_mode="columns"):
+    """OR 조건 (예전 방식: fd_or_* 쉼표 문자열) → (WHERE 절, 파라미터)"""
+    parts, params = [], []
+
+    categories = profile.get('categories') or {}
+    for field, column in CATEGORY_OR_COLUMNS.items():
+        for value in categories.get(field) or []:
+            parts.append(f"FIND_IN_SET(%s, b.{column}) > 0")
+            params.append(value)
+
+    flags = profile.get('flags') or set()
+    if flags and flag_mode == "mask":
+        parts.append("(b.fd_or_mask & %s) <> 0")
+        params.append(user_mask(profile))
+    elif flags:
+        for column, field in OR_CATEGORY_COLUMNS:
+            if field in FLAG_FIELDS and field in flags:
+                parts.append(f"b.{column} = 'true'")
+
+    for field in OR_NUMERIC_FIELDS:
+        key, op = NUMERIC_RULES[field]
+        if profile.get(key) is None:
+            continue
+        column = f"b.fd_or_{field}" if field in DATE_FIELDS else f"CAST(b.fd_or_{field} AS DECIMAL(12, 2))"
+        parts.append(f"{column} {op} %s")
+        params.append(profile[key])
+
+    no_or = "(" + " AND ".join(f"b.{column} IS NULL" for column, _ in OR_COLUMNS) + ")"
+    if not parts:
+        return no_or, params
+    return f"({no_or} OR {' OR '.join(parts)})", params
+
+
+def build_search(profile, or_mode="table", suffix='', flag_mode="mask"):
+    """프로필 → (SQL, 파라미터): 받을 수 있는 혜택 (금액 큰 순)
+
+    suffix: 테이블 접미사 ('' 실제 테이블, '_bench' 벤치마크)
+    """
+    if or_mode not in OR_MODES:
+        raise ValueError(f"or_mode는 {OR_MODES} 중 하나: {or_mode!r}")
+    if flag_mode not in FLAG_MODES:
+        raise ValueError(f"flag_mode는 {FLAG_MODES} 중 하나: {flag_mode!r}")
+
+    clauses, params = and_clauses(profile, flag_mode)
+    if or_mode == "table":
+        clause, or_params = or_clause_table(profile, OR_TABLE + suffix, flag_mode)
+    else:
+        clause, or_params = or_clause_columns(profile, flag_mode)
+    clauses.append(clause)
+    params.extend(or_params)
+
+    sql = (
+        f"SELECT b.fd_benefit_id, b.fd_service_id, s.fd_service_name, b.fd_benefit_type, b.fd_amount, b.fd_description "
+        f"FROM {BENEFIT_TABLE + suffix} b "
+        f"LEFT JOIN {SERVICE_TABLE + suffix} s ON s.fd_service_id = b.fd_service_id "
+        f"WHERE {' AND '.join(clauses)} "
+        f"ORDER BY b.fd_amount DESC, b.fd_benefit_id"
+    )
+    return sql, params
+
+
+def search(cursor, profile, or_mode="table", suffix='', flag_mode="mask"):
+    """프로필로 검색 → 결과 행 목록"""
+    sql, params = build_search(profile, or_mode, suffix, flag_mode)
+    cursor.execute(sql, params)
+    return cursor.fetchall()
+
+
+def benchmark(cursor, profiles=SAMPLE_PROFILES, repeat=20, suffix=''):
+    """프로필별 검색 지연 (VARIANTS: 예전 방식 / OR 자식 테이블 / + 플래그 마스크) → 결과 목록"""
+    print(f"\n{'='*80}")
+    print(f"⏱️ 검색 지연 벤치마크 (프로필 {len(profiles)}개 × {repeat}회, 테이블 접미사 {suffix!r})")
+    print(f"{'='*80}")
+
+    baseline = next(iter(VARIANTS))
+    results = []
+    for profile in profiles:
+        result = {"profile": profile['name']}
+        found = {}
+        for name, (or_mode, flag_mode) in VARIANTS.items():
+            rows = search(cursor, profile, or_mode, suffix, flag_mode)  # 캐시 예열
+            start = time.time()
+            for _ in range(repeat):
+                search(cursor, profile, or_mode, suffix, flag_mode)
+            result[f"{name}_ms"] = round((time.time() - start) / repeat * 1000, 2)
+            result[f"{name}_rows"] = len(rows)
+            found[name] = sorted(row[0] for row in rows)
+
+        result["same_result"] = all(rows == found[baseline] for rows in found.values())
+        results.append(result)
+        base_ms = result[f"{baseline}_ms"]
+        print(f"  {profile['name']} (혜택 {result[f'{baseline}_rows']}건"
+              + ("" if result["same_result"] else " ⚠️ 방식별 결과 다름") + "): "
+              + " / ".join(f"{name} {result[f'{name}_ms']}ms"
+                           + (f" ({base_ms / result[f'{name}_ms']:.1f}배)" if name != baseline and result[f'{name}_ms'] else "")
+                           for name in VARIANTS))
+
+    return results
+
+
+# 사용 예시
+if __name__ == '__main__':
+    import glob
+    import json
+
+    from json_db_converter_v5_limit_Birth_추가 import TABLES, WelfareConverter
+    from json_db_parallel_loader import BENCH, ParallelLoader, print_report
+
+    REPLICA = 100  # 원본 코퍼스 복제 배수 (1이면 원본 그대로)
+
+    json_files = sorted(glob.glob('./정형화데이터/정형화데이터_*.json'))
+    if not json_files:
+        print("❌ 정형화데이터 폴더에 JSON 파일이 없습니다!")
+        exit(1)
+
+    db = {}  # 로컬 컨테이너: {"host": "127.0.0.1"}
+    converter = WelfareConverter(**db)
+    converter.create_schema()
+    for table in TABLES:
+        converter.cursor.execute(f"DROP TABLE IF EXISTS {table}{BENCH}")
+        converter.cursor.execute(f"CREATE TABLE {table}{BENCH} LIKE {table}")
+
+    try:
+        loader = ParallelLoader(workers=4, suffix=BENCH, db=db)
+        print_report(loader.run(json_files * REPLICA))
+        for table in TABLES:
+            converter.cursor.execute(f"ANALYZE TABLE {table}{BENCH}")
+            converter.cursor.fetchall()
+
+        results = benchmark(converter.cursor, suffix=BENCH)
+        report_path = f"search_benchmark_{time.strftime('%m%d_%H%M')}.json"
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"📄 리포트: {report_path}")
+    finally:
+        for table in TABLES:
+            converter.cursor.execute(f"DROP TABLE IF EXISTS {table}{BENCH}")
+        converter.close()
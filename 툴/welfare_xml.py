@@ -0,0 +1,50 @@
+"""
+복지로 XML 읽기 (wantedDtl 포함 목록)
+- ⭐ iterparse로 servList를 하나씩 읽음 → 파일 크기와 무관하게 메모리 일정
+- ⭐ batch_parse_xml과 같은 필드 추출 규칙
+"""
+import xml.etree.ElementTree as ET
+
+
+def _text(elem, tag, default=''):
+    found = elem.find(tag)
+    return found.text if found is not None else default
+
+
+def extract_service(serv):
+    """servList 요소 1개 → 서비스 딕셔너리"""
+    detail = serv.find('.//wantedDtl')
+    if detail is not None:
+        target_text = _text(detail, 'sprtTrgtCn')
+        criteria_text = _text(detail, 'slctCritCn')
+        support_text = _text(detail, 'alwServCn')
+    else:
+        target_text = ''
+        criteria_text = ''
+        support_text = ''
+
+    return {
+        "service_id": _text(serv, 'servId'),
+        "service_name": _text(serv, 'servNm'),
+        "detail_url": _text(serv, 'servDtlLink'),
+        "sido": _text(serv, 'ctpvNm'),
+        "sigungu": _text(serv, 'sggNm', None),
+        "target_text": target_text,
+        "criteria_text": criteria_text,
+        "support_text": support_text
+    }
+
+
+def iter_services(xml_path, limit=None):
+    """XML에서 서비스를 하나씩 반환 (스트리밍)"""
+    count = 0
+    for _, elem in ET.iterparse(xml_path, events=('end',)):
+        if elem.tag != 'servList':
+            continue
+
+        yield extract_service(elem)
+        elem.clear()
+
+        count += 1
+        if limit and count >= limit:
+            break